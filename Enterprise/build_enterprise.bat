@@ -7,8 +7,11 @@ REM Clean previous builds
 if exist build rmdir /s /q build
 if exist dist rmdir /s /q dist
 
-REM Build Enterprise version
-pyinstaller --onefile --windowed --name cybersecurityenterprise modern_gui.py
+REM Compile the signature bundle from the shipped signatures only (reports malformed signature entries)
+python data\ai_detection\signature_database.py --without-learned
+
+REM Build Enterprise version; the compiled bundle ships with the signature files it was built from
+pyinstaller --onefile --windowed --name cybersecurityenterprise --add-data "data\signatures\*.*;data\signatures" modern_gui.py
 
 REM Move executable up one level
 if exist dist\cybersecurityenterprise.exe move dist\cybersecurityenterprise.exe ..\
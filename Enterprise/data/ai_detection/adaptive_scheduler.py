@@ -0,0 +1,163 @@
+"""
+Adaptive Monitoring Scheduler
+Scales monitor intervals by detection rate, system load and power state
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+class MonitorCadence:
+    """Interval bounds and current state for one monitor"""
+    
+    __slots__ = ('name', 'base_interval', 'min_interval', 'max_interval', 'current_interval', 'wakeup')
+    
+    def __init__(self, name: str, base_interval: float, min_interval: float, max_interval: float):
+        self.name = name
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.current_interval = base_interval
+        self.wakeup = threading.Event()
+
+class AdaptiveScheduler:
+    """Compute sleep intervals for monitoring loops"""
+    
+    def __init__(self, threat_window: float = 300.0, idle_after: float = 1800.0):
+        self.monitors: Dict[str, MonitorCadence] = {}
+        self.lock = threading.Lock()
+        
+        # Recent detections (timestamps) drive tightening
+        self.threat_window = threat_window
+        self.idle_after = idle_after
+        self.detections = deque(maxlen=1000)
+        self.last_detection = None
+        
+        # Power/load readings are cached to keep scheduling cheap
+        self.system_state_ttl = 60.0
+        self.system_state = {'on_battery': False, 'battery_percent': None, 'cpu_load': 0.0}
+        self.system_state_time = 0.0
+        
+        self.stopped = False
+        
+        if PSUTIL_AVAILABLE:
+            psutil.cpu_percent(interval=None)  # Set reference for non-blocking reads
+    
+    def register(self, name: str, base_interval: float, min_interval: float, max_interval: float):
+        """Register a monitor with its default interval and bounds"""
+        self.monitors[name] = MonitorCadence(name, base_interval, min_interval, max_interval)
+    
+    def record_detection(self):
+        """Record a detection; the first one in a quiet period wakes sleeping monitors"""
+        quiet = self.recent_detections() == 0
+        
+        now = time.time()
+        with self.lock:
+            self.detections.append(now)
+            self.last_detection = now
+        
+        if quiet:
+            for monitor in self.monitors.values():
+                monitor.wakeup.set()
+    
+    def recent_detections(self) -> int:
+        """Number of detections in the threat window"""
+        cutoff = time.time() - self.threat_window
+        with self.lock:
+            while self.detections and self.detections[0] < cutoff:
+                self.detections.popleft()
+            return len(self.detections)
+    
+    def read_system_state(self) -> Dict[str, Any]:
+        """Power state and CPU load via psutil (cached)"""
+        now = time.time()
+        if not PSUTIL_AVAILABLE or now - self.system_state_time < self.system_state_ttl:
+            return self.system_state
+        
+        state = {'on_battery': False, 'battery_percent': None, 'cpu_load': 0.0}
+        try:
+            battery = psutil.sensors_battery()
+            if battery is not None:
+                state['on_battery'] = not battery.power_plugged
+                state['battery_percent'] = battery.percent
+        except (AttributeError, NotImplementedError, OSError):
+            pass
+        
+        try:
+            state['cpu_load'] = psutil.cpu_percent(interval=None)
+        except OSError:
+            pass
+        
+        self.system_state = state
+        self.system_state_time = now
+        return state
+    
+    def next_interval(self, name: str) -> float:
+        """Compute the next sleep interval for a monitor"""
+        monitor = self.monitors[name]
+        recent = self.recent_detections()
+        state = self.read_system_state()
+        
+        if recent:
+            # Under threat: tighten with the detection rate, ignore power saving
+            interval = monitor.base_interval / (1 + recent)
+        else:
+            idle = self.last_detection is None or time.time() - self.last_detection > self.idle_after
+            if idle:
+                # Back off gradually while nothing is happening
+                interval = max(monitor.current_interval, monitor.base_interval) * 1.25
+            else:
+                interval = monitor.base_interval
+            
+            if state['on_battery']:
+                interval *= 2.0
+                if state['battery_percent'] is not None and state['battery_percent'] < 20:
+                    interval *= 1.5
+            
+            if state['cpu_load'] > 85:
+                interval *= 1.5
+        
+        interval = max(monitor.min_interval, min(monitor.max_interval, interval))
+        monitor.current_interval = interval
+        return interval
+    
+    def wait(self, name: str, cap: Optional[float] = None) -> float:
+        """Sleep for the monitor's next interval (woken early by detections or stop)"""
+        interval = self.next_interval(name)
+        if cap is not None:
+            interval = max(self.monitors[name].min_interval, min(interval, cap))
+            self.monitors[name].current_interval = interval
+        
+        monitor = self.monitors[name]
+        monitor.wakeup.clear()
+        if not self.stopped:
+            monitor.wakeup.wait(interval)
+        return interval
+    
+    def start(self):
+        """Re-arm waiting after a stop"""
+        self.stopped = False
+    
+    def stop(self):
+        """Release all waiting monitors"""
+        self.stopped = True
+        for monitor in self.monitors.values():
+            monitor.wakeup.set()
+    
+    def get_cadence(self) -> Dict[str, Any]:
+        """Current interval and bounds of every monitor"""
+        return {
+            name: {
+                'interval': round(monitor.current_interval, 1),
+                'min': monitor.min_interval,
+                'max': monitor.max_interval
+            }
+            for name, monitor in self.monitors.items()
+        }
\ No newline at end of file
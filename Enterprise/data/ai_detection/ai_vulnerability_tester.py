@@ -19,13 +19,16 @@ import concurrent.futures
 from typing import Dict, List, Any
 import numpy as np
 
+from ioc_store import IOCStore
+
 class AIVulnerabilityTester:
     """AI-powered autonomous vulnerability testing system"""
     
     def __init__(self):
         self.ai_models = {}
         self.vulnerability_patterns = []
-        self.threat_intelligence = {}
+        self.ioc_store = None
+        self.exploit_signatures = []
         self.autonomous_mode = False
         self.learning_database = "ai_vuln_learning.db"
         self.scan_history = []
@@ -157,28 +160,31 @@ class AIVulnerabilityTester:
         """Initialize threat intelligence feeds"""
         print("🔍 Initializing Threat Intelligence...")
         
-        # Simulated threat intelligence (in production, this would fetch from real feeds)
-        self.threat_intelligence = {
-            "malicious_ips": [
-                "192.168.1.100", "10.0.0.50", "172.16.0.25"
-            ],
-            "malicious_domains": [
-                "malicious-site.com", "phishing-example.net", "trojan-host.org"
-            ],
-            "malicious_hashes": [
-                "d41d8cd98f00b204e9800998ecf8427e",
-                "5d41402abc4b2a76b9719d911017c592",
-                "098f6bcd4621d373cade4e832627b4f6"
-            ],
-            "exploit_signatures": [
-                "payload_type_1", "injection_pattern_a", "overflow_signature_x"
-            ],
-            "c2_servers": [
-                "command-control.evil", "botnet-server.bad"
-            ]
-        }
-        
-        print(f"✅ Threat intelligence initialized with {sum(len(v) for v in self.threat_intelligence.values())} indicators")
+        # Shared with the system watcher and the self-learning AI's harvested indicators
+        self.ioc_store = IOCStore()
+        
+        # Simulated seed indicators (in production, these come from real feeds)
+        seed_indicators = (
+            [('ip', value) for value in ("192.168.1.100", "10.0.0.50", "172.16.0.25")] +
+            [('domain', value) for value in ("malicious-site.com", "phishing-example.net", "trojan-host.org",
+                                             "command-control.evil", "botnet-server.bad")] +
+            [('hash_md5', value) for value in ("d41d8cd98f00b204e9800998ecf8427e",
+                                               "5d41402abc4b2a76b9719d911017c592",
+                                               "098f6bcd4621d373cade4e832627b4f6")]
+        )
+        self.ioc_store.add_indicators([
+            {'type': indicator_type, 'value': value, 'source': 'builtin', 'confidence': 1.0}
+            for indicator_type, value in seed_indicators
+        ])
+        
+        # Exploit signatures are payload patterns, not IOCs
+        self.exploit_signatures = ["payload_type_1", "injection_pattern_a", "overflow_signature_x"]
+        
+        print(f"✅ Threat intelligence initialized with {self.count_threat_indicators()} indicators")
+    
+    def count_threat_indicators(self) -> int:
+        """IOCs in the shared store plus exploit signatures"""
+        return sum(self.ioc_store.get_store_status()['indicators'].values()) + len(self.exploit_signatures)
     
     def run_ai_vulnerability_assessment(self):
         """Run AI-powered vulnerability assessment"""
@@ -330,6 +336,14 @@ class AIVulnerabilityTester:
         ]
         
         for threat in potential_threats:
+            # Only observables that match a stored IOC (or a known exploit signature) correlate
+            if threat["type"] == "exploit_signature":
+                match = {"source": "Exploit Signatures"} if threat["ioc"] in self.exploit_signatures else None
+            else:
+                match = self.ioc_store.lookup(threat["ioc"])
+            if match is None:
+                continue
+            
             # Simulate AI correlation analysis
             correlation_strength = random.uniform(0.7, 0.98)
             
@@ -340,7 +354,7 @@ class AIVulnerabilityTester:
                     "threat_level": threat["threat_level"],
                     "ai_confidence": threat["confidence"],
                     "correlation_strength": correlation_strength,
-                    "threat_intelligence_source": "Multiple CTI Feeds",
+                    "threat_intelligence_source": match["source"],
                     "first_seen": (datetime.now() - timedelta(days=random.randint(1, 30))).isoformat()
                 }
                 correlations.append(correlation)
@@ -615,7 +629,7 @@ class AIVulnerabilityTester:
         
         print(f"\n🧠 AI LEARNING STATUS:")
         print(f"   📚 Vulnerability Patterns: {len(self.vulnerability_patterns)}")
-        print(f"   🔍 Threat Intelligence IOCs: {sum(len(v) for v in self.threat_intelligence.values())}")
+        print(f"   🔍 Threat Intelligence IOCs: {self.count_threat_indicators()}")
         print(f"   📈 Historical Scans: {len(self.scan_history)}")
         
         print("\n" + "="*80)
@@ -0,0 +1,152 @@
+"""
+Behavior Baseline Store
+Rolls the endpoint's own system metrics into per-minute aggregates that train its anomaly baseline
+"""
+
+import time
+import sqlite3
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional
+import numpy as np
+
+from metrics_sampler import METRIC_FIELDS
+from feature_store import encode_features, decode_features
+
+# Bump the version whenever the meaning or order of baseline features changes;
+# stored minutes and trained models of another version are never mixed with it
+BEHAVIOR_SCHEMA = {
+    'name': 'behavior_minute',
+    'version': 1,
+    'fields': ([f'{field}_mean' for field in METRIC_FIELDS] +
+               [f'{field}_max' for field in METRIC_FIELDS] +
+               ['hour_sin', 'hour_cos'])
+}
+BEHAVIOR_FEATURE_COUNT = len(BEHAVIOR_SCHEMA['fields'])
+
+def minute_features(samples: np.ndarray, minute: int) -> np.ndarray:
+    """Baseline feature row for the samples of one minute"""
+    # Time of day on the unit circle, so 23:59 and 00:00 are neighbours
+    local = datetime.fromtimestamp(minute * 60)
+    angle = 2.0 * np.pi * (local.hour * 60 + local.minute) / 1440.0
+    
+    return np.concatenate([samples.mean(axis=0), samples.max(axis=0), [np.sin(angle), np.cos(angle)]])
+
+class BehaviorBaselineStore:
+    """Aggregate metric samples per minute and serve rolling training windows"""
+    
+    def __init__(self, database: str = "behavior_baseline.db", retention_days: int = 30):
+        self.database = database
+        self.retention_days = retention_days
+        self.logger = logging.getLogger(__name__)
+        
+        # Samples of the minute in progress
+        self.current_minute = None
+        self.pending = []
+        self.minutes_recorded = 0
+        
+        # Samples of the trailing minute, so the latest behavior is scored on a full minute of data
+        self.recent = deque()
+        
+        self.init_database()
+    
+    def init_database(self):
+        """Create the per-minute aggregate table"""
+        conn = sqlite3.connect(self.database)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS behavior_minutes (
+                minute INTEGER PRIMARY KEY,
+                schema_version INTEGER,
+                samples INTEGER,
+                features BLOB
+            )
+        ''')
+        conn.commit()
+        conn.close()
+    
+    def record(self, metrics: Dict[str, Any], timestamp: Optional[float] = None):
+        """Add one metrics sample, writing out the previous minute when a new one starts"""
+        timestamp = time.time() if timestamp is None else timestamp
+        minute = int(timestamp // 60)
+        
+        if self.current_minute is not None and minute != self.current_minute:
+            self.flush()
+        
+        row = [float(metrics[field]) for field in METRIC_FIELDS]
+        self.current_minute = minute
+        self.pending.append(row)
+        
+        self.recent.append((timestamp, row))
+        while self.recent[0][0] <= timestamp - 60:
+            self.recent.popleft()
+    
+    def flush(self):
+        """Store the aggregate of the minute in progress"""
+        if not self.pending:
+            return
+        
+        try:
+            features = minute_features(np.asarray(self.pending), self.current_minute)
+            conn = sqlite3.connect(self.database)
+            conn.execute('''
+                INSERT OR REPLACE INTO behavior_minutes (minute, schema_version, samples, features)
+                VALUES (?, ?, ?, ?)
+            ''', (self.current_minute, BEHAVIOR_SCHEMA['version'], len(self.pending), encode_features(features)))
+            
+            # Retention is enforced once an hour
+            if self.current_minute % 60 == 0:
+                conn.execute('DELETE FROM behavior_minutes WHERE minute < ?',
+                             (self.current_minute - self.retention_days * 1440,))
+            
+            conn.commit()
+            conn.close()
+            self.minutes_recorded += 1
+        
+        except Exception as e:
+            self.logger.error(f"Failed to store behavior minute: {e}")
+        
+        finally:
+            self.pending = []
+    
+    def current_features(self) -> Optional[np.ndarray]:
+        """Baseline features of the trailing minute, for scoring the latest behavior"""
+        # A minute that has only just started would look unlike any stored minute
+        if not self.recent:
+            return None
+        return minute_features(np.asarray([row for _, row in self.recent]), self.current_minute)
+    
+    def load_window(self, days: int = 14, max_rows: int = 20000, seed: Optional[int] = None) -> np.ndarray:
+        """Stored minutes of the last `days`, uniformly subsampled to at most max_rows"""
+        since = int(time.time() // 60) - days * 1440
+        conn = sqlite3.connect(self.database)
+        rows = conn.execute('''
+            SELECT features FROM behavior_minutes
+            WHERE minute >= ? AND schema_version = ? AND length(features) = ?
+        ''', (since, BEHAVIOR_SCHEMA['version'], BEHAVIOR_FEATURE_COUNT * 4)).fetchall()
+        conn.close()
+        
+        features = decode_features([row[0] for row in rows], BEHAVIOR_FEATURE_COUNT)
+        if len(features) > max_rows:
+            keep = np.random.default_rng(seed).choice(len(features), max_rows, replace=False)
+            features = features[np.sort(keep)]
+        return features.astype(np.float64)
+    
+    def get_baseline_status(self) -> Dict[str, Any]:
+        """Stored minutes for the current schema"""
+        try:
+            conn = sqlite3.connect(self.database)
+            stored, first, last = conn.execute('''
+                SELECT COUNT(*), MIN(minute), MAX(minute) FROM behavior_minutes WHERE schema_version = ?
+            ''', (BEHAVIOR_SCHEMA['version'],)).fetchone()
+            conn.close()
+            
+            return {
+                'schema_version': BEHAVIOR_SCHEMA['version'],
+                'stored_minutes': stored,
+                'history_hours': (last - first + 1) / 60 if stored else 0.0,
+                'minutes_recorded': self.minutes_recorded
+            }
+        
+        except Exception as e:
+            return {'error': str(e)}
\ No newline at end of file
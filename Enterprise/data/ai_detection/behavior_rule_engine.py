@@ -0,0 +1,567 @@
+"""
+Behavioral Rule Engine
+Matches normalized file, process, network and registry events against the behavioral rules,
+including windowed multi-event sequences tracked per process
+"""
+
+import os
+import re
+import time
+import fnmatch
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Tuple
+
+from monitor_events import ProcessRecord, intern_text
+
+# Normalized event types (the BEHAVIOR_TYPE names of behavioral_rules.txt)
+FILE_CREATION = 'FILE_CREATION'
+FILE_MODIFICATION = 'FILE_MODIFICATION'
+FILE_DELETION = 'FILE_DELETION'
+PROCESS_CREATE = 'PROCESS_CREATE'
+NETWORK_CONNECT = 'NETWORK_CONNECT'
+REGISTRY_WRITE = 'REGISTRY_WRITE'
+REGISTRY_DELETE = 'REGISTRY_DELETE'
+
+FILE_EVENT_TYPES = (FILE_CREATION, FILE_MODIFICATION, FILE_DELETION)
+REGISTRY_EVENT_TYPES = (REGISTRY_WRITE, REGISTRY_DELETE)
+SEQUENCE_RULE_TYPE = 'SEQUENCE'
+
+# Watchdog event types; a move is a creation at the destination
+WATCHDOG_EVENT_TYPES = {
+    'created': FILE_CREATION,
+    'modified': FILE_MODIFICATION,
+    'deleted': FILE_DELETION,
+    'moved': FILE_CREATION
+}
+
+# Events that cannot be tied to a process (file system notifications, registry polling)
+UNATTRIBUTED = 'unknown'
+
+REGISTRY_HIVES = {
+    'hkey_local_machine': 'hklm',
+    'hkey_current_user': 'hkcu',
+    'hkey_classes_root': 'hkcr',
+    'hkey_users': 'hku'
+}
+
+# Directory variables stand for any directory with one of these components
+DIRECTORY_VARIABLES = {
+    '%temp%': ('\\temp', '\\tmp'),
+    '%tmp%': ('\\temp', '\\tmp'),
+    '%systemroot%': ('\\windows',),
+    '%windir%': ('\\windows',),
+    '%appdata%': ('\\appdata\\roaming',),
+    '%localappdata%': ('\\appdata\\local',)
+}
+
+# Descriptive rule patterns that name one concrete file
+PATTERN_ALIASES = {
+    'hosts file': 'hosts in %SystemRoot%\\System32\\drivers\\etc'
+}
+
+PROGRAM_NAME = re.compile(r'^[\w.\-]+\.(?:exe|com|scr|bat|cmd|pif)$')
+SEQUENCE_PATTERN = re.compile(r'^(.+?)\s+within\s+(\d+)\s*s$', re.IGNORECASE)
+
+def normalize_path(path: str) -> str:
+    """Case-folded Windows form of a file path"""
+    return (path or '').replace('/', '\\').lower()
+
+def normalize_registry_key(key: str) -> str:
+    """Case-folded registry key with an abbreviated hive"""
+    key = key.replace('/', '\\').strip('\\').lower()
+    hive, _, rest = key.partition('\\')
+    hive = REGISTRY_HIVES.get(hive, hive)
+    return f"{hive}\\{rest}" if rest else hive
+
+class BehaviorEvent:
+    """One normalized monitor event"""
+    
+    __slots__ = ('event_type', 'key', 'process_key', 'parent_key', 'name', 'command_line', 'timestamp')
+    
+    def __init__(self, event_type: str, key: str, process_key: str = UNATTRIBUTED,
+                 parent_key: Optional[str] = None, name: str = '', command_line: str = '',
+                 timestamp: Optional[float] = None):
+        self.event_type = event_type
+        self.key = key
+        self.process_key = process_key
+        self.parent_key = parent_key
+        self.name = name
+        self.command_line = command_line
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+def file_event(watchdog_type: str, path: str, dest_path: Optional[str] = None) -> Optional[BehaviorEvent]:
+    """Event for a watchdog file system notification (None for types without rules)"""
+    event_type = WATCHDOG_EVENT_TYPES.get(watchdog_type)
+    if not event_type:
+        return None
+    key = normalize_path(dest_path if watchdog_type == 'moved' and dest_path else path)
+    return BehaviorEvent(event_type, key, name=key.rsplit('\\', 1)[-1])
+
+def process_event(proc_info: ProcessRecord) -> BehaviorEvent:
+    """Event for a newly seen process"""
+    cmdline = proc_info.cmdline
+    image = proc_info.exe or (cmdline[0] if cmdline else '')
+    return BehaviorEvent(
+        PROCESS_CREATE, normalize_path(image),
+        process_key=str(proc_info.pid),
+        parent_key=str(proc_info.ppid) if proc_info.ppid else None,
+        name=intern_text(proc_info.name.lower()),
+        command_line=' '.join(proc_info.command_line.lower().split())
+    )
+
+def network_event(remote_ip: str, remote_port: int, pid: Optional[int] = None, proc_name: str = '') -> BehaviorEvent:
+    """Event for an established outbound connection"""
+    return BehaviorEvent(NETWORK_CONNECT, f"{remote_ip}:{remote_port}",
+                         process_key=str(pid) if pid else UNATTRIBUTED, name=(proc_name or '').lower())
+
+def registry_event(key_path: str, value_name: str = '', deleted: bool = False) -> BehaviorEvent:
+    """Event for a registry value written or removed"""
+    key = normalize_registry_key(key_path)
+    if value_name:
+        key = f"{key}\\{value_name.lower()}"
+    return BehaviorEvent(REGISTRY_DELETE if deleted else REGISTRY_WRITE, key)
+
+class EventPattern:
+    """Compiled pattern of one rule or sequence step"""
+    
+    __slots__ = ('event_type', 'index_key', 'glob', 'directories', 'argument', 'reference')
+    
+    def __init__(self, event_type: str, index_key: Optional[str] = None, glob: Optional[str] = None,
+                 directories: Tuple[str, ...] = (), argument: str = '', reference: int = 0):
+        self.event_type = event_type
+        self.index_key = index_key
+        self.glob = glob
+        self.directories = directories
+        self.argument = argument
+        self.reference = reference
+    
+    def matches(self, event: BehaviorEvent, artifacts: Optional[List[str]] = None, indexed: bool = False) -> bool:
+        """Check the pattern's conditions; indexed when the index lookup already matched index_key"""
+        if event.event_type != self.event_type:
+            return False
+        if self.reference:
+            return bool(artifacts) and len(artifacts) >= self.reference and event.key == artifacts[self.reference - 1]
+        if self.index_key and not indexed and self.index_key not in event_index_keys(event):
+            return False
+        if self.glob and not fnmatch.fnmatchcase(event.name, self.glob):
+            return False
+        if self.directories:
+            folder = event.key.rsplit('\\', 1)[0] + '\\'
+            if not any(directory + '\\' in folder for directory in self.directories):
+                return False
+        if self.argument and self.argument not in event.command_line:
+            return False
+        return True
+
+def event_index_keys(event: BehaviorEvent) -> List[str]:
+    """Index keys an event can match: file name and extension, key prefixes, program, address"""
+    if event.event_type in FILE_EVENT_TYPES:
+        extension = os.path.splitext(event.name)[1]
+        return [f"name:{event.name}", f"ext:{extension}"] if extension else [f"name:{event.name}"]
+    
+    if event.event_type in REGISTRY_EVENT_TYPES:
+        parts = event.key.split('\\')
+        return ['reg:' + '\\'.join(parts[:depth]) for depth in range(1, len(parts) + 1)]
+    
+    if event.event_type == PROCESS_CREATE:
+        return ['image:' + (event.name or event.key.rsplit('\\', 1)[-1])]
+    
+    if event.event_type == NETWORK_CONNECT:
+        ip, _, port = event.key.rpartition(':')
+        return [f"ip:{ip}", f"port:{port}"]
+    
+    return []
+
+def expand_directory(directory: str) -> Tuple[str, ...]:
+    """Path fragments a rule directory (with %VARIABLES%) stands for"""
+    directory = normalize_path(directory).rstrip('\\')
+    variable = re.match(r'^(%\w+%)', directory)
+    if not variable:
+        return (directory,)
+    
+    rest = directory[len(variable.group(1)):]
+    alternatives = DIRECTORY_VARIABLES.get(variable.group(1))
+    if alternatives is None:
+        expanded = os.path.expandvars(variable.group(1))
+        alternatives = (normalize_path(expanded),) if expanded != variable.group(1) else ()
+    return tuple(alternative + rest for alternative in alternatives)
+
+def compile_pattern(event_type: str, pattern: str) -> Optional[EventPattern]:
+    """Compile a rule pattern, or None for descriptive patterns no monitor event can match"""
+    pattern = PATTERN_ALIASES.get(pattern.strip().lower(), pattern.strip())
+    
+    if pattern.startswith('@') and pattern[1:].isdigit():
+        return EventPattern(event_type, reference=int(pattern[1:]))
+    
+    if event_type in FILE_EVENT_TYPES:
+        name, _, directory = pattern.partition(' in ')
+        name = name.strip().lower()
+        if not name or ' ' in name:
+            return None
+        directories = expand_directory(directory.strip()) if directory.strip() else ()
+        if directory.strip() and not directories:
+            return None
+        
+        if not any(char in name for char in '*?['):
+            return EventPattern(event_type, f"name:{name}", directories=directories)
+        if name.startswith('*.') and not any(char in name[2:] for char in '*?['):
+            return EventPattern(event_type, f"ext:{name[1:]}", directories=directories)
+        return EventPattern(event_type, glob=name, directories=directories)
+    
+    if event_type in REGISTRY_EVENT_TYPES:
+        if not pattern.upper().startswith('HK'):
+            return None
+        return EventPattern(event_type, f"reg:{normalize_registry_key(pattern)}")
+    
+    if event_type == PROCESS_CREATE:
+        program, _, argument = pattern.lower().partition(' ')
+        if not PROGRAM_NAME.match(program):
+            return None
+        return EventPattern(event_type, f"image:{program}", argument=' '.join(argument.split()))
+    
+    if event_type == NETWORK_CONNECT:
+        ip, _, port = pattern.rpartition(':')
+        if port.isdigit() and ip in ('', '*'):
+            return EventPattern(event_type, f"port:{port}")
+        if ip and re.match(r'^[\d.]+$', ip) and port in ('*', ''):
+            return EventPattern(event_type, f"ip:{ip}")
+        return None
+    
+    return None
+
+class SequenceRule:
+    """Ordered event patterns that must all occur within a time window"""
+    
+    __slots__ = ('rule', 'steps', 'window')
+    
+    def __init__(self, rule: Dict[str, Any], steps: List[EventPattern], window: float):
+        self.rule = rule
+        self.steps = steps
+        self.window = window
+
+def compile_sequence(rule: Dict[str, Any]) -> Optional[SequenceRule]:
+    """Compile a SEQUENCE rule: 'TYPE:pattern -> TYPE:pattern ... within Ns'"""
+    match = SEQUENCE_PATTERN.match(rule['pattern'])
+    if not match:
+        return None
+    
+    steps = []
+    for step in match.group(1).split('->'):
+        event_type, _, pattern = step.strip().partition(':')
+        compiled = compile_pattern(event_type.strip().upper(), pattern)
+        if compiled is None or (not steps and compiled.reference):
+            return None
+        steps.append(compiled)
+    
+    return SequenceRule(rule, steps, float(match.group(2))) if len(steps) > 1 else None
+
+class RuleIndex:
+    """Compiled rules keyed by (event type, index key); unindexable globs are kept per event type"""
+    
+    def __init__(self, behavior_rules: Dict[str, List[Dict[str, Any]]]):
+        self.keyed: Dict[Tuple[str, str], List[Tuple[EventPattern, Any]]] = {}
+        self.unkeyed: Dict[str, List[Tuple[EventPattern, Any]]] = {}
+        self.rule_count = 0
+        self.sequence_count = 0
+        self.descriptive_count = 0
+        
+        for behavior_type, rules in behavior_rules.items():
+            for rule in rules:
+                if behavior_type == SEQUENCE_RULE_TYPE:
+                    target = compile_sequence(rule)
+                    pattern = target.steps[0] if target else None
+                else:
+                    pattern = compile_pattern(behavior_type, rule['pattern'])
+                    target = rule
+                
+                if pattern is None:
+                    # Left to the dedicated detectors (ransomware, telemetry, AI)
+                    self.descriptive_count += 1
+                    continue
+                
+                if pattern.index_key:
+                    self.keyed.setdefault((pattern.event_type, pattern.index_key), []).append((pattern, target))
+                else:
+                    self.unkeyed.setdefault(pattern.event_type, []).append((pattern, target))
+                
+                if isinstance(target, SequenceRule):
+                    self.sequence_count += 1
+                else:
+                    self.rule_count += 1
+    
+    def candidates(self, event: BehaviorEvent) -> List[Tuple[EventPattern, Any]]:
+        """Rules whose key field matches the event, before their remaining conditions"""
+        found = []
+        for index_key in event_index_keys(event):
+            found.extend(self.keyed.get((event.event_type, index_key), ()))
+        found.extend(self.unkeyed.get(event.event_type, ()))
+        return found
+
+class SequenceMatch:
+    """Partially matched sequence owned by one process"""
+    
+    __slots__ = ('sequence', 'step', 'deadline', 'artifacts', 'events')
+    
+    def __init__(self, sequence: SequenceRule, event: BehaviorEvent):
+        self.sequence = sequence
+        self.step = 1
+        self.deadline = event.timestamp + sequence.window
+        self.artifacts = [event.key]
+        self.events = [(event.event_type, event.key, event.process_key)]
+    
+    @property
+    def awaiting(self) -> str:
+        return self.sequence.steps[self.step].event_type
+
+class BehaviorRuleEngine:
+    """Evaluate behavioral rules over a stream of normalized monitor events"""
+    
+    def __init__(self, max_tracked_processes: int = 4096, max_partials_per_process: int = 64,
+                 match_cooldown: float = 300.0):
+        self.max_tracked_processes = max_tracked_processes
+        self.max_partials_per_process = max_partials_per_process
+        self.match_cooldown = match_cooldown
+        
+        self.index = RuleIndex({})
+        self.snapshot = None
+        self.lock = threading.Lock()
+        
+        # Partial sequences per owning process (LRU), and which owners wait on which event type
+        self.partials: 'OrderedDict[str, deque]' = OrderedDict()
+        self.awaiting: Dict[str, set] = {}
+        
+        # Recently reported (rule, key) pairs - polling monitors see the same state repeatedly
+        self.recent_matches: 'OrderedDict[Tuple[str, str], float]' = OrderedDict()
+        self.max_recent_matches = 4096
+        
+        self.events_processed = 0
+        self.matches_reported = 0
+        self.sequences_started = 0
+    
+    def load_rules(self, behavior_rules: Dict[str, List[Dict[str, Any]]]):
+        """Compile a new rule set and swap it in; partial sequences of the old rules are dropped"""
+        index = RuleIndex(behavior_rules)
+        with self.lock:
+            self.index = index
+            self.partials.clear()
+            self.awaiting.clear()
+    
+    def sync_rules(self, snapshot):
+        """Recompile when the signature updater has swapped in another snapshot"""
+        if snapshot is not self.snapshot:
+            self.load_rules(snapshot.behavior_rules)
+            self.snapshot = snapshot
+    
+    def process_event(self, event: BehaviorEvent) -> List[Dict[str, Any]]:
+        """Match one event, returning single-event and completed sequence matches"""
+        with self.lock:
+            self.events_processed += 1
+            matches = self.advance_sequences(event)
+            
+            for pattern, target in self.index.candidates(event):
+                if not pattern.matches(event, indexed=True):
+                    continue
+                if isinstance(target, SequenceRule):
+                    self.start_sequence(target, event)
+                else:
+                    matches.append(self.build_match(target, event))
+            
+            return [match for match in matches if self.report_once(match)]
+    
+    def start_sequence(self, sequence: SequenceRule, event: BehaviorEvent):
+        """Track the first step of a sequence under the event's process"""
+        partials = self.owner_partials(event.process_key)
+        for partial in partials:
+            if partial.sequence is sequence and partial.artifacts[0] == event.key and partial.step == 1:
+                partial.deadline = event.timestamp + sequence.window
+                return
+        
+        partial = SequenceMatch(sequence, event)
+        partials.append(partial)
+        self.awaiting.setdefault(partial.awaiting, set()).add(event.process_key)
+        self.sequences_started += 1
+    
+    def owner_partials(self, owner: str) -> deque:
+        """Bounded partial list of a process, evicting the least recently active process when full"""
+        partials = self.partials.get(owner)
+        if partials is None:
+            partials = self.partials[owner] = deque(maxlen=self.max_partials_per_process)
+            if len(self.partials) > self.max_tracked_processes:
+                self.forget_owner(next(iter(self.partials)))
+        else:
+            self.partials.move_to_end(owner)
+        return partials
+    
+    def forget_owner(self, owner: str):
+        """Drop all partial sequences of one process"""
+        self.partials.pop(owner, None)
+        for owners in self.awaiting.values():
+            owners.discard(owner)
+    
+    def forget_process(self, pid: Any):
+        """Release the sequence state of an exited process"""
+        with self.lock:
+            self.forget_owner(str(pid))
+    
+    def advance_sequences(self, event: BehaviorEvent) -> List[Dict[str, Any]]:
+        """Advance partial sequences the event can belong to"""
+        owners = {event.process_key, UNATTRIBUTED}
+        if event.parent_key:
+            owners.add(event.parent_key)
+        if event.process_key == UNATTRIBUTED:
+            # File and registry notifications carry no process, so any waiting process may own them
+            owners.update(self.awaiting.get(event.event_type, ()))
+        
+        matches = []
+        for owner in list(owners):
+            partials = self.partials.get(owner)
+            if not partials:
+                continue
+            
+            for partial in list(partials):
+                if partial.deadline < event.timestamp:
+                    partials.remove(partial)
+                    continue
+                # Later steps are not looked up through the index, so they check their own key
+                if not partial.sequence.steps[partial.step].matches(event, partial.artifacts):
+                    continue
+                
+                partials.remove(partial)
+                partial.step += 1
+                partial.artifacts.append(event.key)
+                partial.events.append((event.event_type, event.key, event.process_key))
+                
+                if partial.step == len(partial.sequence.steps):
+                    matches.append(self.build_match(partial.sequence.rule, event, partial))
+                    continue
+                
+                # A started program carries the sequence on as its own process
+                new_owner = event.process_key if event.event_type == PROCESS_CREATE else owner
+                self.owner_partials(new_owner).append(partial)
+                self.awaiting.setdefault(partial.awaiting, set()).add(new_owner)
+            
+            if not partials:
+                self.forget_owner(owner)
+        
+        return matches
+    
+    def build_match(self, rule: Dict[str, Any], event: BehaviorEvent,
+                    partial: Optional[SequenceMatch] = None) -> Dict[str, Any]:
+        """Match record for the watcher"""
+        match = {
+            'rule': rule['description'],
+            'behavior_type': rule['behavior_type'],
+            'pattern': rule['pattern'],
+            'severity': rule['severity'],
+            'category': rule['category'],
+            'event_type': event.event_type,
+            'key': event.key,
+            'process': event.name or event.process_key,
+            'timestamp': event.timestamp
+        }
+        if partial:
+            match['sequence'] = [{'event_type': event_type, 'key': key, 'process': process}
+                                 for event_type, key, process in partial.events]
+        return match
+    
+    def report_once(self, match: Dict[str, Any]) -> bool:
+        """Suppress a rule firing again for the same key within the cooldown"""
+        dedup_key = (match['rule'], match['key'])
+        last = self.recent_matches.get(dedup_key)
+        if last is not None and match['timestamp'] - last < self.match_cooldown:
+            return False
+        
+        self.recent_matches[dedup_key] = match['timestamp']
+        self.recent_matches.move_to_end(dedup_key)
+        if len(self.recent_matches) > self.max_recent_matches:
+            self.recent_matches.popitem(last=False)
+        self.matches_reported += 1
+        return True
+    
+    def get_engine_status(self) -> Dict[str, Any]:
+        """Rule and state counters"""
+        with self.lock:
+            return {
+                'rules': self.index.rule_count,
+                'sequences': self.index.sequence_count,
+                'descriptive_rules': self.index.descriptive_count,
+                'events_processed': self.events_processed,
+                'matches_reported': self.matches_reported,
+                'sequences_started': self.sequences_started,
+                'tracked_processes': len(self.partials),
+                'partial_sequences': sum(len(partials) for partials in self.partials.values())
+            }
+
+def test_behavior_rule_engine():
+    """Run the shipped rules over a dropper scenario and check indexing and state bounds"""
+    from signature_database import SignatureSnapshot
+    
+    engine = BehaviorRuleEngine(max_tracked_processes=100, max_partials_per_process=4)
+    snapshot = SignatureSnapshot()
+    engine.sync_rules(snapshot)
+    status = engine.get_engine_status()
+    assert status['sequences'] >= 1 and status['rules'] >= 10, status
+    
+    now = time.time()
+    dropped = 'C:\\Users\\alice\\AppData\\Local\\Temp\\upd4te.exe'
+    
+    # Dropped executable in temp (single rule + sequence start)
+    matches = engine.process_event(file_event('created', dropped))
+    assert [match['rule'] for match in matches] == ['Executable Creation in Temp Directory'], matches
+    
+    # The dropped file runs, then its Run key value appears
+    engine.process_event(process_event(ProcessRecord.from_info({'pid': 4242, 'ppid': 1000, 'name': 'upd4te.exe', 'exe': dropped,
+                                                                'cmdline': [dropped, '/silent']})))
+    matches = engine.process_event(registry_event(
+        'HKEY_CURRENT_USER\\Software\\Microsoft\\Windows\\CurrentVersion\\Run', 'Updater'))
+    rules = {match['rule'] for match in matches}
+    assert {'User Startup Persistence', 'Dropped Executable Startup Persistence'} <= rules, rules
+    sequence = next(match for match in matches if 'sequence' in match)['sequence']
+    assert [step['event_type'] for step in sequence] == [FILE_CREATION, PROCESS_CREATE, REGISTRY_WRITE]
+    # The HKLM Run and Services sequences need their own keys, not the HKCU Run key
+    assert [match['rule'] for match in matches if 'sequence' in match] == ['Dropped Executable Startup Persistence']
+    
+    # Steps outside the window do not complete a sequence
+    stale = file_event('created', dropped.replace('upd4te', 'other'))
+    stale.timestamp = now - 1000
+    engine.process_event(stale)
+    engine.process_event(process_event(ProcessRecord.from_info({'pid': 4343, 'name': 'other.exe', 'exe': stale.key, 'cmdline': []})))
+    matches = engine.process_event(registry_event('HKCU\\Software\\Microsoft\\Windows\\CurrentVersion\\Run', 'x'))
+    assert not any('sequence' in match for match in matches), matches
+    
+    # An unrelated key does not complete any sequence of a dropped, started program
+    second = dropped.replace('upd4te', 'setup2')
+    engine.process_event(file_event('created', second))
+    engine.process_event(process_event(ProcessRecord.from_info({'pid': 4244, 'ppid': 1000, 'name': 'setup2.exe',
+                                                                'exe': second, 'cmdline': [second]})))
+    matches = engine.process_event(registry_event('HKEY_CURRENT_USER\\Software\\SomeVendor\\Settings', 'theme'))
+    assert not any('sequence' in match for match in matches), matches
+    matches = engine.process_event(registry_event('HKLM\\Software\\Microsoft\\Windows\\CurrentVersion\\Run', 'Setup2'))
+    assert [match['rule'] for match in matches if 'sequence' in match] == ['Dropped Executable Machine Persistence'], matches
+    
+    # Process rules need the program and its arguments; unrelated events hit no rules
+    hidden = engine.process_event(process_event(ProcessRecord.from_info({'pid': 77, 'name': 'powershell.exe', 'exe': 'C:\\Windows\\powershell.exe',
+                                                                         'cmdline': ['powershell.exe', '-WindowStyle', 'Hidden', '-c', 'x']})))
+    assert [match['rule'] for match in hidden] == ['Hidden PowerShell Execution'], hidden
+    assert not engine.process_event(process_event(ProcessRecord.from_info({'pid': 78, 'name': 'powershell.exe', 'cmdline': ['powershell.exe']})))
+    assert not engine.process_event(file_event('modified', 'C:\\Users\\alice\\notes.txt'))
+    assert engine.process_event(file_event('modified', 'C:\\Windows\\System32\\drivers\\etc\\hosts'))
+    
+    # Per-process state stays bounded under a flood of drops
+    start = time.perf_counter()
+    for i in range(20000):
+        engine.process_event(file_event('created', f"C:\\Temp\\flood{i}.exe"))
+        engine.process_event(process_event(ProcessRecord.from_info({'pid': 10000 + i, 'name': f"flood{i}.exe",
+                                                                    'exe': f"C:\\Temp\\flood{i}.exe", 'cmdline': []})))
+    elapsed = time.perf_counter() - start
+    status = engine.get_engine_status()
+    assert status['tracked_processes'] <= 101 and status['partial_sequences'] <= 101 * 4, status
+    
+    print(f"✅ Behavior rule engine OK - {status['rules']} rules, {status['sequences']} sequences, "
+          f"{status['descriptive_rules']} descriptive; {40000 / elapsed:.0f} events/s, "
+          f"{status['tracked_processes']} processes tracked")
+    snapshot.close()
+
+if __name__ == "__main__":
+    test_behavior_rule_engine()
\ No newline at end of file
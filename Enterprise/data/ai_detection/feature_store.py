@@ -0,0 +1,146 @@
+"""
+Columnar Feature Store
+Float32 feature blobs in SQLite and memory-mapped training matrices on disk
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+import numpy as np
+
+FEATURE_DTYPE = np.float32
+
+# Fixed column order of the feature vectors stored per table
+PATTERN_FEATURE_COUNT = 10
+STATIC_FEATURE_FIELDS = ('file_size', 'entropy', 'pe_sections', 'imports_count', 'exports_count')
+BEHAVIOR_FEATURE_FIELDS = ('file_operations', 'network_connections', 'registry_modifications',
+                           'process_injections', 'api_calls')
+
+def encode_features(values: Iterable[float]) -> bytes:
+    """Pack a feature vector as a contiguous float32 blob"""
+    return np.asarray(list(values), dtype=FEATURE_DTYPE).tobytes()
+
+def encode_fields(values: Dict[str, Any], fields: Tuple[str, ...]) -> bytes:
+    """Pack named features in a fixed column order"""
+    return encode_features(values.get(field, 0) for field in fields)
+
+def decode_features(blobs: List[bytes], width: int) -> np.ndarray:
+    """Decode many float32 blobs into one (rows, width) matrix with a single frombuffer"""
+    if not blobs:
+        return np.zeros((0, width), dtype=FEATURE_DTYPE)
+    return np.frombuffer(b''.join(blobs), dtype=FEATURE_DTYPE).reshape(-1, width)
+
+class FeatureStore:
+    """Append-only, memory-mapped feature matrices synced from the learning database"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def _paths(self, name: str) -> Tuple[str, str, str]:
+        """Feature, label and metadata file paths of a dataset"""
+        base = os.path.join(self.directory, name)
+        return f"{base}.features.f32", f"{base}.labels.i32", f"{base}.meta.json"
+    
+    def load_meta(self, name: str) -> Dict[str, Any]:
+        """Dataset metadata (width, row count, last synced row id, label classes)"""
+        _, _, meta_path = self._paths(name)
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'width': None, 'rows': 0, 'last_id': 0, 'classes': []}
+    
+    def save_meta(self, name: str, meta: Dict[str, Any]):
+        """Write metadata atomically"""
+        _, _, meta_path = self._paths(name)
+        temp_path = f"{meta_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, meta_path)
+    
+    def reset(self, name: str):
+        """Drop a dataset so the next sync rebuilds it"""
+        for path in self._paths(name):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def append(self, name: str, features: np.ndarray, labels: List[Any], last_id: int,
+               query_hash: Optional[str] = None):
+        """Append rows and their labels to a dataset"""
+        meta = self.load_meta(name)
+        width = features.shape[1]
+        if meta['width'] not in (None, width):
+            raise ValueError(f"{name}: feature width {width} does not match stored width {meta['width']}")
+        
+        # Labels are stored as int32 codes into the class list
+        class_index = {label: code for code, label in enumerate(meta['classes'])}
+        codes = np.empty(len(labels), dtype=np.int32)
+        for i, label in enumerate(labels):
+            code = class_index.get(label)
+            if code is None:
+                code = class_index[label] = len(meta['classes'])
+                meta['classes'].append(label)
+            codes[i] = code
+        
+        features_path, labels_path, _ = self._paths(name)
+        with open(features_path, 'ab') as f:
+            f.write(np.ascontiguousarray(features, dtype=FEATURE_DTYPE).tobytes())
+        with open(labels_path, 'ab') as f:
+            f.write(codes.tobytes())
+        
+        meta.update({'width': width, 'rows': meta['rows'] + len(codes), 'last_id': last_id})
+        if query_hash is not None:
+            meta['query'] = query_hash
+        self.save_meta(name, meta)
+    
+    def load(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Memory-map a dataset's feature matrix and decode its labels"""
+        meta = self.load_meta(name)
+        features_path, labels_path, _ = self._paths(name)
+        if not meta['rows'] or not os.path.exists(features_path):
+            return np.zeros((0, meta['width'] or 0), dtype=FEATURE_DTYPE), np.array([])
+        
+        features = np.memmap(features_path, dtype=FEATURE_DTYPE, mode='r',
+                             shape=(meta['rows'], meta['width']))
+        codes = np.fromfile(labels_path, dtype=np.int32, count=meta['rows'])
+        labels = np.asarray(meta['classes'])[codes]
+        return features, labels
+    
+    def sync(self, conn: sqlite3.Connection, name: str, query: str, widths: Tuple[int, ...],
+             params: tuple = ()) -> int:
+        """Append database rows newer than the last synced id; returns rows added"""
+        # query selects (id, blob..., label) ordered by id with `id > ?` as its first parameter
+        meta = self.load_meta(name)
+        features_path, _, _ = self._paths(name)
+        
+        # Rows synced by an earlier query may be ones the current query excludes (such as
+        # held-out rows), so a dataset built by a different query is rebuilt from scratch
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        if meta['rows'] and (meta.get('query') != query_hash or not os.path.exists(features_path) or
+                             os.path.getsize(features_path) != meta['rows'] * meta['width'] * 4):
+            self.reset(name)
+            meta = self.load_meta(name)
+        
+        rows = conn.execute(query, (meta['last_id'],) + tuple(params)).fetchall()
+        if not rows:
+            return 0
+        
+        columns = list(zip(*rows))
+        blocks = [decode_features(list(blobs), width) for blobs, width in zip(columns[1:-1], widths)]
+        features = np.hstack(blocks) if len(blocks) > 1 else blocks[0]
+        
+        self.append(name, features, list(columns[-1]), int(columns[0][-1]), query_hash)
+        return len(rows)
+    
+    def get_store_status(self) -> Dict[str, Any]:
+        """Row counts of every dataset"""
+        status = {}
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.meta.json'):
+                name = filename[:-len('.meta.json')]
+                meta = self.load_meta(name)
+                status[name] = {'rows': meta['rows'], 'width': meta['width'], 'last_id': meta['last_id']}
+        return status
\ No newline at end of file
@@ -0,0 +1,394 @@
+"""
+Compiled Malware Hash Database
+Sorted raw digests per hash type in one memory-mapped file, fronted by Bloom filters
+"""
+
+import os
+import mmap
+import json
+import struct
+import sqlite3
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+import numpy as np
+
+SIGNATURES_DIRECTORY = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'signatures'))
+DEFAULT_HASH_TEXT = os.path.join(SIGNATURES_DIRECTORY, 'malware_hashes.txt')
+DEFAULT_HASH_DATABASE = os.path.join(SIGNATURES_DIRECTORY, 'malware_hashes.hdb')
+
+# The self-learning AI's database; anchored here so the GUI and the watcher compile from the same file
+LEARNING_DATABASE = os.path.normpath(os.path.join(SIGNATURES_DIRECTORY, '..', 'ai_learning_system.db'))
+
+# Digest width in bytes per hash type (text-file names and learner indicator types)
+HASH_WIDTHS = {'md5': 16, 'sha1': 20, 'sha256': 32}
+LEARNED_HASH_TYPES = {'hash_md5': 'md5', 'hash_sha1': 'sha1', 'hash_sha256': 'sha256'}
+
+# File layout: header, one section entry per hash type, then 8-byte aligned data blocks
+#   header:  magic, format version, section count, labels offset, labels length
+#   section: hash type, width, count, digests offset, label ids offset, bloom offset, bloom bits, bloom hashes
+HEADER = struct.Struct('<4sHHQQ')
+SECTION = struct.Struct('<8sIQQQQQI')
+BLOOM_SEEDS = struct.Struct('<II')
+SORT_KEY = struct.Struct('>Q')
+LABEL_ID = struct.Struct('<I')
+MAGIC = b'MHDB'
+FORMAT_VERSION = 1
+
+# ~1% false positives at 10 bits and 7 probes per digest
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_HASHES = 7
+
+def bloom_positions(digest: bytes, bits: int, hashes: int) -> List[int]:
+    """Bit positions for a digest; digests are already uniform, so their bytes seed the probes"""
+    h1, h2 = BLOOM_SEEDS.unpack_from(digest)
+    h2 |= 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+def read_hash_text(path: str, rejected: Optional[List[str]] = None) -> Iterable[Tuple[str, bytes, str, str, int]]:
+    """(hash type, digest, name, family, severity) from HASH_TYPE:HASH:NAME:FAMILY:SEVERITY lines"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            parts = line.split(':')
+            hash_type = parts[0].lower()
+            try:
+                digest = bytes.fromhex(parts[1])
+                severity = int(parts[4]) if len(parts) > 4 else 5
+            except (IndexError, ValueError):
+                digest, severity = b'', 0
+            
+            # Entries with a digest of the wrong length for their type are skipped, not truncated
+            if len(digest) != HASH_WIDTHS.get(hash_type):
+                if rejected is not None:
+                    rejected.append(line)
+                continue
+            
+            yield hash_type, digest, parts[2] if len(parts) > 2 else 'Unknown', \
+                parts[3] if len(parts) > 3 else 'Unknown', severity
+
+def read_learned_hashes(database: str, min_accuracy: float = 0.8) -> Iterable[Tuple[str, bytes, str, str, int]]:
+    """Validated hash indicators the self-learning AI has recorded in threat_patterns"""
+    # Rows are scraped from web pages; unvalidated ones reach detection only through the IOC store,
+    # where scraped indicators need a higher confidence to count
+    conn = sqlite3.connect(database)
+    try:
+        cursor = conn.execute('''
+            SELECT pattern_type, pattern_value, source, threat_level
+            FROM threat_patterns
+            WHERE pattern_type IN ('hash_md5', 'hash_sha1', 'hash_sha256') AND pattern_value IS NOT NULL
+                AND validated = 1 AND accuracy >= ?
+        ''', (min_accuracy,))
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            for pattern_type, value, source, threat_level in rows:
+                hash_type = LEARNED_HASH_TYPES[pattern_type]
+                try:
+                    digest = bytes.fromhex(value)
+                except ValueError:
+                    continue
+                if len(digest) == HASH_WIDTHS[hash_type]:
+                    yield hash_type, digest, 'Learned_Indicator', source or 'Unknown', int(threat_level or 5)
+    finally:
+        conn.close()
+
+def compile_hash_database(output_path: str, sources: Iterable[Iterable[Tuple[str, bytes, str, str, int]]]) -> Dict[str, Any]:
+    """Compile hash entries into a sorted, deduplicated, Bloom-fronted database file"""
+    digests = {hash_type: bytearray() for hash_type in HASH_WIDTHS}
+    label_ids = {hash_type: [] for hash_type in HASH_WIDTHS}
+    severities = {hash_type: [] for hash_type in HASH_WIDTHS}
+    labels = {}
+    
+    for source in sources:
+        for hash_type, digest, name, family, severity in source:
+            label = labels.setdefault((name, family, severity), len(labels))
+            digests[hash_type] += digest
+            label_ids[hash_type].append(label)
+            severities[hash_type].append(severity)
+    
+    sections = []
+    for hash_type, width in HASH_WIDTHS.items():
+        keys = np.frombuffer(bytes(digests[hash_type]), dtype=f'S{width}')
+        ids = np.asarray(label_ids[hash_type], dtype=np.uint32)
+        
+        # Sort by digest, highest severity first, then keep one entry per digest
+        order = np.lexsort((-np.asarray(severities[hash_type], dtype=np.int64), keys))
+        keys, ids = keys[order], ids[order]
+        if len(keys):
+            first = np.concatenate([[True], keys[1:] != keys[:-1]])
+            keys, ids = keys[first], ids[first]
+        
+        bloom_bits = max(64, len(keys) * BLOOM_BITS_PER_ENTRY)
+        bloom = np.zeros((bloom_bits + 7) // 8, dtype=np.uint8)
+        if len(keys):
+            # Same probes as bloom_positions; 32-bit seeds keep the sums exact in uint64
+            raw = np.frombuffer(keys.tobytes(), dtype=np.uint8).reshape(-1, width)
+            h1 = raw[:, :4].copy().view('<u4').ravel().astype(np.uint64)
+            h2 = raw[:, 4:8].copy().view('<u4').ravel().astype(np.uint64) | np.uint64(1)
+            for i in range(BLOOM_HASHES):
+                positions = ((h1 + np.uint64(i) * h2) % np.uint64(bloom_bits)).astype(np.int64)
+                np.bitwise_or.at(bloom, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        
+        sections.append((hash_type, width, keys, ids, bloom, bloom_bits))
+    
+    labels_json = json.dumps([list(label) for label in sorted(labels, key=labels.get)]).encode('utf-8')
+    
+    # Lay out data blocks after the header and section table
+    def aligned(offset: int) -> int:
+        return (offset + 7) & ~7
+    
+    offset = aligned(HEADER.size + SECTION.size * len(sections))
+    entries = []
+    for hash_type, width, keys, ids, bloom, bloom_bits in sections:
+        digests_offset = offset
+        ids_offset = aligned(digests_offset + len(keys) * width)
+        bloom_offset = aligned(ids_offset + len(ids) * 4)
+        offset = aligned(bloom_offset + len(bloom))
+        entries.append((digests_offset, ids_offset, bloom_offset))
+    labels_offset = offset
+    
+    # Write to a temporary file and swap it in, so readers never map a half-written database
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), labels_offset, len(labels_json)))
+        for (hash_type, width, keys, ids, bloom, bloom_bits), (digests_offset, ids_offset, bloom_offset) in zip(sections, entries):
+            f.write(SECTION.pack(hash_type.encode(), width, len(keys), digests_offset, ids_offset,
+                                 bloom_offset, bloom_bits, BLOOM_HASHES))
+        for (hash_type, width, keys, ids, bloom, bloom_bits), block_offsets in zip(sections, entries):
+            for block, block_offset in zip((keys.tobytes(), ids.astype('<u4').tobytes(), bloom.tobytes()), block_offsets):
+                f.write(b'\0' * (block_offset - f.tell()))
+                f.write(block)
+        f.write(b'\0' * (labels_offset - f.tell()))
+        f.write(labels_json)
+    os.replace(temp_path, output_path)
+    
+    return {
+        'path': output_path,
+        'bytes': os.path.getsize(output_path),
+        'entries': {hash_type: len(keys) for hash_type, _, keys, _, _, _ in sections},
+        'labels': len(labels)
+    }
+
+class HashSection:
+    """Sorted digests of one hash type inside the mapped file"""
+    
+    def __init__(self, buffer: mmap.mmap, hash_type: str, width: int, count: int,
+                 digests_offset: int, ids_offset: int, bloom_offset: int, bloom_bits: int, bloom_hashes: int):
+        self.buffer = buffer
+        self.hash_type = hash_type
+        self.width = width
+        self.count = count
+        self.digests_offset = digests_offset
+        self.ids_offset = ids_offset
+        self.bloom_offset = bloom_offset
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+    
+    def might_contain(self, digest: bytes) -> bool:
+        """Bloom filter test (no false negatives)"""
+        # Walks the bloom_positions sequence incrementally and stops at the first clear bit,
+        # so most misses cost one or two byte reads
+        buffer, base, bits = self.buffer, self.bloom_offset, self.bloom_bits
+        h1, h2 = BLOOM_SEEDS.unpack_from(digest)
+        position, step = h1 % bits, (h2 | 1) % bits
+        for _ in range(self.bloom_hashes):
+            if not buffer[base + (position >> 3)] >> (position & 7) & 1:
+                return False
+            position = (position + step) % bits
+        return True
+    
+    def digest_at(self, index: int) -> bytes:
+        """Digest stored at a sorted position"""
+        start = self.digests_offset + index * self.width
+        return self.buffer[start:start + self.width]
+    
+    def find(self, digest: bytes) -> int:
+        """Sorted position of a digest, or -1"""
+        # Digests are uniformly distributed, so interpolating on the leading 8 bytes lands
+        # within a few slots; fall back to bisection if interpolation stops converging
+        buffer, base, width = self.buffer, self.digests_offset, self.width
+        key = SORT_KEY.unpack_from(digest)[0]
+        low, high = 0, self.count - 1
+        low_key = SORT_KEY.unpack_from(buffer, base)[0]
+        high_key = SORT_KEY.unpack_from(buffer, base + high * width)[0]
+        steps = 0
+        
+        while low <= high:
+            if key < low_key or key > high_key:
+                return -1
+            if steps < 8 and high_key > low_key:
+                middle = low + (key - low_key) * (high - low) // (high_key - low_key)
+            else:
+                middle = (low + high) // 2
+            steps += 1
+            
+            # Keys of probed digests bound the remaining range from outside
+            start = base + middle * width
+            value = buffer[start:start + width]
+            if value == digest:
+                return middle
+            if value < digest:
+                low, low_key = middle + 1, SORT_KEY.unpack_from(value)[0]
+            else:
+                high, high_key = middle - 1, SORT_KEY.unpack_from(value)[0]
+        
+        return -1
+    
+    def label_id(self, index: int) -> int:
+        """Label id stored alongside a digest"""
+        return LABEL_ID.unpack_from(self.buffer, self.ids_offset + index * LABEL_ID.size)[0]
+
+class HashDatabase:
+    """Read-only, memory-mapped view of a compiled hash database"""
+    
+    def __init__(self, path: str, buffer: Optional[mmap.mmap] = None, offset: int = 0):
+        # A database embedded in a larger mapped file (a signature bundle) shares that file's map
+        self.path = path
+        self.offset = offset
+        self.file = None if buffer is not None else open(path, 'rb')
+        self.buffer = buffer if buffer is not None else mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, section_count, labels_offset, labels_length = HEADER.unpack_from(self.buffer, offset)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} hash database")
+        
+        # Sections are keyed by digest width, which identifies the hash type
+        self.sections = {}
+        for i in range(section_count):
+            hash_type, width, count, digests_offset, ids_offset, bloom_offset, bloom_bits, bloom_hashes = \
+                SECTION.unpack_from(self.buffer, offset + HEADER.size + i * SECTION.size)
+            section = HashSection(self.buffer, hash_type.rstrip(b'\0').decode(), width, count, offset + digests_offset,
+                                  offset + ids_offset, offset + bloom_offset, bloom_bits, bloom_hashes)
+            self.sections[section.width] = section
+        
+        labels_offset += offset
+        self.labels = json.loads(self.buffer[labels_offset:labels_offset + labels_length].decode('utf-8'))
+    
+    @classmethod
+    def open_or_compile(cls, path: str = DEFAULT_HASH_DATABASE, text_path: str = DEFAULT_HASH_TEXT,
+                        learning_database: Optional[str] = None) -> 'HashDatabase':
+        """Open a compiled database, recompiling it first if the text source is newer"""
+        if not os.path.exists(path) or (os.path.exists(text_path) and
+                                        os.path.getmtime(text_path) > os.path.getmtime(path)):
+            sources = [read_hash_text(text_path)] if os.path.exists(text_path) else []
+            if learning_database and os.path.exists(learning_database):
+                sources.append(read_learned_hashes(learning_database))
+            compile_hash_database(path, sources)
+        return cls(path)
+    
+    def lookup(self, hex_digest: str) -> Optional[Dict[str, Any]]:
+        """Entry for a hex MD5, SHA-1 or SHA-256 digest, or None"""
+        try:
+            digest = bytes.fromhex(hex_digest)
+        except (TypeError, ValueError):
+            return None
+        
+        section = self.sections.get(len(digest))
+        if section is None or not section.count or not section.might_contain(digest):
+            return None
+        
+        index = section.find(digest)
+        if index < 0:
+            return None
+        
+        name, family, severity = self.labels[section.label_id(index)]
+        return {'hash_type': section.hash_type, 'name': name, 'family': family, 'severity': severity}
+    
+    def contains(self, hex_digest: str) -> bool:
+        """Whether a hex digest is listed"""
+        return self.lookup(hex_digest) is not None
+    
+    def get_database_status(self) -> Dict[str, Any]:
+        """Entries per hash type and file size"""
+        return {
+            'path': self.path,
+            'bytes': len(self.buffer) - self.offset,
+            'entries': {section.hash_type: section.count for section in self.sections.values()}
+        }
+    
+    def close(self):
+        """Unmap the database file (an embedded database leaves that to its owner)"""
+        if self.file is not None:
+            self.buffer.close()
+            self.file.close()
+
+# Test function
+def test_hash_database():
+    """Compile a multi-million-entry database and check lookups, false positives and speed"""
+    import time
+    import tempfile
+    import hashlib
+    
+    rejected = []
+    text_entries = list(read_hash_text(DEFAULT_HASH_TEXT, rejected))
+    
+    # Only validated, high-accuracy learned hashes are compiled in
+    learning_database = os.path.join(tempfile.mkdtemp(), 'learning.db')
+    conn = sqlite3.connect(learning_database)
+    conn.execute('''CREATE TABLE threat_patterns (pattern_type TEXT, pattern_value TEXT, source TEXT,
+                    threat_level INTEGER, accuracy REAL, validated BOOLEAN DEFAULT 0)''')
+    conn.executemany('INSERT INTO threat_patterns VALUES (?, ?, ?, ?, ?, ?)', [
+        ('hash_md5', 'aa' * 16, 'https://blog.example/post', 7, 0.5, 0),
+        ('hash_md5', 'bb' * 16, 'https://abuse.ch/feed', 8, 0.9, 0),
+        ('hash_md5', 'cc' * 16, 'https://abuse.ch/feed', 8, 0.9, 1),
+        ('hash_md5', 'dd' * 16, 'https://blog.example/post', 7, 0.5, 1)
+    ])
+    conn.commit()
+    conn.close()
+    assert [digest.hex() for _, digest, _, _, _ in read_learned_hashes(learning_database)] == ['cc' * 16]
+    
+    # Synthetic feed of unique SHA-256 and MD5 digests
+    rng = np.random.default_rng(11)
+    sha256_digests = rng.integers(0, 256, size=(2_000_000, 32), dtype=np.uint8)
+    md5_digests = rng.integers(0, 256, size=(500_000, 16), dtype=np.uint8)
+    feed = ([('sha256', row.tobytes(), 'Synthetic', 'Feed', 5) for row in sha256_digests] +
+            [('md5', row.tobytes(), 'Synthetic', 'Feed', 5) for row in md5_digests])
+    
+    path = os.path.join(tempfile.mkdtemp(), 'malware_hashes.hdb')
+    start = time.perf_counter()
+    summary = compile_hash_database(path, [text_entries, feed])
+    compile_seconds = time.perf_counter() - start
+    
+    database = HashDatabase(path)
+    for hash_type, digest, name, family, severity in text_entries:
+        entry = database.lookup(digest.hex())
+        assert entry and entry['hash_type'] == hash_type
+    assert database.lookup('db349b97c37d22f5ea1d1841e3c89eb4')['name'] == 'WannaCry'
+    
+    hits = [row.tobytes().hex() for row in sha256_digests[:: 1000]]
+    assert all(database.contains(value) for value in hits)
+    
+    misses = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(100000)]
+    start = time.perf_counter()
+    false_positives = sum(database.contains(value) for value in misses)
+    miss_us = (time.perf_counter() - start) / len(misses) * 1e6
+    
+    start = time.perf_counter()
+    for value in hits * 10:
+        database.lookup(value)
+    hit_us = (time.perf_counter() - start) / (len(hits) * 10) * 1e6
+    
+    assert false_positives == 0
+    print(f"✅ Hash database OK - {sum(summary['entries'].values())} digests, {summary['bytes'] // 1024 // 1024} MB, "
+          f"compiled in {compile_seconds:.1f}s, {len(rejected)} malformed text entries skipped")
+    print(f"   miss {miss_us:.2f} µs, hit {hit_us:.2f} µs per lookup")
+    database.close()
+
+def main():
+    """Compile the signature hash list (plus learned indicators) into the binary database"""
+    rejected = []
+    sources = [read_hash_text(DEFAULT_HASH_TEXT, rejected)]
+    if os.path.exists(LEARNING_DATABASE):
+        sources.append(read_learned_hashes(LEARNING_DATABASE))
+    
+    summary = compile_hash_database(DEFAULT_HASH_DATABASE, sources)
+    print(f"💾 Compiled {sum(summary['entries'].values())} hashes into {summary['path']} ({summary['bytes']} bytes)")
+    for line in rejected:
+        print(f"⚠️ Skipped malformed entry: {line}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
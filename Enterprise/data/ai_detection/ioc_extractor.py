@@ -0,0 +1,163 @@
+"""
+Streaming IOC Extractor
+Single-pass, bounded-memory indicator extraction over text chunks
+"""
+
+import re
+from typing import Dict, List, Any, Iterable, Optional
+
+# One combined pattern - alternatives are tried left to right at each position,
+# so longer hash types come before shorter ones and URLs before domains/IPs.
+IOC_PATTERN = re.compile(r'''
+    (?P<url>https?://[^\s<>"{}|\\^`\[\]]{1,2048}[^\s<>"{}|\\^`\[\].,)])
+  | (?P<sha256>\b[a-fA-F0-9]{64}\b)
+  | (?P<sha1>\b[a-fA-F0-9]{40}\b)
+  | (?P<md5>\b[a-fA-F0-9]{32}\b)
+  | (?P<ip>\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b)
+  | (?P<domain>\b[a-zA-Z0-9][a-zA-Z0-9-]{0,61}[a-zA-Z0-9]?\.[a-zA-Z]{2,63}\b)
+''', re.VERBOSE)
+
+# Indicator type, per-source cap and confidence for each named group
+IOC_TYPES = {
+    'ip': ('ip', 50, 0.7),
+    'domain': ('domain', 30, 0.6),
+    'md5': ('hash_md5', 20, 0.9),
+    'sha1': ('hash_sha1', 20, 0.9),
+    'sha256': ('hash_sha256', 20, 0.9),
+    'url': ('url', 10, 0.8)
+}
+
+# Output order matches the historical extractor
+OUTPUT_ORDER = ('ip', 'domain', 'md5', 'sha1', 'sha256', 'url')
+
+# Skip common legitimate top-level domains
+COMMON_DOMAIN_SUFFIXES = ('.com', '.org', '.net', '.gov', '.edu')
+
+# Characters that can appear inside a token; carry-over never starts inside a run of these
+TOKEN_CHARACTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.-_:/%?=&#+~@!$*\',;')
+
+class IOCExtractionSession:
+    """Incremental extraction state for one source"""
+    
+    def __init__(self, source_url: str, caps: Dict[str, int], overlap: int):
+        self.source_url = source_url
+        self.caps = caps
+        self.overlap = overlap
+        self.carry = ''
+        self.seen = set()
+        self.found = {group: [] for group in OUTPUT_ORDER}
+        self.remaining = sum(1 for cap in caps.values() if cap > 0)
+        self.done = self.remaining == 0
+    
+    def feed(self, text: str) -> bool:
+        """Scan a chunk of text; returns True once every per-type cap is met"""
+        if self.done:
+            return True
+        
+        buffer = self.carry + text
+        self._scan(buffer, final=False)
+        return self.done
+    
+    def close(self) -> List[Dict[str, Any]]:
+        """Scan remaining carry-over and return indicators"""
+        if not self.done and self.carry:
+            self._scan(self.carry, final=True)
+        self.carry = ''
+        return self.indicators()
+    
+    def _scan(self, buffer: str, final: bool):
+        """Match a buffer, deferring matches that may continue in the next chunk"""
+        limit = len(buffer) if final else len(buffer) - self.overlap
+        last_end = 0
+        cut = None
+        
+        for match in IOC_PATTERN.finditer(buffer):
+            if match.end() > limit:
+                cut = match.start()
+                break
+            
+            self._accept(match)
+            last_end = match.end()
+            
+            if self.done:
+                self.carry = ''
+                return
+        
+        if final:
+            self.carry = ''
+            return
+        
+        if cut is None:
+            cut = max(last_end, limit)
+            
+            # Back off so the carry-over never starts in the middle of a token
+            floor = max(last_end, limit - self.overlap)
+            while cut > floor and buffer[cut - 1] in TOKEN_CHARACTERS:
+                cut -= 1
+        
+        self.carry = buffer[cut:]
+    
+    def _accept(self, match):
+        """Record a match if it is new and its type is under cap"""
+        group = match.lastgroup
+        found = self.found[group]
+        if len(found) >= self.caps.get(group, 0):
+            return
+        
+        value = match.group(group)
+        if group == 'domain' and value.lower().endswith(COMMON_DOMAIN_SUFFIXES):
+            return
+        
+        key = (group, value)
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        found.append(value)
+        
+        if len(found) >= self.caps.get(group, 0):
+            self.remaining -= 1
+            self.done = self.remaining == 0
+    
+    def indicators(self) -> List[Dict[str, Any]]:
+        """Indicators in the standard dict format"""
+        results = []
+        for group in OUTPUT_ORDER:
+            indicator_type, _, confidence = IOC_TYPES[group]
+            for value in self.found[group]:
+                results.append({
+                    'type': indicator_type,
+                    'value': value,
+                    'source': self.source_url,
+                    'confidence': confidence
+                })
+        return results
+
+class StreamingIOCExtractor:
+    """Extract threat indicators from streamed text in one pass"""
+    
+    def __init__(self, caps: Optional[Dict[str, int]] = None, overlap: int = 4096):
+        self.caps = {group: cap for group, (_, cap, _) in IOC_TYPES.items()}
+        if caps:
+            self.caps.update(caps)
+        
+        # Longest possible token must fit in the overlap (URLs are capped at ~2 KB)
+        self.overlap = overlap
+    
+    def session(self, source_url: str) -> IOCExtractionSession:
+        """Start incremental extraction for a source"""
+        return IOCExtractionSession(source_url, self.caps, self.overlap)
+    
+    def extract(self, chunks: Iterable[str], source_url: str) -> List[Dict[str, Any]]:
+        """Extract indicators from an iterable of text chunks, stopping early when caps are met"""
+        session = self.session(source_url)
+        for chunk in chunks:
+            if session.feed(chunk):
+                break
+        return session.close()
+    
+    def extract_text(self, content: str, source_url: str, chunk_size: int = 256 * 1024) -> List[Dict[str, Any]]:
+        """Extract indicators from a complete string"""
+        return self.extract(
+            (content[i:i + chunk_size] for i in range(0, len(content), chunk_size)),
+            source_url
+        )
\ No newline at end of file
@@ -0,0 +1,472 @@
+"""
+Unified IOC Store
+Typed indicator tables in SQLite with lock-free, incrementally refreshed lookup snapshots
+"""
+
+import time
+import socket
+import sqlite3
+import logging
+import threading
+import ipaddress
+from datetime import datetime
+from urllib.parse import urlsplit
+from typing import Dict, List, Any, Optional, Tuple
+
+# Digest length in bytes for each hash indicator type
+HASH_TYPES = {'hash_md5': 16, 'hash_sha1': 20, 'hash_sha256': 32}
+HASH_TYPE_BY_LENGTH = {length: hash_type for hash_type, length in HASH_TYPES.items()}
+HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+# Indicator types accepted from extractors and feeds, by table
+NETWORK_TYPES = ('ip', 'cidr')
+TABLE_COLUMNS = {
+    'ioc_networks': 'network',
+    'ioc_domains': 'domain',
+    'ioc_urls': 'url'
+}
+
+# Metadata kept per indicator in snapshots: (threat_level, confidence, source)
+IndicatorMeta = Tuple[int, float, str]
+
+# Source prefix of indicators harvested from web pages, as opposed to curated lists
+SCRAPED_SOURCE_PREFIX = 'scraped:'
+
+def parse_network(value: str) -> Optional[Tuple[int, int, int]]:
+    """(ip version, prefix length, network prefix bits) of an IP or CIDR, or None if invalid"""
+    try:
+        network = ipaddress.ip_network(value.strip(), strict=False)
+    except ValueError:
+        return None
+    prefix = network.prefixlen
+    return network.version, prefix, int(network.network_address) >> (network.max_prefixlen - prefix)
+
+def normalize_domain(value: str) -> str:
+    """Lower-case domain without a trailing dot"""
+    return value.strip().lower().rstrip('.')
+
+class IOCSnapshot:
+    """Immutable lookup indexes over one generation of the store"""
+    
+    def __init__(self, generation: int = 0, networks: Dict = None, domains: Dict = None,
+                 urls: Dict = None, hashes: Dict = None):
+        self.generation = generation
+        
+        # (ip version, prefix length) -> {network prefix bits: meta}; probed longest prefix first
+        self.networks = networks or {}
+        self.prefix_lengths = {
+            version: sorted((prefix for v, prefix in self.networks if v == version), reverse=True)
+            for version in (4, 6)
+        }
+        
+        # Domain -> meta; a lookup probes each parent suffix of the queried name
+        self.domains = domains or {}
+        self.urls = urls or {}
+        
+        # Hash type -> {raw digest: meta}
+        self.hashes = hashes or {hash_type: {} for hash_type in HASH_TYPES}
+    
+    def lookup_ip(self, value: str) -> Optional[Tuple[str, IndicatorMeta]]:
+        """Longest listed network containing an address"""
+        # Dotted-quad IPv4 is parsed in C; everything else goes through ipaddress
+        try:
+            bits = int.from_bytes(socket.inet_pton(socket.AF_INET, value), 'big')
+            version, width = 4, 32
+        except (OSError, ValueError, TypeError):
+            try:
+                address = ipaddress.ip_address(value.strip())
+            except ValueError:
+                return None
+            bits, version, width = int(address), address.version, address.max_prefixlen
+        
+        for prefix in self.prefix_lengths[version]:
+            meta = self.networks[(version, prefix)].get(bits >> (width - prefix))
+            if meta is not None:
+                network_class = ipaddress.IPv4Network if version == 4 else ipaddress.IPv6Network
+                network = network_class((bits >> (width - prefix) << (width - prefix), prefix))
+                return str(network), meta
+        return None
+    
+    def lookup_domain(self, value: str) -> Optional[Tuple[str, IndicatorMeta]]:
+        """Listed domain equal to, or a parent of, a host name"""
+        labels = normalize_domain(value).split('.')
+        for start in range(len(labels)):
+            suffix = '.'.join(labels[start:])
+            meta = self.domains.get(suffix)
+            if meta is not None:
+                return suffix, meta
+        return None
+    
+    def lookup_url(self, value: str) -> Optional[Tuple[str, IndicatorMeta]]:
+        """Listed URL, or a listed domain or address hosting it"""
+        url = value.strip()
+        meta = self.urls.get(url)
+        if meta is not None:
+            return url, meta
+        
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            return None
+        if not host:
+            return None
+        return self.lookup_ip(host) or self.lookup_domain(host)
+    
+    def lookup_hash(self, value: str) -> Optional[Tuple[str, IndicatorMeta]]:
+        """Listed MD5, SHA-1 or SHA-256 digest (hex)"""
+        try:
+            digest = bytes.fromhex(value.strip())
+        except ValueError:
+            return None
+        
+        hash_type = HASH_TYPE_BY_LENGTH.get(len(digest))
+        if hash_type is None:
+            return None
+        meta = self.hashes[hash_type].get(digest)
+        return (value.strip().lower(), meta) if meta is not None else None
+    
+    def counts(self) -> Dict[str, int]:
+        """Indicators per type"""
+        counts = {
+            'networks': sum(len(table) for table in self.networks.values()),
+            'domains': len(self.domains),
+            'urls': len(self.urls)
+        }
+        counts.update({hash_type: len(table) for hash_type, table in self.hashes.items()})
+        return counts
+
+class IOCStore:
+    """Single store of IP/CIDR, domain, URL and file hash indicators"""
+    
+    def __init__(self, database: str = "ioc_store.db", refresh_interval: float = 30.0):
+        self.database = database
+        self.refresh_interval = refresh_interval
+        self.logger = logging.getLogger(__name__)
+        
+        # Readers only ever dereference self.snapshot; refreshes build a new one and swap it in
+        self.snapshot = IOCSnapshot()
+        self.refresh_lock = threading.Lock()
+        self.last_refresh = None
+        
+        self.init_database()
+        self.refresh()
+    
+    def init_database(self):
+        """Create typed indicator tables"""
+        conn = sqlite3.connect(self.database)
+        cursor = conn.cursor()
+        
+        for table, column in TABLE_COLUMNS.items():
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {column} TEXT PRIMARY KEY,
+                    threat_level INTEGER,
+                    confidence REAL,
+                    source TEXT,
+                    first_seen TEXT,
+                    last_seen TEXT,
+                    generation INTEGER
+                ) WITHOUT ROWID
+            ''')
+        
+        # Hashes are stored as raw digests, half the size of hex text
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ioc_hashes (
+                hash_type TEXT,
+                digest BLOB,
+                threat_level INTEGER,
+                confidence REAL,
+                source TEXT,
+                first_seen TEXT,
+                last_seen TEXT,
+                generation INTEGER,
+                PRIMARY KEY (hash_type, digest)
+            ) WITHOUT ROWID
+        ''')
+        
+        for table in list(TABLE_COLUMNS) + ['ioc_hashes']:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_generation ON {table}(generation)')
+        
+        # Every write batch gets the next generation, so readers can load just what changed
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ioc_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO ioc_meta (key, value) VALUES ('generation', 0)")
+        
+        conn.commit()
+        conn.close()
+    
+    def build_rows(self, indicators: List[Dict[str, Any]], credibility: float,
+                   timestamp: str, min_confidence: float = 0.0) -> Dict[str, List[tuple]]:
+        """Normalize indicators into rows per table; invalid and low-confidence values are dropped"""
+        rows = {table: [] for table in list(TABLE_COLUMNS) + ['ioc_hashes']}
+        
+        for indicator in indicators:
+            indicator_type = indicator.get('type')
+            value = str(indicator.get('value', ''))
+            confidence = float(indicator.get('confidence', 0.5)) * credibility
+            if confidence < min_confidence:
+                continue
+            threat_level = int(indicator.get('threat_level', round(confidence * 10)))
+            source = indicator.get('source', '')
+            meta = (threat_level, confidence, source, timestamp, timestamp)
+            
+            if indicator_type in NETWORK_TYPES:
+                try:
+                    network = ipaddress.ip_network(value.strip(), strict=False)
+                except ValueError:
+                    continue
+                rows['ioc_networks'].append((str(network),) + meta)
+            elif indicator_type == 'domain':
+                domain = normalize_domain(value)
+                if domain:
+                    rows['ioc_domains'].append((domain,) + meta)
+            elif indicator_type == 'url':
+                if value.strip():
+                    rows['ioc_urls'].append((value.strip(),) + meta)
+            elif indicator_type in HASH_TYPES:
+                try:
+                    digest = bytes.fromhex(value.strip())
+                except ValueError:
+                    continue
+                if len(digest) == HASH_TYPES[indicator_type]:
+                    rows['ioc_hashes'].append((indicator_type, digest) + meta)
+        
+        return rows
+    
+    def add_indicators(self, indicators: List[Dict[str, Any]], credibility: float = 1.0,
+                       min_confidence: float = 0.0) -> int:
+        """Upsert indicators as one new generation and publish them to lookups"""
+        rows = self.build_rows(indicators, credibility, datetime.now().isoformat(), min_confidence)
+        total = sum(len(table_rows) for table_rows in rows.values())
+        if not total:
+            return 0
+        
+        conn = sqlite3.connect(self.database, timeout=30)
+        try:
+            # Claiming the generation takes the write lock, so generations commit in order
+            conn.execute("UPDATE ioc_meta SET value = value + 1 WHERE key = 'generation'")
+            generation = conn.execute("SELECT value FROM ioc_meta WHERE key = 'generation'").fetchone()[0]
+            
+            upsert = '''
+                ON CONFLICT({keys}) DO UPDATE SET
+                    threat_level = max(threat_level, excluded.threat_level),
+                    confidence = max(confidence, excluded.confidence),
+                    last_seen = excluded.last_seen,
+                    generation = excluded.generation
+            '''
+            for table, column in TABLE_COLUMNS.items():
+                conn.executemany(f'''
+                    INSERT INTO {table}
+                    ({column}, threat_level, confidence, source, first_seen, last_seen, generation)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''' + upsert.format(keys=column), [row + (generation,) for row in rows[table]])
+            
+            conn.executemany('''
+                INSERT INTO ioc_hashes
+                (hash_type, digest, threat_level, confidence, source, first_seen, last_seen, generation)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''' + upsert.format(keys='hash_type, digest'), [row + (generation,) for row in rows['ioc_hashes']])
+            
+            conn.commit()
+        finally:
+            conn.close()
+        
+        self.refresh()
+        return total
+    
+    def refresh(self) -> bool:
+        """Apply generations written since the current snapshot (by any process); False if busy"""
+        # Lookups never wait here: a reader that finds a refresh in progress keeps the old snapshot
+        if not self.refresh_lock.acquire(blocking=False):
+            return False
+        
+        try:
+            self.last_refresh = time.monotonic()
+            old = self.snapshot
+            
+            conn = sqlite3.connect(self.database, timeout=30)
+            try:
+                generation = conn.execute("SELECT value FROM ioc_meta WHERE key = 'generation'").fetchone()[0]
+                if generation == old.generation:
+                    return True
+                
+                changed = {
+                    table: conn.execute(f'''
+                        SELECT {column}, threat_level, confidence, source FROM {table}
+                        WHERE generation > ? AND generation <= ?
+                    ''', (old.generation, generation)).fetchall()
+                    for table, column in TABLE_COLUMNS.items()
+                }
+                changed_hashes = conn.execute('''
+                    SELECT hash_type, digest, threat_level, confidence, source FROM ioc_hashes
+                    WHERE generation > ? AND generation <= ?
+                ''', (old.generation, generation)).fetchall()
+            finally:
+                conn.close()
+            
+            # Copy-on-write: only the indexes with new rows are copied
+            networks = dict(old.networks)
+            for network, threat_level, confidence, source in changed['ioc_networks']:
+                version, prefix, bits = parse_network(network)
+                key = (version, prefix)
+                if networks.get(key) is old.networks.get(key):
+                    networks[key] = dict(old.networks.get(key, {}))
+                networks[key][bits] = (threat_level, confidence, source)
+            
+            domains = old.domains
+            if changed['ioc_domains']:
+                domains = dict(domains)
+                domains.update((domain, tuple(meta)) for domain, *meta in changed['ioc_domains'])
+            
+            urls = old.urls
+            if changed['ioc_urls']:
+                urls = dict(urls)
+                urls.update((url, tuple(meta)) for url, *meta in changed['ioc_urls'])
+            
+            hashes = dict(old.hashes)
+            for hash_type, digest, threat_level, confidence, source in changed_hashes:
+                if hashes[hash_type] is old.hashes[hash_type]:
+                    hashes[hash_type] = dict(old.hashes[hash_type])
+                hashes[hash_type][bytes(digest)] = (threat_level, confidence, source)
+            
+            self.snapshot = IOCSnapshot(generation, networks, domains, urls, hashes)
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"IOC store refresh failed: {e}")
+            return False
+        
+        finally:
+            self.refresh_lock.release()
+    
+    def current_snapshot(self) -> IOCSnapshot:
+        """Snapshot for lookups, picking up other writers' updates every refresh_interval"""
+        if self.last_refresh is None or time.monotonic() - self.last_refresh >= self.refresh_interval:
+            self.refresh()
+        return self.snapshot
+    
+    @staticmethod
+    def match_result(indicator_type: str, value: str, match) -> Optional[Dict[str, Any]]:
+        """Lookup result in dict form"""
+        if match is None:
+            return None
+        indicator, (threat_level, confidence, source) = match
+        return {
+            'type': indicator_type,
+            'value': value,
+            'indicator': indicator,
+            'threat_level': threat_level,
+            'confidence': confidence,
+            'source': source
+        }
+    
+    def lookup_ip(self, value: str) -> Optional[Dict[str, Any]]:
+        """Match an IP address against listed IPs and CIDR ranges"""
+        return self.match_result('ip', value, self.current_snapshot().lookup_ip(value))
+    
+    def lookup_domain(self, value: str) -> Optional[Dict[str, Any]]:
+        """Match a host name against listed domains and their subdomains"""
+        return self.match_result('domain', value, self.current_snapshot().lookup_domain(value))
+    
+    def lookup_url(self, value: str) -> Optional[Dict[str, Any]]:
+        """Match a URL against listed URLs and hosts"""
+        return self.match_result('url', value, self.current_snapshot().lookup_url(value))
+    
+    def lookup_hash(self, value: str) -> Optional[Dict[str, Any]]:
+        """Match a hex MD5, SHA-1 or SHA-256 digest"""
+        return self.match_result('hash', value, self.current_snapshot().lookup_hash(value))
+    
+    def lookup(self, value: str, indicator_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Match a value of a given (or guessed) indicator type"""
+        snapshot = self.current_snapshot()
+        if indicator_type is None:
+            if '://' in value:
+                indicator_type = 'url'
+            elif parse_network(value):
+                indicator_type = 'ip'
+            elif len(value.strip()) in (32, 40, 64) and all(c in HEX_DIGITS for c in value.strip()):
+                indicator_type = 'hash'
+            else:
+                indicator_type = 'domain'
+        
+        if indicator_type in NETWORK_TYPES:
+            return self.match_result('ip', value, snapshot.lookup_ip(value))
+        if indicator_type == 'url':
+            return self.match_result('url', value, snapshot.lookup_url(value))
+        if indicator_type == 'hash' or indicator_type in HASH_TYPES:
+            return self.match_result('hash', value, snapshot.lookup_hash(value))
+        return self.match_result('domain', value, snapshot.lookup_domain(value))
+    
+    def get_store_status(self) -> Dict[str, Any]:
+        """Indicator counts of the current snapshot"""
+        snapshot = self.snapshot
+        return {'generation': snapshot.generation, 'indicators': snapshot.counts()}
+
+# Test function
+def test_ioc_store():
+    """Exercise typed lookups, incremental refresh and lock-free readers"""
+    import os
+    import random
+    import tempfile
+    
+    database = os.path.join(tempfile.mkdtemp(), 'ioc_store.db')
+    store = IOCStore(database)
+    store.add_indicators([
+        {'type': 'ip', 'value': '203.0.113.7', 'source': 'feed-a', 'confidence': 0.9},
+        {'type': 'cidr', 'value': '198.51.100.0/24', 'source': 'feed-b', 'confidence': 0.8},
+        {'type': 'cidr', 'value': '2001:db8::/32', 'source': 'feed-b', 'confidence': 0.8},
+        {'type': 'domain', 'value': 'Evil-Domain.example.', 'source': 'feed-c', 'confidence': 0.6},
+        {'type': 'url', 'value': 'http://203.0.113.9/payload.bin', 'source': 'feed-c', 'confidence': 0.8},
+        {'type': 'hash_md5', 'value': 'D41D8CD98F00B204E9800998ECF8427E', 'source': 'feed-d', 'confidence': 0.9},
+        {'type': 'hash_sha1', 'value': 'not-a-hash', 'source': 'feed-d', 'confidence': 0.9},
+        {'type': 'ip', 'value': '999.1.1.1', 'source': 'feed-d', 'confidence': 0.9}
+    ])
+    
+    assert store.lookup_ip('203.0.113.7')['indicator'] == '203.0.113.7/32'
+    assert store.lookup_ip('198.51.100.200')['indicator'] == '198.51.100.0/24'
+    assert store.lookup_ip('2001:db8:1::5')['source'] == 'feed-b'
+    assert store.lookup_ip('198.51.101.1') is None
+    assert store.lookup_domain('cdn.evil-domain.example')['indicator'] == 'evil-domain.example'
+    assert store.lookup_domain('notevil-domain.example') is None
+    assert store.lookup_url('http://203.0.113.9/payload.bin')['indicator'] == 'http://203.0.113.9/payload.bin'
+    assert store.lookup_url('https://www.evil-domain.example/login')['indicator'] == 'evil-domain.example'
+    assert store.lookup('d41d8cd98f00b204e9800998ecf8427e')['source'] == 'feed-d'
+    assert store.get_store_status()['indicators']['networks'] == 3
+    
+    # Indicators whose confidence times source credibility is under the floor are not published
+    added = store.add_indicators([
+        {'type': 'ip', 'value': '203.0.113.50', 'source': 'http://blog.example/post', 'confidence': 0.7},
+        {'type': 'domain', 'value': 'scraped.example', 'source': 'http://blog.example/post', 'confidence': 0.6}
+    ], credibility=0.5, min_confidence=0.4)
+    assert added == 0 and store.lookup_ip('203.0.113.50') is None
+    
+    # A second process-style instance sees the first one's later writes on refresh
+    reader = IOCStore(database)
+    before = reader.snapshot
+    store.add_indicators([{'type': 'cidr', 'value': '192.0.2.0/25', 'source': 'feed-e', 'confidence': 1.0}])
+    assert reader.lookup_ip('192.0.2.1') is None
+    reader.refresh()
+    assert reader.lookup_ip('192.0.2.1')['source'] == 'feed-e'
+    assert before.lookup_ip('192.0.2.1') is None  # old snapshots are never mutated
+    
+    # Lookup throughput against a larger store
+    store.add_indicators([
+        {'type': 'ip', 'value': f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(0, 255)}",
+         'source': 'bulk', 'confidence': 0.7}
+        for _ in range(50000)
+    ])
+    queries = [f"172.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(0, 255)}" for _ in range(50000)]
+    start = time.perf_counter()
+    for query in queries:
+        store.lookup_ip(query)
+    elapsed = time.perf_counter() - start
+    
+    print(f"✅ IOC store lookups OK - {store.get_store_status()['indicators']['networks']} networks, "
+          f"{elapsed / len(queries) * 1e6:.1f} µs per IP lookup")
+
+if __name__ == "__main__":
+    test_ioc_store()
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+System Metrics Sampler
+Delta-based rate sampling with a NumPy ring buffer for anomaly features
+"""
+
+import time
+from typing import Dict, Any, Optional
+import numpy as np
+import psutil
+
+METRIC_FIELDS = (
+    'cpu_percent',
+    'memory_percent',
+    'disk_read_rate',
+    'disk_write_rate',
+    'network_sent_rate',
+    'network_recv_rate'
+)
+
+class SystemMetricsSampler:
+    """Sample per-interval system rates and keep a fixed-size history"""
+    
+    def __init__(self, capacity: int = 240):
+        self.capacity = capacity
+        self.fields = METRIC_FIELDS
+        
+        # Ring buffer of samples (rows) x metric fields (columns)
+        self.samples = np.zeros((capacity, len(self.fields)), dtype=np.float64)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.next_index = 0
+        self.sample_count = 0
+        
+        # Previous cumulative counters for delta computation
+        self.previous_time = None
+        self.previous_disk = None
+        self.previous_network = None
+        
+        self.prime()
+    
+    def prime(self):
+        """Record baseline counters; the first cpu_percent(None) call only sets a reference"""
+        psutil.cpu_percent(interval=None)
+        self.previous_time = time.monotonic()
+        self.previous_disk = psutil.disk_io_counters()
+        self.previous_network = psutil.net_io_counters()
+    
+    @staticmethod
+    def _delta(current, previous, attribute: str) -> float:
+        """Counter difference, treating wrap/reset as zero"""
+        if current is None or previous is None:
+            return 0.0
+        delta = getattr(current, attribute) - getattr(previous, attribute)
+        return float(delta) if delta >= 0 else 0.0
+    
+    def sample(self) -> Dict[str, Any]:
+        """Take a non-blocking sample and return per-interval metrics"""
+        now = time.monotonic()
+        elapsed = max(now - self.previous_time, 1e-6)
+        
+        cpu_percent = psutil.cpu_percent(interval=None)
+        memory_percent = psutil.virtual_memory().percent
+        disk_io = psutil.disk_io_counters()
+        network_io = psutil.net_io_counters()
+        
+        disk_read = self._delta(disk_io, self.previous_disk, 'read_bytes')
+        disk_write = self._delta(disk_io, self.previous_disk, 'write_bytes')
+        network_sent = self._delta(network_io, self.previous_network, 'bytes_sent')
+        network_recv = self._delta(network_io, self.previous_network, 'bytes_recv')
+        
+        self.previous_time = now
+        self.previous_disk = disk_io
+        self.previous_network = network_io
+        
+        row = (
+            cpu_percent,
+            memory_percent,
+            disk_read / elapsed,
+            disk_write / elapsed,
+            network_sent / elapsed,
+            network_recv / elapsed
+        )
+        self.record(row, time.time())
+        
+        metrics = dict(zip(self.fields, row))
+        metrics.update({
+            'interval_seconds': elapsed,
+            'disk_read_bytes': disk_read,
+            'disk_write_bytes': disk_write,
+            'network_bytes_sent': network_sent,
+            'network_bytes_recv': network_recv
+        })
+        return metrics
+    
+    def record(self, row, timestamp: float):
+        """Append a sample row to the ring buffer"""
+        self.samples[self.next_index] = row
+        self.timestamps[self.next_index] = timestamp
+        self.next_index = (self.next_index + 1) % self.capacity
+        self.sample_count = min(self.sample_count + 1, self.capacity)
+    
+    def history(self, last: Optional[int] = None) -> np.ndarray:
+        """Samples in chronological order (oldest first)"""
+        count = self.sample_count if last is None else min(last, self.sample_count)
+        if count == 0:
+            return np.zeros((0, len(self.fields)), dtype=np.float64)
+        
+        indices = (self.next_index - count + np.arange(count)) % self.capacity
+        return self.samples[indices]
+    
+    def rolling_mean(self, window: int = 10) -> np.ndarray:
+        """Mean of each field over the last `window` samples"""
+        recent = self.history(window)
+        return recent.mean(axis=0) if len(recent) else np.zeros(len(self.fields))
+    
+    def zscores(self, min_samples: int = 10) -> np.ndarray:
+        """Z-score of the latest sample against the preceding history"""
+        data = self.history()
+        if len(data) < min_samples + 1:
+            return np.zeros(len(self.fields))
+        
+        baseline, latest = data[:-1], data[-1]
+        std = baseline.std(axis=0)
+        return np.where(std > 0, (latest - baseline.mean(axis=0)) / np.where(std > 0, std, 1.0), 0.0)
+    
+    def ewma(self, alpha: float = 0.2) -> np.ndarray:
+        """Exponentially weighted moving average over the whole history"""
+        data = self.history()
+        if len(data) == 0:
+            return np.zeros(len(self.fields))
+        
+        # Weight (1 - alpha)^age, newest sample has age 0
+        weights = (1.0 - alpha) ** np.arange(len(data) - 1, -1, -1, dtype=np.float64)
+        return weights @ data / weights.sum()
+    
+    def anomaly_features(self, zscore_threshold: float = 4.0) -> Dict[str, Any]:
+        """Vectorized anomaly features over the sample history"""
+        zscores = self.zscores()
+        outliers = [field for field, score in zip(self.fields, zscores) if score > zscore_threshold]
+        
+        return {
+            'rolling_mean': dict(zip(self.fields, self.rolling_mean().tolist())),
+            'ewma': dict(zip(self.fields, self.ewma().tolist())),
+            'zscores': dict(zip(self.fields, zscores.tolist())),
+            'outliers': outliers,
+            'history_size': self.sample_count
+        }
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Versioned Model Registry
+Model bundles with a manifest, verified before use and memory-mapped on load
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import joblib
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+from feature_store import PATTERN_FEATURE_COUNT
+from behavior_baseline import BEHAVIOR_SCHEMA, BEHAVIOR_FEATURE_COUNT
+from numpy_inference import export_inference_bundle, NumpyThreatModel
+
+MANIFEST_NAME = 'manifest.json'
+CURRENT_POINTER = 'CURRENT'
+INFERENCE_FILE = 'inference.npz'
+
+# Bump the version whenever the meaning or order of prediction features changes
+FEATURE_SCHEMA = {'name': 'threat_features', 'version': 1, 'width': PATTERN_FEATURE_COUNT}
+
+# Models the live predictor needs, and the input width each one takes
+PREDICTION_MODELS = ('feature_scaler', 'pattern_recognition', 'anomaly_detection')
+MODEL_INPUT_WIDTHS = {
+    'feature_scaler': FEATURE_SCHEMA['width'],
+    'pattern_recognition': FEATURE_SCHEMA['width'],
+    'anomaly_detection': BEHAVIOR_FEATURE_COUNT
+}
+
+class ModelRegistry:
+    """Save, verify and load versioned model bundles"""
+    
+    def __init__(self, directory: str, keep_versions: int = 5):
+        self.directory = directory
+        self.keep_versions = keep_versions
+        os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def file_sha256(path: str) -> str:
+        """SHA-256 of a model file"""
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def save_version(self, models: Dict[str, Any], model_info: Dict[str, Dict[str, Any]],
+                     make_current: bool = True, validation: Optional[Dict[str, Any]] = None) -> str:
+        """Write models and their manifest to a new version directory"""
+        version = datetime.now().strftime('v%Y%m%d-%H%M%S-%f')
+        staging = os.path.join(self.directory, f".{version}.tmp")
+        os.makedirs(staging)
+        
+        manifest = {
+            'version': version,
+            'created': datetime.now().isoformat(),
+            'feature_schema': FEATURE_SCHEMA,
+            'behavior_schema': BEHAVIOR_SCHEMA,
+            'models': {}
+        }
+        if validation is not None:
+            manifest['validation'] = validation
+        
+        for name, model in models.items():
+            if model is None:
+                continue
+            filename = f"{name}.joblib"
+            path = os.path.join(staging, filename)
+            joblib.dump(model, path)
+            
+            manifest['models'][name] = dict(model_info.get(name, {}), **self.file_entry(staging, filename))
+        
+        # NumPy-only evaluators for processes that should not import scikit-learn
+        if all(models.get(name) is not None for name in PREDICTION_MODELS):
+            export_inference_bundle(models['feature_scaler'], models['pattern_recognition'],
+                                    models['anomaly_detection'], os.path.join(staging, INFERENCE_FILE))
+            manifest['inference'] = self.file_entry(staging, INFERENCE_FILE)
+        
+        with open(os.path.join(staging, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        
+        # The version only becomes visible once it is complete
+        os.replace(staging, os.path.join(self.directory, version))
+        
+        if make_current:
+            self.set_current(version)
+        self.prune_versions()
+        return version
+    
+    def file_entry(self, directory: str, filename: str) -> Dict[str, Any]:
+        """Manifest entry (name, size, checksum) for a bundle file"""
+        path = os.path.join(directory, filename)
+        return {'file': filename, 'bytes': os.path.getsize(path), 'sha256': self.file_sha256(path)}
+    
+    def verify_file(self, version: str, entry: Dict[str, Any]) -> Optional[str]:
+        """Problem with a bundle file, or None when size and checksum match"""
+        path = os.path.join(self.directory, version, entry['file'])
+        if not os.path.isfile(path) or os.path.getsize(path) != entry['bytes']:
+            return "file missing or truncated"
+        if self.file_sha256(path) != entry['sha256']:
+            return "checksum mismatch"
+        return None
+    
+    def set_current(self, version: str):
+        """Atomically point CURRENT at a version"""
+        pointer = os.path.join(self.directory, CURRENT_POINTER)
+        with open(f"{pointer}.tmp", 'w') as f:
+            f.write(version)
+        os.replace(f"{pointer}.tmp", pointer)
+    
+    def current_version(self) -> Optional[str]:
+        """Version CURRENT points at, if any"""
+        try:
+            with open(os.path.join(self.directory, CURRENT_POINTER), 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+    
+    def list_versions(self) -> List[str]:
+        """Complete versions, oldest first"""
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith('v') and os.path.isfile(os.path.join(self.directory, name, MANIFEST_NAME))
+        )
+    
+    def prune_versions(self):
+        """Delete old versions beyond keep_versions (never the current one)"""
+        current = self.current_version()
+        for version in self.list_versions()[:-self.keep_versions]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.directory, version), ignore_errors=True)
+    
+    def load_manifest(self, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Read a version's manifest (the current version by default)"""
+        version = version or self.current_version()
+        if not version:
+            return None
+        try:
+            with open(os.path.join(self.directory, version, MANIFEST_NAME), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def verify_manifest(self, manifest: Dict[str, Any], required: Tuple[str, ...] = ()) -> List[str]:
+        """Problems that make a bundle unusable (empty when it is valid)"""
+        problems = []
+        
+        if manifest.get('feature_schema') != FEATURE_SCHEMA:
+            problems.append(f"feature schema {manifest.get('feature_schema')} does not match {FEATURE_SCHEMA}")
+        if manifest.get('behavior_schema') != BEHAVIOR_SCHEMA:
+            problems.append(f"behavior schema version {manifest.get('behavior_schema', {}).get('version')} "
+                            f"does not match {BEHAVIOR_SCHEMA['version']}")
+        
+        for name in required:
+            if name not in manifest.get('models', {}):
+                problems.append(f"missing model {name}")
+        
+        for name, entry in manifest.get('models', {}).items():
+            problem = self.verify_file(manifest.get('version', ''), entry)
+            if problem:
+                problems.append(f"{name}: {problem}")
+        
+        return problems
+    
+    def load_models(self, version: Optional[str] = None, mmap_mode: Optional[str] = 'r',
+                    required: Tuple[str, ...] = ()) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Verify and load a bundle; large arrays are memory-mapped unless mmap_mode is None"""
+        if not JOBLIB_AVAILABLE:
+            raise ImportError("joblib is required to load model bundles")
+        
+        manifest = self.load_manifest(version)
+        if manifest is None:
+            return None, {}
+        
+        problems = self.verify_manifest(manifest, required)
+        if problems:
+            raise ValueError(f"Model bundle {manifest.get('version')} rejected: {'; '.join(problems)}")
+        
+        version_directory = os.path.join(self.directory, manifest['version'])
+        models = {
+            name: joblib.load(os.path.join(version_directory, entry['file']), mmap_mode=mmap_mode)
+            for name, entry in manifest['models'].items()
+        }
+        
+        # Prediction models must accept their schema's feature width
+        for name, expected in MODEL_INPUT_WIDTHS.items():
+            width = getattr(models.get(name), 'n_features_in_', expected)
+            if width != expected:
+                raise ValueError(f"Model {name} expects {width} features, schema has {expected}")
+        
+        return manifest, models
+    
+    def load_inference(self, version: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[NumpyThreatModel]]:
+        """Verify and load only the NumPy evaluators of a bundle"""
+        manifest = self.load_manifest(version)
+        if manifest is None or 'inference' not in manifest:
+            return manifest, None
+        
+        if manifest.get('feature_schema') != FEATURE_SCHEMA or manifest.get('behavior_schema') != BEHAVIOR_SCHEMA:
+            raise ValueError(f"Model bundle {manifest['version']} was built for another feature schema")
+        
+        problem = self.verify_file(manifest['version'], manifest['inference'])
+        if problem:
+            raise ValueError(f"Model bundle {manifest['version']} inference file rejected: {problem}")
+        
+        model = NumpyThreatModel.load(os.path.join(self.directory, manifest['version'], manifest['inference']['file']))
+        if model.meta['n_features'] != FEATURE_SCHEMA['width']:
+            raise ValueError(f"Inference model expects {model.meta['n_features']} features")
+        if model.has_baseline and model.meta['anomaly_features'] != BEHAVIOR_FEATURE_COUNT:
+            raise ValueError(f"Behavior baseline expects {model.meta['anomaly_features']} features")
+        
+        return manifest, model
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Background Model Trainer
+Runs training cycles in a separate low-priority process that publishes versioned model bundles
+"""
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from typing import Dict, Any
+
+TRAINER_SCRIPT = os.path.abspath(__file__)
+
+def run_training_process(timeout: float = 3600.0) -> Dict[str, Any]:
+    """Run one training cycle in a child process and return its result"""
+    handle, result_path = tempfile.mkstemp(prefix='training-', suffix='.json')
+    os.close(handle)
+    
+    try:
+        # The child inherits the working directory, so it finds the same database and model store
+        completed = subprocess.run(
+            [sys.executable, TRAINER_SCRIPT, result_path],
+            timeout=timeout,
+            creationflags=getattr(subprocess, 'BELOW_NORMAL_PRIORITY_CLASS', 0)
+        )
+        if completed.returncode != 0:
+            return {'status': 'error', 'error': f"Trainer exited with code {completed.returncode}"}
+        
+        with open(result_path, 'r') as f:
+            return json.load(f)
+    
+    except subprocess.TimeoutExpired:
+        # Bundles are staged before they become visible, so a killed trainer leaves CURRENT intact
+        return {'status': 'error', 'error': f"Trainer exceeded {timeout:.0f}s and was stopped"}
+    except (OSError, ValueError) as e:
+        return {'status': 'error', 'error': str(e)}
+    finally:
+        try:
+            os.remove(result_path)
+        except OSError:
+            pass
+
+def main():
+    """Trainer process entry point: run one cycle and write the result as JSON"""
+    if hasattr(os, 'nice'):
+        os.nice(10)
+    
+    from self_learning_ai import SelfLearningAI
+    result = SelfLearningAI().run_training_cycle()
+    
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            json.dump(result, f)
+    else:
+        print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+Monitor Events
+Compact typed records the system watcher publishes on its event bus; serialized only when persisted
+"""
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+NS_PER_SECOND = 1000000000
+
+def intern_text(value: Optional[str]) -> str:
+    """Shared copy of a frequently repeated string (process names, extensions, users)"""
+    return sys.intern(value) if value else ''
+
+def ns_to_datetime(timestamp_ns: int) -> datetime:
+    """Local datetime of an epoch-ns timestamp, for database rows"""
+    return datetime.fromtimestamp(timestamp_ns / NS_PER_SECOND)
+
+class FileRecord:
+    """Stat, hash and type of one scanned file"""
+    
+    __slots__ = ('path', 'size', 'modified_ns', 'created_ns', 'hash', 'extension', 'entropy')
+    
+    def __init__(self, path: str, size: int, modified_ns: int, created_ns: int, file_hash: str, extension: str):
+        self.path = path
+        self.size = size
+        self.modified_ns = modified_ns
+        self.created_ns = created_ns
+        self.hash = file_hash
+        self.extension = intern_text(extension)
+        self.entropy = None
+    
+    @classmethod
+    def from_stat(cls, path: str, stat_info: os.stat_result, file_hash: str) -> 'FileRecord':
+        """Record of a file from its stat result"""
+        return cls(path, stat_info.st_size, stat_info.st_mtime_ns, stat_info.st_ctime_ns,
+                   file_hash, os.path.splitext(path)[1].lower())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form for detection details"""
+        return {
+            'path': self.path,
+            'size': self.size,
+            'modified_ns': self.modified_ns,
+            'created_ns': self.created_ns,
+            'hash': self.hash,
+            'extension': self.extension,
+            'entropy': self.entropy
+        }
+
+class ProcessRecord:
+    """Identity and command line of one process, from psutil process info"""
+    
+    __slots__ = ('pid', 'ppid', 'name', 'exe', 'cmdline', 'username', 'create_time_ns')
+    
+    # Attributes to request from psutil.process_iter
+    ATTRIBUTES = ['pid', 'name', 'exe', 'cmdline', 'username', 'ppid', 'create_time']
+    
+    def __init__(self, pid: int, ppid: int, name: str, exe: str, cmdline: tuple, username: str, create_time_ns: int):
+        self.pid = pid
+        self.ppid = ppid
+        self.name = intern_text(name)
+        self.exe = exe
+        self.cmdline = cmdline
+        self.username = intern_text(username)
+        self.create_time_ns = create_time_ns
+    
+    @classmethod
+    def from_info(cls, info: Dict[str, Any]) -> 'ProcessRecord':
+        """Record of a psutil process info dict (missing or denied attributes are None)"""
+        create_time = info.get('create_time')
+        return cls(info.get('pid') or 0, info.get('ppid') or 0, info.get('name') or '', info.get('exe') or '',
+                   tuple(info.get('cmdline') or ()), info.get('username') or '',
+                   int(create_time * NS_PER_SECOND) if create_time else 0)
+    
+    @property
+    def command_line(self) -> str:
+        return ' '.join(self.cmdline)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form for detection details"""
+        return {
+            'pid': self.pid,
+            'ppid': self.ppid,
+            'name': self.name,
+            'exe': self.exe,
+            'cmdline': list(self.cmdline),
+            'username': self.username,
+            'create_time_ns': self.create_time_ns
+        }
+
+class MonitorEvent:
+    """Base of all bus events; subscribers select events by class"""
+    
+    __slots__ = ('timestamp_ns',)
+    
+    def __init__(self, timestamp_ns: Optional[int] = None):
+        self.timestamp_ns = time.time_ns() if timestamp_ns is None else timestamp_ns
+
+class FileActivity(MonitorEvent):
+    """Raw file system notification, before the file is scanned"""
+    
+    __slots__ = ('event_type', 'file_path', 'dest_path')
+    
+    def __init__(self, event_type: str, file_path: str, dest_path: Optional[str] = None):
+        super().__init__()
+        self.event_type = intern_text(event_type)
+        self.file_path = file_path
+        self.dest_path = dest_path
+
+class FileScanned(MonitorEvent):
+    """Result of scanning the file behind a file system notification"""
+    
+    __slots__ = ('event_type', 'record', 'suspicious')
+    
+    def __init__(self, event_type: str, record: FileRecord, suspicious: bool):
+        super().__init__()
+        self.event_type = intern_text(event_type)
+        self.record = record
+        self.suspicious = suspicious
+
+class ProcessActivity(MonitorEvent):
+    """Process start seen by the process monitor"""
+    
+    __slots__ = ('event_type', 'record', 'parent_process', 'suspicious')
+    
+    def __init__(self, event_type: str, record: ProcessRecord, parent_process: str = '', suspicious: bool = False):
+        super().__init__()
+        self.event_type = intern_text(event_type)
+        self.record = record
+        self.parent_process = parent_process
+        self.suspicious = suspicious
+
+class NetworkActivity(MonitorEvent):
+    """Established connection seen by the network monitor (psutil connection tuple)"""
+    
+    __slots__ = ('connection', 'proc_name', 'suspicious')
+    
+    def __init__(self, connection, proc_name: str, suspicious: bool):
+        super().__init__()
+        self.connection = connection
+        self.proc_name = intern_text(proc_name)
+        self.suspicious = suspicious
+
+class SystemChange(MonitorEvent):
+    """Registry, service or startup item change"""
+    
+    __slots__ = ('change_type', 'fields')
+    
+    def __init__(self, change_type: str, **fields):
+        super().__init__()
+        self.change_type = intern_text(change_type)
+        self.fields = fields
+
+class ThreatDetected(MonitorEvent):
+    """Detection from any monitor or rule"""
+    
+    __slots__ = ('threat_type', 'threat_name', 'action_taken', 'file_path', 'process_name', 'threat_level', 'details')
+    
+    def __init__(self, threat_type: str, threat_name: str, action_taken: str, file_path: str = '',
+                 process_name: str = '', threat_level: int = 5, details: Any = ''):
+        super().__init__()
+        self.threat_type = intern_text(threat_type)
+        self.threat_name = threat_name
+        self.action_taken = intern_text(action_taken)
+        self.file_path = file_path
+        self.process_name = intern_text(process_name)
+        self.threat_level = threat_level
+        self.details = details
+    
+    def details_json(self) -> str:
+        """Details as stored: text as is; dicts, and callables producing them, serialized on first use"""
+        details = self.details
+        if callable(details):
+            details = details()
+        if not isinstance(details, str):
+            details = json.dumps(details, default=str)
+        self.details = details
+        return details
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Threat info in the form the notifier and GUI take (details stay unserialized)"""
+        return {
+            'threat_type': self.threat_type,
+            'threat_name': self.threat_name,
+            'action_taken': self.action_taken,
+            'file_path': self.file_path,
+            'process_name': self.process_name,
+            'threat_level': self.threat_level,
+            'timestamp_ns': self.timestamp_ns
+        }
+
+def test_monitor_events():
+    """Compare allocation and build time of event records with the per-event dicts they replace"""
+    import tracemalloc
+    
+    info = {'pid': 4321, 'ppid': 880, 'name': 'chrome.exe', 'exe': 'C:\\Program Files\\Google\\Chrome\\chrome.exe',
+            'cmdline': ['chrome.exe', '--type=renderer'], 'username': 'DESKTOP\\alice', 'create_time': 1700000000.25}
+    stat_info = os.stat(__file__)
+    count = 20000
+    
+    def build_dicts():
+        return [({'size': stat_info.st_size, 'modified': datetime.fromtimestamp(stat_info.st_mtime),
+                  'created': datetime.fromtimestamp(stat_info.st_ctime), 'hash': 'ab' * 32,
+                  'extension': os.path.splitext(f"file{i}.exe")[1].lower(), 'path': f"file{i}.exe"},
+                 dict(info, cmdline=list(info['cmdline']), name=''.join(info['name']))) for i in range(count)]
+    
+    def build_records():
+        return [(FileScanned('created', FileRecord.from_stat(f"file{i}.exe", stat_info, 'ab' * 32), False),
+                 ProcessActivity('process_start', ProcessRecord.from_info(info))) for i in range(count)]
+    
+    results = {}
+    for label, build in (('dicts', build_dicts), ('records', build_records)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        kept = build()
+        elapsed = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[label] = (size / count, elapsed / count * 1e6)
+        del kept
+    
+    event = ThreatDetected('suspicious_process', 'Suspicious_chrome.exe', 'monitor',
+                           details=lambda: ProcessRecord.from_info(info).to_dict())
+    assert event.to_dict()['threat_name'] == 'Suspicious_chrome.exe' and callable(event.details)
+    assert json.loads(event.details_json())['cmdline'] == ['chrome.exe', '--type=renderer']
+    assert ProcessRecord.from_info(info).name is ProcessRecord.from_info(dict(info, name='chrome' + '.exe')).name
+    assert ns_to_datetime(ProcessRecord.from_info(info).create_time_ns) == datetime.fromtimestamp(1700000000.25)
+    
+    assert results['records'][0] < results['dicts'][0], results
+    print(f"✅ Monitor events OK - file+process observation: dicts {results['dicts'][0]:.0f} B / {results['dicts'][1]:.1f} µs, "
+          f"records {results['records'][0]:.0f} B / {results['records'][1]:.1f} µs")
+
+if __name__ == "__main__":
+    test_monitor_events()
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""
+Notification Dispatcher
+Rate-limits desktop notifications per severity and coalesces repeated threats into summaries
+"""
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+# Tokens per second and burst size of each severity's bucket
+DEFAULT_RATES = {
+    'critical': (1 / 10, 5),
+    'high': (1 / 30, 3),
+    'medium': (1 / 60, 2),
+    'low': (1 / 120, 1)
+}
+
+# Order in which ready notifications are shown
+SEVERITY_PRIORITY = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# Past tense of the watcher's actions, for summaries
+ACTION_SUMMARIES = {
+    'quarantine': 'quarantined',
+    'block': 'blocked',
+    'terminate': 'terminated',
+    'monitor': 'monitored',
+    'alert': 'reported'
+}
+
+def summarize(threat_info: Dict[str, Any], count: int) -> str:
+    """One-line summary of repeated detections, e.g. '37 files quarantined: WannaCry'"""
+    if threat_info.get('file_path'):
+        noun = 'file' if count == 1 else 'files'
+    elif threat_info.get('process_name'):
+        noun = 'process' if count == 1 else 'processes'
+    else:
+        noun = 'detection' if count == 1 else 'detections'
+    action = str(threat_info.get('action_taken') or 'alert')
+    action = ACTION_SUMMARIES.get(action.lower(), action.lower())
+    return f"{count} {noun} {action}: {threat_info.get('threat_name', 'Unknown Threat')}"
+
+class TokenBucket:
+    """Allow bursts of up to capacity, refilled at rate tokens per second"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+    
+    def take(self, now: float) -> bool:
+        """Spend one token if available"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+    
+    def next_token(self, now: float) -> float:
+        """Time at which a token will be available"""
+        return now + max(0.0, 1 - self.tokens) / self.rate
+
+class PendingGroup:
+    """Detections of one threat waiting for the coalescing window or a token"""
+    
+    __slots__ = ('severity', 'threat_info', 'count', 'deadline')
+    
+    def __init__(self, severity: str, threat_info: Dict[str, Any], deadline: float):
+        self.severity = severity
+        self.threat_info = threat_info
+        self.count = 0
+        self.deadline = deadline
+
+class NotificationDispatcher:
+    """Deliver notifications from one worker thread, rate-limited and coalesced per threat"""
+    
+    def __init__(self, deliver: Callable[[Dict[str, Any], str, int], bool],
+                 rates: Optional[Dict[str, Tuple[float, int]]] = None, coalesce_window: float = 30.0,
+                 is_busy: Optional[Callable[[], bool]] = None, busy_poll: float = 0.25):
+        # deliver must not block for the display time; is_busy tells when the previous one is still shown
+        self.deliver = deliver
+        self.is_busy = is_busy
+        self.busy_poll = busy_poll
+        self.coalesce_window = coalesce_window
+        self.logger = logging.getLogger(__name__)
+        self.buckets = {severity: TokenBucket(rate, capacity)
+                        for severity, (rate, capacity) in (rates or DEFAULT_RATES).items()}
+        
+        # (severity, threat name, action) -> detections not yet shown
+        self.groups: Dict[Tuple[str, str, str], PendingGroup] = {}
+        
+        # Heap of (severity priority, arrival, threat info, severity, count): critical alerts go first
+        self.ready = []
+        self.arrivals = itertools.count()
+        self.condition = threading.Condition()
+        self.running = True
+        self.worker = None
+        
+        # Dispatch statistics
+        self.submitted = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.failed = 0
+    
+    def submit(self, threat_info: Dict[str, Any], severity: str = "high") -> bool:
+        """Queue a threat notification; shown now, or later as part of a summary"""
+        severity = severity.lower()
+        key = (severity, threat_info.get('threat_name', ''), threat_info.get('action_taken', ''))
+        
+        with self.condition:
+            if not self.running:
+                return False
+            self.submitted += 1
+            now = time.monotonic()
+            bucket = self.buckets.get(severity) or self.buckets['low']
+            group = self.groups.get(key)
+            
+            if group is None:
+                # First detection of a threat is shown at once; repeats wait for the window
+                group = PendingGroup(severity, threat_info, now + self.coalesce_window)
+                if bucket.take(now):
+                    self.push_ready(threat_info, severity, 1)
+                    if severity != 'critical':
+                        self.groups[key] = group
+                else:
+                    group.count = 1
+                    self.groups[key] = group
+            elif severity == 'critical' and group.count == 0 and bucket.take(now):
+                # Critical alerts skip the coalescing window while tokens last
+                self.push_ready(threat_info, severity, 1)
+            else:
+                group.count += 1
+                group.threat_info = threat_info
+                self.coalesced += 1
+            
+            if severity == 'critical' and group.count:
+                # A parked critical alert waits only for the next token, never for the coalescing window
+                group.deadline = min(group.deadline, bucket.next_token(now))
+            
+            self.start_worker()
+            self.condition.notify_all()
+            return True
+    
+    def push_ready(self, threat_info: Dict[str, Any], severity: str, count: int):
+        """Queue a notification to be shown as soon as the display is free"""
+        priority = SEVERITY_PRIORITY.get(severity, len(SEVERITY_PRIORITY))
+        heapq.heappush(self.ready, (priority, next(self.arrivals), threat_info, severity, count))
+    
+    def start_worker(self):
+        """Start the delivery thread on first use"""
+        if self.worker is None:
+            self.worker = threading.Thread(target=self.dispatch_loop, daemon=True, name='notification-dispatcher')
+            self.worker.start()
+    
+    def collect_due(self, now: float) -> float:
+        """Move summaries whose window has passed to the ready queue; returns the next deadline"""
+        next_deadline = now + self.coalesce_window
+        for key, group in list(self.groups.items()):
+            if group.deadline > now:
+                next_deadline = min(next_deadline, group.deadline)
+                continue
+            if group.count == 0:
+                del self.groups[key]
+                continue
+            
+            bucket = self.buckets.get(group.severity) or self.buckets['low']
+            if bucket.take(now):
+                self.push_ready(group.threat_info, group.severity, group.count)
+                # Keep collecting repeats of a threat that is still active
+                group.count = 0
+                group.deadline = now + self.coalesce_window
+            else:
+                group.deadline = bucket.next_token(now)
+            next_deadline = min(next_deadline, group.deadline)
+        return next_deadline
+    
+    def dispatch_loop(self):
+        """Show ready notifications one at a time and flush due summaries"""
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                next_deadline = self.collect_due(time.monotonic())
+                if not self.ready:
+                    self.condition.wait(max(0.0, next_deadline - time.monotonic()))
+                    continue
+                if self.is_busy is not None and self.is_busy():
+                    # The previous notification is still on screen; later arrivals can still
+                    # overtake the ready queue by severity while it is
+                    self.condition.wait(min(self.busy_poll, max(0.0, next_deadline - time.monotonic())))
+                    continue
+                _, _, threat_info, severity, count = heapq.heappop(self.ready)
+            
+            try:
+                if self.deliver(threat_info, severity, count):
+                    self.delivered += 1
+                else:
+                    self.failed += 1
+            except Exception as e:
+                self.failed += 1
+                self.logger.error(f"Notification delivery failed: {e}")
+    
+    def close(self, timeout: float = 2.0):
+        """Stop the delivery thread (pending summaries are discarded)"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.worker is not None and self.worker is not threading.current_thread():
+            self.worker.join(timeout)
+    
+    def get_dispatcher_status(self) -> Dict[str, Any]:
+        """Delivery counters and pending summaries"""
+        with self.condition:
+            return {
+                'submitted': self.submitted,
+                'delivered': self.delivered,
+                'coalesced': self.coalesced,
+                'failed': self.failed,
+                'ready': len(self.ready),
+                'pending_summaries': sum(1 for group in self.groups.values() if group.count)
+            }
+
+def test_notification_dispatcher():
+    """An outbreak must produce a handful of summaries, with critical alerts still shown at once"""
+    shown: List[Tuple[str, str, int, float]] = []
+    
+    def deliver(threat_info, severity, count):
+        shown.append((summarize(threat_info, count), severity, count, time.monotonic()))
+        return True
+    
+    dispatcher = NotificationDispatcher(deliver, coalesce_window=0.3)
+    start = time.monotonic()
+    for i in range(500):
+        dispatcher.submit({'threat_name': 'WannaCry', 'file_path': f"C:\\Users\\bob\\doc{i}.docx",
+                           'action_taken': 'quarantine'}, 'high')
+        if i % 50 == 0:
+            dispatcher.submit({'threat_name': f"Trojan{i}", 'process_name': 'evil.exe',
+                               'action_taken': 'terminate'}, 'medium')
+    dispatcher.submit({'threat_name': 'Boot Sector Rootkit', 'action_taken': 'alert'}, 'critical')
+    dispatcher.submit({'threat_name': 'Boot Sector Rootkit', 'action_taken': 'alert'}, 'critical')
+    
+    time.sleep(0.8)
+    status = dispatcher.get_dispatcher_status()
+    dispatcher.close()
+    
+    texts = [text for text, _, _, _ in shown]
+    assert '1 file quarantined: WannaCry' in texts, texts
+    assert '499 files quarantined: WannaCry' in texts, texts
+    # Two medium tokens: the first two trojans show, the rest wait for a token
+    assert texts.count('1 process terminated: Trojan0') == 1 and status['pending_summaries'] == 8, status
+    critical = [when - start for text, severity, _, when in shown if severity == 'critical']
+    assert len(critical) == 2 and max(critical) < 0.1, critical
+    assert len(shown) < 10 and status['submitted'] == 512, (len(shown), status)
+    
+    # While a notification is on screen the queue fills in severity order, not arrival order
+    busy = threading.Event()
+    busy.set()
+    order = []
+    ranked = NotificationDispatcher(lambda threat_info, severity, count: order.append(severity) or True,
+                                    is_busy=busy.is_set, busy_poll=0.01)
+    for severity in ('low', 'medium', 'high', 'critical'):
+        ranked.submit({'threat_name': f"{severity} threat", 'action_taken': 'alert'}, severity)
+    time.sleep(0.1)
+    assert not order and ranked.get_dispatcher_status()['ready'] == 4
+    busy.clear()
+    deadline = time.monotonic() + 2
+    while len(order) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    ranked.close()
+    assert order == ['critical', 'high', 'medium', 'low'], order
+    
+    # Critical alerts over the token budget are shown as soon as a token refills
+    shown.clear()
+    fast = NotificationDispatcher(deliver, rates={'critical': (20.0, 1), 'low': (1.0, 1)}, coalesce_window=30.0)
+    start = time.monotonic()
+    for name in ('Rootkit A', 'Rootkit B'):
+        fast.submit({'threat_name': name, 'action_taken': 'alert'}, 'critical')
+    deadline = time.monotonic() + 2
+    while len(shown) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    fast.close()
+    assert len(shown) == 2 and shown[1][3] - start < 0.5, [(text, when - start) for text, _, _, when in shown]
+    
+    print(f"✅ Notification dispatcher OK - {status['submitted']} detections shown as {len(texts)} notifications: {texts}")
+
+if __name__ == "__main__":
+    test_notification_dispatcher()
\ No newline at end of file
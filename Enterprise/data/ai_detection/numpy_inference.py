@@ -0,0 +1,235 @@
+"""
+NumPy-Only Threat Inference
+Exports fitted scaler, MLP and behavior IsolationForest to plain arrays and evaluates them without scikit-learn
+"""
+
+import json
+from typing import Dict, List, Any
+import numpy as np
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Average unsuccessful-search path length in a binary tree of n samples"""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n_samples)
+    lengths[n_samples == 2] = 1.0
+    large = n_samples > 2
+    lengths[large] = (2.0 * (np.log(n_samples[large] - 1.0) + np.euler_gamma)
+                      - 2.0 * (n_samples[large] - 1.0) / n_samples[large])
+    return lengths
+
+def export_inference_bundle(scaler, mlp, isolation_forest, path: str):
+    """Write fitted models as flat arrays to an .npz file (the forest is skipped until it is fitted)"""
+    n_features = int(scaler.n_features_in_)
+    arrays = {
+        'scaler_mean': scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features),
+        'scaler_scale': scaler.scale_ if scaler.scale_ is not None else np.ones(n_features),
+        'classes': np.asarray(mlp.classes_)
+    }
+    
+    # Dense layers
+    for i, (weights, bias) in enumerate(zip(mlp.coefs_, mlp.intercepts_)):
+        arrays[f'mlp_weights_{i}'] = np.asarray(weights, dtype=np.float64)
+        arrays[f'mlp_bias_{i}'] = np.asarray(bias, dtype=np.float64)
+    
+    meta = {
+        'n_features': n_features,
+        'n_layers': len(mlp.coefs_),
+        'hidden_activation': mlp.activation,
+        'output_activation': mlp.out_activation_,
+        'anomaly_features': 0
+    }
+    
+    if hasattr(isolation_forest, 'estimators_'):
+        arrays.update(export_isolation_forest(isolation_forest, meta))
+    
+    arrays['meta'] = np.array(json.dumps(meta))
+    np.savez(path, **arrays)
+
+def export_isolation_forest(isolation_forest, meta: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Flatten a fitted IsolationForest into node arrays, recording its scoring constants in meta"""
+    # Isolation trees flattened into one node table; leaves loop back to themselves
+    # and carry the path length sklearn adds for them (depth + c(n_node_samples) - 1)
+    max_features = getattr(isolation_forest, '_max_features', isolation_forest.n_features_in_)
+    subsample_features = max_features != isolation_forest.n_features_in_
+    
+    left, right, feature, threshold, leaf_value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator, features in zip(isolation_forest.estimators_, isolation_forest.estimators_features_):
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        
+        depth = np.zeros(tree.node_count, dtype=np.int64)
+        depth[0] = 1
+        for node in range(tree.node_count):  # children always follow their parent
+            if not is_leaf[node]:
+                depth[tree.children_left[node]] = depth[node] + 1
+                depth[tree.children_right[node]] = depth[node] + 1
+        max_depth = max(max_depth, int(depth.max()))
+        
+        tree_feature = np.where(is_leaf, 0, tree.feature)
+        if subsample_features:
+            tree_feature = np.asarray(features)[tree_feature]
+        
+        left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+        right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+        feature.append(tree_feature)
+        threshold.append(tree.threshold)
+        leaf_value.append(depth + average_path_length(tree.n_node_samples) - 1.0)
+        roots.append(offset)
+        offset += tree.node_count
+    
+    meta.update({
+        'anomaly_features': int(isolation_forest.n_features_in_),
+        'forest_max_depth': max_depth,
+        'forest_normalizer': float(len(isolation_forest.estimators_) *
+                                   average_path_length(np.array([isolation_forest.max_samples_]))[0]),
+        'forest_offset': float(isolation_forest.offset_)
+    })
+    
+    return {
+        'tree_left': np.concatenate(left).astype(np.int64),
+        'tree_right': np.concatenate(right).astype(np.int64),
+        'tree_feature': np.concatenate(feature).astype(np.int64),
+        'tree_threshold': np.concatenate(threshold).astype(np.float64),
+        'tree_leaf_value': np.concatenate(leaf_value).astype(np.float64),
+        'tree_roots': np.asarray(roots, dtype=np.int64)
+    }
+
+ACTIVATIONS = {
+    'identity': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'tanh': np.tanh,
+    'logistic': lambda x: 1.0 / (1.0 + np.exp(-x))
+}
+
+class NumpyThreatModel:
+    """Evaluate an exported scaler + MLP + behavior IsolationForest bundle with NumPy only"""
+    
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.meta = json.loads(str(arrays['meta']))
+        self.mean = arrays['scaler_mean']
+        self.scale = arrays['scaler_scale']
+        self.classes = arrays['classes']
+        
+        self.layers = [
+            (arrays[f'mlp_weights_{i}'], arrays[f'mlp_bias_{i}'])
+            for i in range(self.meta['n_layers'])
+        ]
+        self.hidden_activation = ACTIVATIONS[self.meta['hidden_activation']]
+        
+        # Behavior baseline forest (absent until enough behavior history exists)
+        self.has_baseline = self.meta['anomaly_features'] > 0
+        if self.has_baseline:
+            self.tree_left = arrays['tree_left']
+            self.tree_right = arrays['tree_right']
+            self.tree_feature = arrays['tree_feature']
+            self.tree_threshold = arrays['tree_threshold']
+            self.tree_leaf_value = arrays['tree_leaf_value']
+            self.tree_roots = arrays['tree_roots']
+    
+    @classmethod
+    def load(cls, path: str) -> 'NumpyThreatModel':
+        """Load an exported bundle (no pickled objects are accepted)"""
+        with np.load(path, allow_pickle=False) as bundle:
+            return cls({name: bundle[name] for name in bundle.files})
+    
+    def scale_features(self, features: np.ndarray) -> np.ndarray:
+        """StandardScaler.transform"""
+        return (features - self.mean) / self.scale
+    
+    def predict_levels(self, scaled: np.ndarray) -> np.ndarray:
+        """MLPClassifier.predict"""
+        activations = scaled
+        for weights, bias in self.layers[:-1]:
+            activations = self.hidden_activation(activations @ weights + bias)
+        weights, bias = self.layers[-1]
+        output = activations @ weights + bias
+        
+        # Softmax is monotonic, so argmax of the logits picks the same class
+        if self.meta['output_activation'] == 'softmax':
+            return self.classes[np.argmax(output, axis=1)]
+        if self.meta['output_activation'] == 'logistic':
+            return self.classes[(output[:, 0] > 0.0).astype(np.int64)]  # sigmoid(x) > 0.5
+        raise ValueError(f"Unsupported output activation {self.meta['output_activation']}")
+    
+    def anomaly_scores(self, behavior: np.ndarray) -> np.ndarray:
+        """IsolationForest.decision_function on behavior baseline features"""
+        # Trees compare float32 inputs against float64 thresholds
+        data = np.atleast_2d(behavior).astype(np.float32).astype(np.float64)
+        rows = np.arange(len(data))[:, None]
+        
+        # Walk every (sample, tree) pair down one level per step; leaves point at themselves
+        nodes = np.broadcast_to(self.tree_roots, (len(data), len(self.tree_roots))).copy()
+        for _ in range(self.meta['forest_max_depth']):
+            go_left = data[rows, self.tree_feature[nodes]] <= self.tree_threshold[nodes]
+            nodes = np.where(go_left, self.tree_left[nodes], self.tree_right[nodes])
+        
+        depths = self.tree_leaf_value[nodes].sum(axis=1)
+        normalizer = self.meta['forest_normalizer']
+        scores = -np.power(2.0, -depths / normalizer) if normalizer else -np.ones(len(data))
+        return scores - self.meta['forest_offset']
+    
+    def predict_batch(self, features: np.ndarray) -> List[Dict[str, Any]]:
+        """Threat level for each feature row"""
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        levels = self.predict_levels(self.scale_features(features))
+        return [{'threat_level': int(level)} for level in levels.tolist()]
+    
+    def score_behavior(self, behavior: np.ndarray) -> List[Dict[str, Any]]:
+        """Anomaly status of each behavior row against the endpoint's baseline"""
+        scores = self.anomaly_scores(np.asarray(behavior, dtype=np.float64))
+        return [{'anomaly_score': float(score), 'is_anomaly': bool(score < 0)} for score in scores.tolist()]
+
+# Test function
+def test_numpy_inference():
+    """Parity test of exported evaluators against scikit-learn"""
+    import os
+    import time
+    import warnings
+    import tempfile
+    from sklearn.exceptions import ConvergenceWarning
+    from sklearn.ensemble import IsolationForest
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import StandardScaler
+    
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(2000, 10)) * rng.uniform(1, 50, size=10)
+    y = rng.integers(1, 11, size=2000)
+    queries = np.vstack([rng.normal(size=(5000, 10)) * 60, X[:500]])
+    warnings.filterwarnings('ignore', category=ConvergenceWarning)
+    
+    for activation, classes, max_features in (('relu', y, 1.0), ('tanh', y % 2, 0.6)):
+        scaler = StandardScaler().fit(X)
+        mlp = MLPClassifier(hidden_layer_sizes=(32, 16), activation=activation,
+                            max_iter=50, random_state=1).fit(scaler.transform(X), classes)
+        forest = IsolationForest(contamination=0.1, max_features=max_features, random_state=3).fit(X)
+        
+        path = os.path.join(tempfile.mkdtemp(), 'inference.npz')
+        export_inference_bundle(scaler, mlp, forest, path)
+        
+        start = time.perf_counter()
+        model = NumpyThreatModel.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        
+        scaled = scaler.transform(queries)
+        assert np.allclose(model.scale_features(queries), scaled)
+        assert np.array_equal(model.predict_levels(scaled), mlp.predict(scaled))
+        assert np.allclose(model.anomaly_scores(queries), forest.decision_function(queries), atol=1e-9)
+        
+        results = model.score_behavior(queries)
+        assert [r['is_anomaly'] for r in results] == (forest.predict(queries) == -1).tolist()
+        
+        print(f"✅ {activation} MLP / max_features={max_features} forest match scikit-learn "
+              f"({os.path.getsize(path) // 1024} KB bundle, loaded in {load_ms:.1f} ms)")
+    
+    # Bundles exported before the behavior baseline is fitted still predict threat levels
+    export_inference_bundle(scaler, mlp, IsolationForest(), path)
+    model = NumpyThreatModel.load(path)
+    assert not model.has_baseline
+    assert np.array_equal(model.predict_levels(scaler.transform(queries)), mlp.predict(scaler.transform(queries)))
+    print("✅ Bundle without a behavior baseline loads and predicts")
+
+if __name__ == "__main__":
+    test_numpy_inference()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Micro-Batching Prediction Queue
+Gathers single-row prediction requests from many threads into vectorized batches
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Any, Callable
+import numpy as np
+
+class PredictionBatcher:
+    """Score queued feature vectors together, flushing after max_wait seconds or max_batch items"""
+    
+    def __init__(self, predict_batch: Callable[[np.ndarray], List[Dict[str, Any]]],
+                 max_batch: int = 256, max_wait: float = 0.002):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        
+        self.requests = queue.SimpleQueue()
+        self.worker = None
+        self.worker_lock = threading.Lock()
+        self.running = False
+        
+        # Batching statistics
+        self.batches_scored = 0
+        self.items_scored = 0
+    
+    def start(self):
+        """Start the batching worker thread"""
+        with self.worker_lock:
+            if self.running:
+                return
+            self.running = True
+            self.worker = threading.Thread(target=self.batching_loop, daemon=True, name='prediction-batcher')
+            self.worker.start()
+    
+    def stop(self):
+        """Stop the worker; queued requests are still answered"""
+        self.running = False
+        self.requests.put(None)
+    
+    def submit(self, features) -> Future:
+        """Queue one feature vector; the future resolves to its prediction dict"""
+        if not self.running:
+            self.start()
+        
+        future = Future()
+        self.requests.put((features, future))
+        return future
+    
+    def predict(self, features, timeout: float = 5.0) -> Dict[str, Any]:
+        """Queue one feature vector and wait for its prediction"""
+        return self.submit(features).result(timeout)
+    
+    def batching_loop(self):
+        """Collect requests into batches and score them in one call"""
+        while self.running or not self.requests.empty():
+            request = self.requests.get()
+            if request is None:
+                continue
+            
+            batch = [request]
+            deadline = time.perf_counter() + self.max_wait
+            
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    break
+                batch.append(request)
+            
+            self.score_batch(batch)
+    
+    def score_batch(self, batch: List[tuple]):
+        """Run one vectorized prediction and resolve every future in the batch"""
+        futures = [future for _, future in batch]
+        
+        try:
+            results = self.predict_batch(np.asarray([features for features, _ in batch], dtype=np.float64))
+            for future, result in zip(futures, results):
+                future.set_result(result)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_result({'error': str(e)})
+        
+        self.batches_scored += 1
+        self.items_scored += len(batch)
+    
+    def get_batcher_status(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        return {
+            'running': self.running,
+            'batches_scored': self.batches_scored,
+            'items_scored': self.items_scored,
+            'average_batch_size': self.items_scored / self.batches_scored if self.batches_scored else 0.0
+        }
\ No newline at end of file
@@ -0,0 +1,460 @@
+"""
+Process Provenance Graph
+Incrementally maintained process tree with file and connection provenance for attack-chain correlation
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional
+
+from monitor_events import ProcessRecord, NS_PER_SECOND
+
+def normalize_path(path: str) -> str:
+    """Case-folded Windows form of a file path"""
+    return (path or '').replace('/', '\\').lower()
+
+class ProcessNode:
+    """Compact record of one process instance (pid plus start time)"""
+    
+    __slots__ = ('pid', 'started', 'ppid', 'name', 'image', 'command_line', 'parent', 'children',
+                 'exited', 'files', 'connections', 'children_dropped', 'pruned')
+    
+    def __init__(self, pid: int, started: float, ppid: int, name: str, image: str, command_line: str,
+                 max_files: int, max_connections: int):
+        self.pid = pid
+        self.started = started
+        self.ppid = ppid
+        self.name = sys.intern(name)
+        self.image = image
+        self.command_line = command_line
+        self.parent: Optional['ProcessNode'] = None
+        self.children: List['ProcessNode'] = []
+        self.exited = 0.0
+        self.files = deque(maxlen=max_files)
+        self.connections = deque(maxlen=max_connections)
+        self.children_dropped = 0
+        self.pruned = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Node summary for detections and root-cause views"""
+        return {
+            'pid': self.pid,
+            'ppid': self.ppid,
+            'name': self.name,
+            'image': self.image,
+            'command_line': self.command_line,
+            'started': self.started,
+            'exited': self.exited or None,
+            'files_written': [path for path, _ in self.files],
+            'connections': [remote for remote, _ in self.connections]
+        }
+
+class ProcessGraph:
+    """Live process tree updated on start, exit, file write and connection events"""
+    
+    def __init__(self, database: str = "system_protection.db", retention_seconds: float = 600.0,
+                 max_nodes: int = 20000, max_children: int = 256, max_files: int = 64,
+                 max_connections: int = 32, max_tracked_files: int = 50000):
+        self.database = database
+        self.retention_seconds = retention_seconds
+        self.max_nodes = max_nodes
+        self.max_children = max_children
+        self.max_files = max_files
+        self.max_connections = max_connections
+        self.max_tracked_files = max_tracked_files
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.RLock()
+        
+        # Latest instance of each pid, exited instances in exit order, and children seen before their parent
+        self.nodes: Dict[int, ProcessNode] = {}
+        self.exited = deque()
+        self.unlinked: Dict[int, List[ProcessNode]] = {}
+        
+        # File path -> (writer node, time written), least recently written first
+        self.file_writers: 'OrderedDict[str, tuple]' = OrderedDict()
+        
+        # Processes by most recent activity, for attributing new files
+        self.activity: 'OrderedDict[int, None]' = OrderedDict()
+        
+        self.nodes_spilled = 0
+        
+        self.init_database()
+    
+    def init_database(self):
+        """Create the cold history tables"""
+        conn = sqlite3.connect(self.database)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS process_history (
+                pid INTEGER,
+                started REAL,
+                ppid INTEGER,
+                parent_started REAL,
+                name TEXT,
+                image TEXT,
+                command_line TEXT,
+                exited REAL,
+                PRIMARY KEY (pid, started)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_process_history_parent ON process_history (ppid, parent_started)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS process_files (
+                path TEXT,
+                pid INTEGER,
+                started REAL,
+                written REAL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_process_files_path ON process_files (path)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS process_connections (
+                pid INTEGER,
+                started REAL,
+                remote_address TEXT,
+                seen REAL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+    
+    def process_started(self, proc_info: ProcessRecord) -> ProcessNode:
+        """Add a newly seen process and link it to its parent"""
+        pid = proc_info.pid
+        started = proc_info.create_time_ns / NS_PER_SECOND if proc_info.create_time_ns else time.time()
+        
+        with self.lock:
+            node = self.nodes.get(pid)
+            if node is not None and node.started == started:
+                return node
+            if node is not None and not node.exited:
+                # The pid was reused while the monitor was not looking
+                node.exited = started
+                self.exited.append(node)
+            
+            cmdline = proc_info.cmdline
+            node = ProcessNode(pid, started, proc_info.ppid, proc_info.name,
+                               proc_info.exe or (cmdline[0] if cmdline else ''), proc_info.command_line,
+                               self.max_files, self.max_connections)
+            self.nodes[pid] = node
+            self.touch(pid)
+            
+            # A parent started after its child is a reused pid, not the real parent
+            parent = self.nodes.get(node.ppid)
+            if parent is not None and parent is not node and parent.started <= started:
+                self.link(parent, node)
+            elif node.ppid and node.ppid != pid:
+                self.unlinked.setdefault(node.ppid, []).append(node)
+            
+            # Children listed before this process in the same sweep
+            for child in self.unlinked.pop(pid, []):
+                if child is not node and child.started >= started and child.parent is None:
+                    self.link(node, child)
+            
+            return node
+    
+    def link(self, parent: ProcessNode, child: ProcessNode):
+        """Attach a child, counting children beyond the per-node bound"""
+        child.parent = parent
+        if len(parent.children) < self.max_children:
+            parent.children.append(child)
+        else:
+            parent.children_dropped += 1
+    
+    def touch(self, pid: int):
+        """Mark a process as recently active"""
+        self.activity[pid] = None
+        self.activity.move_to_end(pid)
+        if len(self.activity) > 256:
+            self.activity.popitem(last=False)
+    
+    def process_exited(self, pid: int, timestamp: Optional[float] = None):
+        """Mark a process as exited; it ages out once its whole subtree has exited"""
+        with self.lock:
+            node = self.nodes.get(pid)
+            if node is not None and not node.exited:
+                node.exited = time.time() if timestamp is None else timestamp
+                self.exited.append(node)
+                self.activity.pop(pid, None)
+    
+    def record_file_write(self, path: str, pid: Optional[int], timestamp: Optional[float] = None) -> Optional[ProcessNode]:
+        """Record that a process wrote a file"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            node = self.nodes.get(pid) if pid is not None else None
+            if node is None:
+                return None
+            
+            key = normalize_path(path)
+            node.files.append((key, timestamp))
+            self.file_writers[key] = (node, timestamp)
+            self.file_writers.move_to_end(key)
+            if len(self.file_writers) > self.max_tracked_files:
+                self.file_writers.popitem(last=False)
+            self.touch(pid)
+            return node
+    
+    def record_connection(self, pid: Optional[int], remote_address: str, timestamp: Optional[float] = None):
+        """Record an outbound connection of a process (repeated polls of one connection count once)"""
+        with self.lock:
+            node = self.nodes.get(pid) if pid else None
+            if node is None or any(remote == remote_address for remote, _ in node.connections):
+                return
+            node.connections.append((remote_address, time.time() if timestamp is None else timestamp))
+            self.touch(pid)
+    
+    def get_node(self, pid: int) -> Optional[ProcessNode]:
+        """Latest known instance of a pid"""
+        return self.nodes.get(pid)
+    
+    def recent_processes(self, limit: int = 16) -> List[int]:
+        """Live processes that started, wrote or connected most recently"""
+        with self.lock:
+            return list(reversed(self.activity))[:limit]
+    
+    def ancestry(self, pid: int, max_depth: int = 64) -> List[Dict[str, Any]]:
+        """The process and its ancestors, nearest first"""
+        with self.lock:
+            chain = []
+            node = self.nodes.get(pid)
+            while node is not None and len(chain) < max_depth:
+                chain.append(node.to_dict())
+                node = node.parent
+            return chain
+    
+    def descendants(self, pid: int, include_history: bool = False) -> List[Dict[str, Any]]:
+        """All descendants of a process in depth-first order, optionally including spilled history"""
+        with self.lock:
+            root = self.nodes.get(pid)
+            if root is None:
+                return []
+            
+            found = []
+            stack = list(reversed(root.children))
+            while stack:
+                node = stack.pop()
+                found.append(node.to_dict())
+                stack.extend(reversed(node.children))
+            started = root.started
+        
+        if include_history:
+            seen = {(record['pid'], record['started']) for record in found}
+            found.extend(record for record in self.history_descendants(pid, started)
+                         if (record['pid'], record['started']) not in seen)
+        return found
+    
+    def history_descendants(self, pid: int, started: float) -> List[Dict[str, Any]]:
+        """Spilled descendants of a process instance"""
+        try:
+            conn = sqlite3.connect(self.database)
+            rows = conn.execute('''
+                WITH RECURSIVE tree(pid, started) AS (
+                    SELECT ?, ?
+                    UNION
+                    SELECT h.pid, h.started FROM process_history h
+                    JOIN tree t ON h.ppid = t.pid AND h.parent_started = t.started
+                )
+                SELECT h.pid, h.ppid, h.name, h.image, h.command_line, h.started, h.exited
+                FROM process_history h JOIN tree t ON h.pid = t.pid AND h.started = t.started
+            ''', (pid, started)).fetchall()
+            conn.close()
+        except sqlite3.Error as e:
+            self.logger.error(f"Process history query failed: {e}")
+            return []
+        
+        return [{'pid': row[0], 'ppid': row[1], 'name': row[2], 'image': row[3], 'command_line': row[4],
+                 'started': row[5], 'exited': row[6], 'files_written': [], 'connections': []} for row in rows]
+    
+    def who_dropped(self, path: str) -> Optional[Dict[str, Any]]:
+        """Process that wrote a file and its ancestry, from the live graph or spilled history"""
+        key = normalize_path(path)
+        with self.lock:
+            writer = self.file_writers.get(key)
+            if writer is not None:
+                node, written = writer
+                chain = []
+                while node is not None and len(chain) < 64:
+                    chain.append(node.to_dict())
+                    node = node.parent
+                return {'path': key, 'written': written, 'writer': chain[0], 'ancestry': chain[1:]}
+        
+        try:
+            conn = sqlite3.connect(self.database)
+            row = conn.execute('''
+                SELECT f.written, h.pid, h.ppid, h.name, h.image, h.command_line, h.started, h.exited
+                FROM process_files f JOIN process_history h ON h.pid = f.pid AND h.started = f.started
+                WHERE f.path = ? ORDER BY f.written DESC LIMIT 1
+            ''', (key,)).fetchone()
+            conn.close()
+        except sqlite3.Error as e:
+            self.logger.error(f"File provenance query failed: {e}")
+            return None
+        
+        if row is None:
+            return None
+        writer = {'pid': row[1], 'ppid': row[2], 'name': row[3], 'image': row[4], 'command_line': row[5],
+                  'started': row[6], 'exited': row[7], 'files_written': [key], 'connections': []}
+        return {'path': key, 'written': row[0], 'writer': writer, 'ancestry': []}
+    
+    def prune(self, now: Optional[float] = None) -> int:
+        """Spill exited subtrees older than the retention window to SQLite and drop them"""
+        now = time.time() if now is None else now
+        spilled = []
+        
+        with self.lock:
+            held = []
+            while self.exited:
+                node = self.exited[0]
+                over_capacity = len(self.nodes) > self.max_nodes
+                if node.exited > now - self.retention_seconds and not over_capacity:
+                    break
+                self.exited.popleft()
+                
+                if node.pruned:
+                    continue
+                if self.has_live_descendant(node):
+                    # Kept (with its pointers) until the live part of its subtree exits
+                    held.append(node)
+                    continue
+                self.detach_subtree(node, spilled)
+            
+            self.exited.extendleft(reversed(held))
+            
+            if spilled:
+                # Children listed before parents that never appeared
+                live_pids = set(self.nodes)
+                for ppid in [ppid for ppid in self.unlinked if ppid not in live_pids]:
+                    self.unlinked[ppid] = [child for child in self.unlinked[ppid] if child.pid in live_pids]
+                    if not self.unlinked[ppid]:
+                        del self.unlinked[ppid]
+        
+        if spilled:
+            self.spill(spilled)
+        return len(spilled)
+    
+    def has_live_descendant(self, node: ProcessNode) -> bool:
+        """Whether any process in the subtree is still running"""
+        stack = list(node.children)
+        while stack:
+            child = stack.pop()
+            if not child.exited:
+                return True
+            stack.extend(child.children)
+        return False
+    
+    def detach_subtree(self, root: ProcessNode, spilled: List[ProcessNode]):
+        """Remove an exited subtree from the live indexes"""
+        if root.parent is not None and root in root.parent.children:
+            root.parent.children.remove(root)
+        
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children)
+            node.pruned = True
+            spilled.append(node)
+            if self.nodes.get(node.pid) is node:
+                del self.nodes[node.pid]
+            for path, _ in node.files:
+                writer = self.file_writers.get(path)
+                if writer is not None and writer[0] is node:
+                    del self.file_writers[path]
+    
+    def spill(self, nodes: List[ProcessNode]):
+        """Write pruned process instances with their files and connections to the history tables"""
+        try:
+            conn = sqlite3.connect(self.database)
+            conn.executemany('''
+                INSERT OR REPLACE INTO process_history
+                (pid, started, ppid, parent_started, name, image, command_line, exited)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(node.pid, node.started, node.ppid, node.parent.started if node.parent else None,
+                   node.name, node.image, node.command_line, node.exited or None) for node in nodes])
+            conn.executemany('INSERT INTO process_files (path, pid, started, written) VALUES (?, ?, ?, ?)',
+                             [(path, node.pid, node.started, written) for node in nodes for path, written in node.files])
+            conn.executemany('INSERT INTO process_connections (pid, started, remote_address, seen) VALUES (?, ?, ?, ?)',
+                             [(node.pid, node.started, remote, seen) for node in nodes for remote, seen in node.connections])
+            conn.commit()
+            conn.close()
+            self.nodes_spilled += len(nodes)
+        
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to spill process history: {e}")
+    
+    def get_graph_status(self) -> Dict[str, Any]:
+        """Graph size counters"""
+        with self.lock:
+            return {
+                'nodes': len(self.nodes),
+                'live_processes': sum(1 for node in self.nodes.values() if not node.exited),
+                'exited_pending': len(self.exited),
+                'tracked_files': len(self.file_writers),
+                'nodes_spilled': self.nodes_spilled
+            }
+
+def test_process_graph():
+    """Build a dropper chain, query it, age it out and query the spilled history"""
+    import tempfile
+    
+    handle, database = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    graph = ProcessGraph(database, retention_seconds=60)
+    now = time.time()
+    
+    # Child listed before its parent in the first sweep, then a dropper chain below it
+    graph.process_started(ProcessRecord.from_info({'pid': 20, 'ppid': 10, 'name': 'winword.exe', 'create_time': now - 50, 'cmdline': ['winword.exe', 'invoice.doc']}))
+    graph.process_started(ProcessRecord.from_info({'pid': 10, 'ppid': 1, 'name': 'explorer.exe', 'create_time': now - 100, 'cmdline': ['explorer.exe']}))
+    graph.process_started(ProcessRecord.from_info({'pid': 30, 'ppid': 20, 'name': 'powershell.exe', 'create_time': now - 40, 'cmdline': ['powershell.exe', '-enc', 'AAA']}))
+    graph.record_file_write('C:\\Users\\bob\\AppData\\Local\\Temp\\payload.exe', 30, now - 39)
+    graph.process_started(ProcessRecord.from_info({'pid': 40, 'ppid': 30, 'name': 'payload.exe', 'create_time': now - 38, 'exe': 'C:\\Users\\bob\\AppData\\Local\\Temp\\payload.exe'}))
+    graph.record_connection(40, '203.0.113.7:4444', now - 37)
+    graph.record_connection(40, '203.0.113.7:4444', now - 30)
+    
+    assert [node['pid'] for node in graph.descendants(20)] == [30, 40]
+    assert [node['name'] for node in graph.ancestry(40)] == ['payload.exe', 'powershell.exe', 'winword.exe', 'explorer.exe']
+    dropped = graph.who_dropped('c:/users/bob/appdata/local/temp/PAYLOAD.EXE')
+    assert dropped['writer']['pid'] == 30 and dropped['ancestry'][0]['name'] == 'winword.exe'
+    assert graph.get_node(40).to_dict()['connections'] == ['203.0.113.7:4444']
+    
+    # A pid reused by a newer process is not the parent of older processes
+    graph.process_started(ProcessRecord.from_info({'pid': 50, 'ppid': 99, 'name': 'old.exe', 'create_time': now - 90}))
+    graph.process_started(ProcessRecord.from_info({'pid': 99, 'ppid': 10, 'name': 'new.exe', 'create_time': now - 10}))
+    assert graph.get_node(50).parent is None
+    
+    # An exited parent with a live child stays; whole exited subtrees age out to SQLite
+    graph.process_exited(20, now - 35)
+    graph.process_exited(30, now - 35)
+    assert graph.prune(now + 100) == 0
+    graph.process_exited(40, now - 20)
+    assert graph.prune(now + 100) == 3
+    assert graph.get_node(20) is None and [node['pid'] for node in graph.descendants(10)] == [99]
+    assert graph.who_dropped('C:\\Users\\bob\\AppData\\Local\\Temp\\payload.exe')['writer']['name'] == 'powershell.exe'
+    history = graph.descendants(10, include_history=True)
+    assert {node['pid'] for node in history} == {20, 30, 40, 99}, history
+    
+    # Over capacity, recently exited processes are spilled until the graph is back at its limit
+    small = ProcessGraph(database, retention_seconds=60, max_nodes=5)
+    for pid in range(200, 210):
+        small.process_started(ProcessRecord.from_info({'pid': pid, 'ppid': 1, 'name': 'job.exe', 'create_time': now - 5}))
+        small.process_exited(pid, now - 1)
+    assert small.prune(now) == 5 and len(small.nodes) == 5
+    
+    # Incremental updates stay cheap on a large tree
+    start = time.perf_counter()
+    for i in range(20000):
+        graph.process_started(ProcessRecord.from_info({'pid': 1000 + i, 'ppid': 1000 + (i - 1) // 8 if i else 10, 'name': 'svc.exe', 'create_time': now + i * 1e-3}))
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    subtree = graph.descendants(1000)
+    query_ms = (time.perf_counter() - start) * 1000
+    
+    print(f"✅ Process graph OK - {20000 / elapsed:.0f} starts/s, {len(subtree)} descendants in {query_ms:.1f} ms, "
+          f"status {graph.get_graph_status()}")
+    os.remove(database)
+
+if __name__ == "__main__":
+    test_process_graph()
\ No newline at end of file
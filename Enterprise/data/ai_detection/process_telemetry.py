@@ -0,0 +1,273 @@
+"""
+Per-Process Resource Telemetry
+Array-backed ring buffers for cryptominer and memory-leak detection
+"""
+
+import time
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+import psutil
+
+# Column layout of every telemetry sample
+TELEMETRY_FIELDS = ('timestamp', 'cpu_time', 'rss', 'io_bytes', 'num_threads')
+TS, CPU, RSS, IO, THREADS = range(len(TELEMETRY_FIELDS))
+
+class ProcessTelemetryCollector:
+    """Sample per-process resources into fixed-size ring buffers keyed by (pid, create_time)"""
+    
+    def __init__(self, max_processes: int = 2048, capacity: int = 64,
+                 min_interval: float = 5.0, max_interval: float = 60.0, history_seconds: float = 900.0):
+        self.max_processes = max_processes
+        self.capacity = capacity
+        # Samples closer together than this are merged, so the ring spans history_seconds at any sample rate
+        self.sample_spacing = history_seconds / (capacity - 2)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.current_interval = min_interval
+        
+        # One slab holds every ring buffer: slot x sample x field
+        self.buffers = np.zeros((max_processes, capacity, len(TELEMETRY_FIELDS)), dtype=np.float64)
+        self.heads = np.zeros(max_processes, dtype=np.int64)
+        self.counts = np.zeros(max_processes, dtype=np.int64)
+        
+        # (pid, create_time) -> slot
+        self.slots: Dict[Tuple[int, float], int] = {}
+        self.slot_keys: Dict[int, Tuple[int, float]] = {}
+        self.slot_names: Dict[int, str] = {}
+        self.free_slots = list(range(max_processes - 1, -1, -1))
+        
+        self.total_memory = psutil.virtual_memory().total
+        self.samples_taken = 0
+    
+    def sample(self) -> int:
+        """Take one sample of every visible process, returning the number sampled"""
+        now = time.time()
+        seen = set()
+        
+        attributes = ['pid', 'name', 'create_time', 'cpu_times', 'memory_info', 'num_threads', 'io_counters']
+        for proc in psutil.process_iter(attributes, ad_value=None):
+            try:
+                info = proc.info
+                if info['create_time'] is None or info['cpu_times'] is None:
+                    continue
+                
+                key = (info['pid'], info['create_time'])
+                slot = self.slots.get(key)
+                if slot is None:
+                    if not self.free_slots:
+                        continue
+                    slot = self.free_slots.pop()
+                    self.slots[key] = slot
+                    self.slot_keys[slot] = key
+                    self.slot_names[slot] = info['name'] or ''
+                    self.heads[slot] = 0
+                    self.counts[slot] = 0
+                
+                seen.add(key)
+                
+                io = info['io_counters']
+                memory = info['memory_info']
+                self.record(slot, (
+                    now,
+                    info['cpu_times'].user + info['cpu_times'].system,
+                    memory.rss if memory else 0,
+                    (io.read_bytes + io.write_bytes) if io else 0,
+                    info['num_threads'] or 0
+                ))
+            
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        
+        # Release slots of exited processes (pid reuse gets a new key via create_time)
+        for key in [key for key in self.slots if key not in seen]:
+            slot = self.slots.pop(key)
+            self.slot_keys.pop(slot, None)
+            self.slot_names.pop(slot, None)
+            self.counts[slot] = 0
+            self.free_slots.append(slot)
+        
+        self.samples_taken += 1
+        self.adapt_interval()
+        return len(seen)
+    
+    def record(self, slot: int, row):
+        """Write one sample into a slot's ring buffer"""
+        # Counters are cumulative, so until the newest sample is sample_spacing past the one before
+        # it keeps being replaced by fresher samples
+        if self.counts[slot] >= 2:
+            newest = (self.heads[slot] - 1) % self.capacity
+            previous = (self.heads[slot] - 2) % self.capacity
+            if self.buffers[slot, newest, TS] - self.buffers[slot, previous, TS] < self.sample_spacing:
+                self.buffers[slot, newest] = row
+                return
+        
+        self.buffers[slot, self.heads[slot]] = row
+        self.heads[slot] = (self.heads[slot] + 1) % self.capacity
+        self.counts[slot] = min(self.counts[slot] + 1, self.capacity)
+    
+    def _ordered(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Chronologically ordered samples for slots plus a validity mask (valid samples first)"""
+        ages = np.arange(self.capacity)
+        # Oldest valid sample sits at head - count
+        indices = (self.heads[slots, None] - self.counts[slots, None] + ages[None, :]) % self.capacity
+        ordered = np.take_along_axis(self.buffers[slots], indices[:, :, None], axis=1)
+        valid = ages[None, :] < self.counts[slots, None]
+        return ordered, valid
+    
+    def _latest(self, data: np.ndarray, slots: np.ndarray, field: int) -> np.ndarray:
+        """Newest sample of a field in ordered data - position count - 1, not -1, until a ring is full"""
+        return np.take_along_axis(data[:, :, field], self.counts[slots, None] - 1, axis=1)[:, 0]
+    
+    def _active_slots(self, min_samples: int = 2) -> np.ndarray:
+        """Slots of live processes with enough samples"""
+        slots = np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))
+        return slots[self.counts[slots] >= min_samples]
+    
+    def sustained_high_cpu(self, threshold_percent: float = 80.0,
+                           duration: float = 300.0) -> List[Dict[str, Any]]:
+        """Processes whose CPU usage stayed above threshold for the whole duration"""
+        slots = self._active_slots()
+        if len(slots) == 0:
+            return []
+        
+        data, valid = self._ordered(slots)
+        now = self._latest(data, slots, TS)
+        
+        # Per-interval CPU percent of one core between consecutive samples
+        dt = np.diff(data[:, :, TS], axis=1)
+        dcpu = np.diff(data[:, :, CPU], axis=1)
+        pair_valid = valid[:, 1:] & valid[:, :-1] & (dt > 0)
+        interval_cpu = np.where(pair_valid, dcpu / np.where(dt > 0, dt, 1.0) * 100.0, np.inf)
+        
+        # Only intervals that end inside the duration window count
+        in_window = pair_valid & (data[:, 1:, TS] > (now - duration)[:, None])
+        covered = np.where(in_window, dt, 0.0).sum(axis=1)
+        minimum = np.where(in_window, interval_cpu, np.inf).min(axis=1)
+        mean = np.where(in_window, dcpu, 0.0).sum(axis=1) / np.where(covered > 0, covered, 1.0) * 100.0
+        
+        hits = np.flatnonzero((covered >= duration * 0.9) & (minimum >= threshold_percent))
+        return [{
+            'pid': self._pid_for_slot(slots[i]),
+            'name': self.slot_names.get(int(slots[i]), ''),
+            'cpu_percent': float(mean[i]),
+            'min_cpu_percent': float(minimum[i]),
+            'duration': float(covered[i])
+        } for i in hits]
+    
+    def memory_growth(self, min_duration: float = 600.0,
+                      min_bytes_per_minute: float = 5 * 1024 * 1024) -> List[Dict[str, Any]]:
+        """Processes with steady RSS growth (least-squares slope over their history)"""
+        slots = self._active_slots(min_samples=4)
+        if len(slots) == 0:
+            return []
+        
+        data, valid = self._ordered(slots)
+        weight = valid.astype(np.float64)
+        n = weight.sum(axis=1)
+        
+        latest_time = self._latest(data, slots, TS)
+        t = data[:, :, TS] - latest_time[:, None]
+        rss = data[:, :, RSS]
+        t_mean = (t * weight).sum(axis=1) / n
+        rss_mean = (rss * weight).sum(axis=1) / n
+        
+        t_centered = (t - t_mean[:, None]) * weight
+        variance = (t_centered ** 2).sum(axis=1)
+        slope = np.where(variance > 0,
+                         (t_centered * (rss - rss_mean[:, None])).sum(axis=1) / np.where(variance > 0, variance, 1.0),
+                         0.0)
+        
+        first_time = np.where(valid, data[:, :, TS], np.inf).min(axis=1)
+        span = latest_time - first_time
+        latest_rss = self._latest(data, slots, RSS)
+        
+        hits = np.flatnonzero((span >= min_duration) & (slope * 60.0 >= min_bytes_per_minute))
+        return [{
+            'pid': self._pid_for_slot(slots[i]),
+            'name': self.slot_names.get(int(slots[i]), ''),
+            'rss': float(latest_rss[i]),
+            'growth_bytes_per_minute': float(slope[i] * 60.0),
+            'observed_seconds': float(span[i])
+        } for i in hits]
+    
+    def high_memory_processes(self, percent: float = 50.0) -> List[Dict[str, Any]]:
+        """Processes whose latest RSS exceeds a share of physical memory"""
+        slots = self._active_slots(min_samples=1)
+        if len(slots) == 0:
+            return []
+        
+        latest = self.buffers[slots, (self.heads[slots] - 1) % self.capacity, RSS]
+        usage = latest / self.total_memory * 100.0
+        
+        return [{
+            'pid': self._pid_for_slot(slots[i]),
+            'name': self.slot_names.get(int(slots[i]), ''),
+            'memory_percent': float(usage[i])
+        } for i in np.flatnonzero(usage > percent)]
+    
+    def _pid_for_slot(self, slot) -> Optional[int]:
+        """Pid owning a slot"""
+        key = self.slot_keys.get(int(slot))
+        return key[0] if key else None
+    
+    def adapt_interval(self):
+        """Sample faster while any process is busy, back off when idle"""
+        slots = self._active_slots()
+        busy = False
+        
+        if len(slots):
+            latest = (self.heads[slots] - 1) % self.capacity
+            previous = (self.heads[slots] - 2) % self.capacity
+            dt = self.buffers[slots, latest, TS] - self.buffers[slots, previous, TS]
+            dcpu = self.buffers[slots, latest, CPU] - self.buffers[slots, previous, CPU]
+            cpu = np.where(dt > 0, dcpu / np.where(dt > 0, dt, 1.0), 0.0) * 100.0
+            busy = bool((cpu >= 50.0).any())
+        
+        if busy:
+            self.current_interval = self.min_interval
+        else:
+            self.current_interval = min(self.max_interval, self.current_interval * 1.5)
+    
+    def next_interval(self) -> float:
+        """Seconds until the next sample should be taken"""
+        return self.current_interval
+    
+    def get_telemetry_status(self) -> Dict[str, Any]:
+        """Get collector statistics"""
+        return {
+            'tracked_processes': len(self.slots),
+            'samples_taken': self.samples_taken,
+            'sample_interval': self.current_interval,
+            'buffer_bytes': int(self.buffers.nbytes)
+        }
+
+def test_process_telemetry():
+    """Partly filled rings must be read at their newest sample; a full ring must span the detection windows"""
+    collector = ProcessTelemetryCollector(max_processes=4, capacity=64)
+    start = time.time() - 3600
+    
+    # Five samples 200 s apart, +50 MB each, in a ring far from full
+    leak, miner = 0, 1
+    for slot, key in ((leak, (100, 1.0)), (miner, (200, 2.0))):
+        collector.slots[key] = slot
+        collector.slot_keys[slot] = key
+        collector.slot_names[slot] = f"proc{slot}"
+    for i in range(5):
+        collector.record(leak, (start + i * 200, 1.0, 100e6 + i * 50e6, 0, 4))
+    leaks = collector.memory_growth(min_duration=600)
+    assert [proc['pid'] for proc in leaks] == [100], leaks
+    assert leaks[0]['rss'] == 300e6 and leaks[0]['observed_seconds'] == 800, leaks
+    
+    # A busy process sampled every 5 s for 20 minutes: samples merge, the ring still covers 600 s and more
+    for i in range(240):
+        collector.record(miner, (start + i * 5, i * 5 * 0.95, 50e6, 0, 8))
+    history = collector.buffers[miner, :, TS]
+    assert history.max() - history[history > 0].min() >= 600
+    miners = collector.sustained_high_cpu(threshold_percent=80.0, duration=300.0)
+    assert [proc['pid'] for proc in miners] == [200] and miners[0]['cpu_percent'] > 90, miners
+    
+    print(f"✅ Process telemetry OK - leak at {leaks[0]['growth_bytes_per_minute'] / 1024 / 1024:.1f} MB/min, "
+          f"miner ring spans {history.max() - history[history > 0].min():.0f}s in {collector.capacity} samples")
+
+if __name__ == "__main__":
+    test_process_telemetry()
\ No newline at end of file
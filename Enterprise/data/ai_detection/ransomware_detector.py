@@ -0,0 +1,338 @@
+"""
+Streaming Ransomware Mass-Encryption Detector
+Per-process sliding windows over file events with O(1) updates
+"""
+
+import os
+import time
+import random
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    from entropy_analysis import EntropyAnalyzer
+    ENTROPY_AVAILABLE = True
+except ImportError:
+    ENTROPY_AVAILABLE = False
+
+# Extensions appended by well-known ransomware families
+RANSOMWARE_EXTENSIONS = {
+    '.wncry', '.wcry', '.locky', '.encrypted', '.crypt', '.crypted', '.locked',
+    '.cerber', '.zepto', '.ryk', '.lockbit', '.enc', '.petya', '.crab'
+}
+
+# Behavioral rule this detector implements (behavioral_rules.txt)
+RULE_NAME = "Mass File Encryption"
+RULE_CATEGORY = "Ransomware_Activity"
+RULE_SEVERITY = 10
+
+class ActivityWindow:
+    """Time-bucketed ring of file activity counters for a single process"""
+    
+    __slots__ = ('bucket_ids', 'writes', 'renames', 'extension_changes', 'high_entropy_writes',
+                 'ransom_extensions', 'totals', 'last_bucket', 'last_verdict')
+    
+    COUNTERS = ('writes', 'renames', 'extension_changes', 'high_entropy_writes', 'ransom_extensions')
+    
+    def __init__(self, bucket_count: int):
+        self.bucket_ids = [-1] * bucket_count
+        self.writes = [0] * bucket_count
+        self.renames = [0] * bucket_count
+        self.extension_changes = [0] * bucket_count
+        self.high_entropy_writes = [0] * bucket_count
+        self.ransom_extensions = [0] * bucket_count
+        self.totals = dict.fromkeys(self.COUNTERS, 0)
+        self.last_bucket = -1
+        self.last_verdict = 0.0
+    
+    def advance(self, bucket: int):
+        """Expire buckets that fell out of the window (amortized O(1))"""
+        bucket_count = len(self.bucket_ids)
+        
+        if self.last_bucket >= 0 and bucket - self.last_bucket >= bucket_count:
+            # Idle longer than the whole window - everything expired
+            for name in self.COUNTERS:
+                getattr(self, name)[:] = [0] * bucket_count
+                self.totals[name] = 0
+            self.bucket_ids = [-1] * bucket_count
+        else:
+            start = max(self.last_bucket + 1, bucket - bucket_count + 1)
+            for expired in range(start, bucket + 1):
+                slot = expired % bucket_count
+                if self.bucket_ids[slot] != expired:
+                    for name in self.COUNTERS:
+                        counters = getattr(self, name)
+                        self.totals[name] -= counters[slot]
+                        counters[slot] = 0
+                    self.bucket_ids[slot] = expired
+        
+        if bucket > self.last_bucket:
+            self.last_bucket = bucket
+    
+    def add(self, bucket: int, name: str, amount: int = 1):
+        """Add to a counter in the current bucket"""
+        slot = bucket % len(self.bucket_ids)
+        getattr(self, name)[slot] += amount
+        self.totals[name] += amount
+
+class RansomwareDetector:
+    """Detect mass file encryption bursts from a stream of file events"""
+    
+    def __init__(self, window_seconds: float = 10.0, bucket_seconds: float = 1.0):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = max(1, int(round(window_seconds / bucket_seconds)))
+        
+        # Detection thresholds within one window
+        self.min_writes = 25
+        self.high_entropy_ratio = 0.7
+        self.min_extension_changes = 15
+        self.min_renames = 40
+        self.min_ransom_extensions = 3
+        self.verdict_cooldown = 60.0
+        
+        # Entropy above this (bits/byte) counts as encrypted content
+        self.entropy_threshold = 7.5
+        self.entropy_sample_bytes = 64 * 1024
+        
+        self.windows: Dict[str, ActivityWindow] = {}
+        self.max_tracked_processes = 4096
+        self.events_processed = 0
+        self.verdicts: List[Dict[str, Any]] = []
+        
+        self.entropy_analyzer = EntropyAnalyzer() if ENTROPY_AVAILABLE else None
+    
+    def sample_entropy(self, file_path: str) -> Optional[float]:
+        """Entropy of the first bytes of a file (what was just written)"""
+        if not self.entropy_analyzer:
+            return None
+        
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(self.entropy_sample_bytes)
+            if not head:
+                return None
+            histogram = self.entropy_analyzer.byte_histogram(head)
+            return self.entropy_analyzer.entropy_from_histogram(histogram)
+        except OSError:
+            return None
+    
+    def observe_file_event(self, event, process_key: str = "unknown") -> Optional[Dict[str, Any]]:
+        """Feed a watchdog file system event into the detector"""
+        event_type = event.event_type
+        src_path = event.src_path
+        dest_path = getattr(event, 'dest_path', None)
+        
+        entropy = None
+        if event_type in ('created', 'modified'):
+            entropy = self.sample_entropy(src_path)
+        elif event_type == 'moved' and dest_path:
+            entropy = self.sample_entropy(dest_path)
+        
+        return self.record_event(process_key, event_type, src_path, dest_path, entropy)
+    
+    def record_event(self, process_key: str, event_type: str, path: str,
+                     dest_path: Optional[str] = None, entropy: Optional[float] = None,
+                     timestamp: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Record one file event, returning a verdict if an encryption burst is detected"""
+        timestamp = time.time() if timestamp is None else timestamp
+        bucket = int(timestamp // self.bucket_seconds)
+        self.events_processed += 1
+        
+        window = self.windows.get(process_key)
+        if window is None:
+            if len(self.windows) >= self.max_tracked_processes:
+                self.evict_idle_windows(bucket)
+            window = ActivityWindow(self.bucket_count)
+            self.windows[process_key] = window
+        
+        # Late events are counted in the current bucket
+        bucket = max(bucket, window.last_bucket)
+        window.advance(bucket)
+        
+        if event_type in ('created', 'modified'):
+            window.add(bucket, 'writes')
+            if entropy is not None and entropy >= self.entropy_threshold:
+                window.add(bucket, 'high_entropy_writes')
+            if os.path.splitext(path)[1].lower() in RANSOMWARE_EXTENSIONS:
+                window.add(bucket, 'ransom_extensions')
+        
+        elif event_type == 'moved' and dest_path:
+            window.add(bucket, 'renames')
+            old_ext = os.path.splitext(path)[1].lower()
+            new_ext = os.path.splitext(dest_path)[1].lower()
+            
+            if old_ext != new_ext:
+                window.add(bucket, 'extension_changes')
+            if new_ext in RANSOMWARE_EXTENSIONS:
+                window.add(bucket, 'ransom_extensions')
+            if entropy is not None and entropy >= self.entropy_threshold:
+                window.add(bucket, 'high_entropy_writes')
+        
+        return self.evaluate(process_key, window, timestamp)
+    
+    def evaluate(self, process_key: str, window: ActivityWindow, timestamp: float) -> Optional[Dict[str, Any]]:
+        """Check window totals against detection thresholds"""
+        totals = window.totals
+        reasons = []
+        
+        writes = totals['writes'] + totals['renames']
+        if writes >= self.min_writes and totals['high_entropy_writes'] / writes >= self.high_entropy_ratio:
+            reasons.append("high_entropy_write_burst")
+        
+        # Extension changes are renames too, so the two make one signal
+        if totals['extension_changes'] >= self.min_extension_changes:
+            reasons.append("mass_extension_change")
+        elif totals['renames'] >= self.min_renames:
+            reasons.append("mass_rename")
+        
+        if totals['ransom_extensions'] >= self.min_ransom_extensions:
+            reasons.append("known_ransomware_extension")
+        
+        # Watchdog events carry no process, so renames from every program meet in one window;
+        # a verdict needs encrypted content or a ransom extension plus a second signal
+        content_signals = {"high_entropy_write_burst", "known_ransomware_extension"}.intersection(reasons)
+        if len(reasons) < 2 or not content_signals:
+            return None
+        
+        if timestamp - window.last_verdict < self.verdict_cooldown:
+            return None
+        window.last_verdict = timestamp
+        
+        verdict = {
+            'process': process_key,
+            'threat_name': RULE_NAME,
+            'category': RULE_CATEGORY,
+            'severity': RULE_SEVERITY,
+            'reasons': reasons,
+            'window_seconds': self.window_seconds,
+            'counters': dict(totals),
+            'timestamp': datetime.fromtimestamp(timestamp).isoformat()
+        }
+        self.verdicts.append(verdict)
+        del self.verdicts[:-100]
+        
+        return verdict
+    
+    def evict_idle_windows(self, bucket: int):
+        """Drop windows with no activity in the current window span"""
+        idle = [key for key, window in self.windows.items()
+                if bucket - window.last_bucket >= self.bucket_count]
+        for key in idle:
+            del self.windows[key]
+    
+    def get_detector_status(self) -> Dict[str, Any]:
+        """Get detector statistics"""
+        return {
+            'events_processed': self.events_processed,
+            'tracked_processes': len(self.windows),
+            'verdicts': len(self.verdicts),
+            'window_seconds': self.window_seconds
+        }
+
+def generate_synthetic_trace(benign_events: int = 50000, ransomware_files: int = 400,
+                             files_per_second: float = 150.0, seed: int = 42) -> Tuple[List[tuple], float]:
+    """Generate a file-churn trace with background activity and one encryption burst"""
+    rng = random.Random(seed)
+    trace = []
+    start = 1_700_000_000.0
+    duration = 600.0
+    
+    benign_processes = ['explorer.exe', 'winword.exe', 'chrome.exe', 'outlook.exe', 'msbuild.exe']
+    benign_extensions = ['.docx', '.xlsx', '.txt', '.log', '.tmp', '.png', '.obj']
+    
+    for _ in range(benign_events):
+        timestamp = start + rng.random() * duration
+        process = rng.choice(benign_processes)
+        ext = rng.choice(benign_extensions)
+        path = f"C:\\Users\\user\\Documents\\file_{rng.randint(0, 5000)}{ext}"
+        
+        roll = rng.random()
+        if roll < 0.85:
+            # Compressed formats legitimately carry high entropy
+            entropy = rng.uniform(7.6, 7.99) if ext in ('.docx', '.xlsx', '.png') else rng.uniform(3.0, 6.0)
+            trace.append((timestamp, process, 'modified', path, None, entropy))
+        elif roll < 0.95:
+            trace.append((timestamp, process, 'moved', path, path.replace(ext, '.bak'), None))
+        else:
+            trace.append((timestamp, process, 'created', path, None, rng.uniform(3.0, 6.0)))
+    
+    # Encrypt-then-rename burst
+    burst_start = start + duration / 2
+    for index in range(ransomware_files):
+        timestamp = burst_start + index / files_per_second
+        path = f"C:\\Users\\user\\Documents\\victim_{index}{rng.choice(benign_extensions)}"
+        trace.append((timestamp, 'svch0st.exe', 'modified', path, None, rng.uniform(7.95, 8.0)))
+        trace.append((timestamp + 0.001, 'svch0st.exe', 'moved', path, path + '.locked', 7.99))
+    
+    trace.sort(key=lambda item: item[0])
+    return trace, burst_start
+
+def benchmark_replay(benign_events: int = 50000, ransomware_files: int = 400) -> Dict[str, Any]:
+    """Replay a synthetic ransomware trace and measure throughput and detection latency"""
+    trace, burst_start = generate_synthetic_trace(benign_events, ransomware_files)
+    detector = RansomwareDetector()
+    
+    false_positives = 0
+    detection_time = None
+    
+    start_time = time.perf_counter()
+    for timestamp, process, event_type, path, dest_path, entropy in trace:
+        verdict = detector.record_event(process, event_type, path, dest_path, entropy, timestamp)
+        if verdict:
+            if process == 'svch0st.exe':
+                if detection_time is None:
+                    detection_time = timestamp
+            else:
+                false_positives += 1
+    elapsed = time.perf_counter() - start_time
+    
+    return {
+        'events': len(trace),
+        'elapsed_seconds': elapsed,
+        'events_per_second': len(trace) / elapsed if elapsed > 0 else 0.0,
+        'detected': detection_time is not None,
+        'detection_latency_seconds': (detection_time - burst_start) if detection_time else None,
+        'false_positives': false_positives
+    }
+
+def test_ransomware_detector():
+    """Rename storms alone stay quiet; encryption plus renames is detected"""
+    detector = RansomwareDetector()
+    start = 1_700_000_000.0
+    
+    # A build renaming hundreds of intermediates changes extensions en masse
+    for index in range(300):
+        path = f"C:\\build\\obj\\unit_{index}.tmp"
+        assert detector.record_event("unknown", 'moved', path, path[:-4] + '.obj', 4.0, start + index / 100) is None
+    
+    # Encrypting files in place and renaming them is still detected
+    verdict = None
+    for index in range(100):
+        timestamp = start + 60 + index / 100
+        path = f"C:\\Users\\user\\Documents\\report_{index}.docx"
+        detector.record_event("svch0st.exe", 'modified', path, None, 7.98, timestamp)
+        verdict = detector.record_event("svch0st.exe", 'moved', path, path + '.bak', 7.98, timestamp) or verdict
+    assert verdict and verdict['reasons'] == ["high_entropy_write_burst", "mass_extension_change"]
+    
+    results = benchmark_replay()
+    assert results['detected'] and results['false_positives'] == 0
+    
+    print("✅ Ransomware detector OK")
+
+def main():
+    """Run the synthetic trace replay benchmark"""
+    print("🔐 CyberDefense AI - Ransomware Detector Replay Benchmark")
+    print("-" * 60)
+    
+    results = benchmark_replay()
+    
+    print(f"   Events replayed: {results['events']}")
+    print(f"   Throughput: {results['events_per_second']:,.0f} events/s")
+    print(f"   Burst detected: {results['detected']}")
+    if results['detected']:
+        print(f"   Detection latency: {results['detection_latency_seconds']:.2f}s after burst start")
+    print(f"   False positives: {results['false_positives']}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -27,6 +27,8 @@ try:
 except ImportError:
     WINDOWS_API_AVAILABLE = False
 
+from adaptive_scheduler import AdaptiveScheduler
+
 class SecureBootProtection:
     """Advanced boot sector protection and monitoring"""
     
@@ -42,6 +44,10 @@ class SecureBootProtection:
         self.monitoring_thread = None
         self.stop_monitoring = False
         
+        # Adaptive check cadence (base 30s, 10s under threat, up to 5 min when idle)
+        self.scheduler = AdaptiveScheduler()
+        self.scheduler.register('boot', 30, 10, 300)
+        
         # Initialize database and baseline
         self.init_database()
         self.create_boot_baseline()
@@ -197,6 +203,7 @@ class SecureBootProtection:
         
         self.protection_active = True
         self.stop_monitoring = False
+        self.scheduler.start()
         
         self.monitoring_thread = threading.Thread(
             target=self.boot_monitoring_loop,
@@ -210,6 +217,7 @@ class SecureBootProtection:
         """Stop boot sector monitoring"""
         self.protection_active = False
         self.stop_monitoring = True
+        self.scheduler.stop()
         
         if self.monitoring_thread and self.monitoring_thread.is_alive():
             self.monitoring_thread.join(timeout=5)
@@ -231,7 +239,7 @@ class SecureBootProtection:
                 self.check_firmware_integrity()
                 
                 # Sleep before next check
-                time.sleep(30)  # Check every 30 seconds
+                self.scheduler.wait('boot')
                 
             except Exception as e:
                 print(f"❌ Boot monitoring error: {e}")
@@ -340,6 +348,8 @@ class SecureBootProtection:
             
             print(f"🚨 BOOT THREAT DETECTED: {threat_type}")
             
+            self.scheduler.record_detection()
+            
             # Log threat to database
             self.log_boot_threat(threat_info)
             
@@ -11,7 +11,6 @@ import requests
 import threading
 import hashlib
 import sqlite3
-import pickle
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -34,16 +33,68 @@ try:
     from sklearn.model_selection import train_test_split
     from sklearn.metrics import accuracy_score, classification_report
     import joblib
+    from model_registry import ModelRegistry, PREDICTION_MODELS
     ML_AVAILABLE = True
 except ImportError:
     print("⚠️ Machine learning libraries not available. Install scikit-learn for full functionality.")
     ML_AVAILABLE = False
 
+from threat_feed_fetcher import AsyncFeedFetcher
+from ioc_extractor import StreamingIOCExtractor
+from threat_predictor import ThreatPredictor
+from model_trainer import run_training_process
+from behavior_baseline import BehaviorBaselineStore
+from ioc_store import IOCStore, SCRAPED_SOURCE_PREFIX
+from hash_database import LEARNING_DATABASE
+from feature_store import (FeatureStore, encode_fields, decode_features, PATTERN_FEATURE_COUNT,
+                           STATIC_FEATURE_FIELDS, BEHAVIOR_FEATURE_FIELDS)
+
+# Canonical pattern JSON is json.dumps(pattern_data, sort_keys=True); one prebuilt encoder skips the per-call setup
+PATTERN_JSON_ENCODER = json.JSONEncoder(sort_keys=True)
+
+def pattern_hash(indicator_type: str, value: str, features: List[float]) -> str:
+    """Hash identifying a learned pattern, unchanged from the original per-row json.dumps"""
+    pattern_data = {'type': indicator_type, 'value': value, 'features': features}
+    return hashlib.sha256(PATTERN_JSON_ENCODER.encode(pattern_data).encode()).hexdigest()
+
+# Every HOLDOUT_MODULUS-th row is never trained on and validates new models instead
+HOLDOUT_MODULUS = 10
+
+# Training rows after a given id; length checks skip rows that predate float32 feature blobs
+PATTERN_TRAINING_QUERY = f'''
+    SELECT id, features, threat_level 
+    FROM threat_patterns 
+    WHERE id > ? AND id % {HOLDOUT_MODULUS} != 0 AND accuracy > 0.7 AND length(features) = ?
+    ORDER BY id
+'''
+MALWARE_TRAINING_QUERY = f'''
+    SELECT id, static_features, behavior_patterns, malware_family 
+    FROM malware_samples 
+    WHERE id > ? AND id % {HOLDOUT_MODULUS} != 0 AND confidence > 0.8
+      AND length(static_features) = ? AND length(behavior_patterns) = ?
+    ORDER BY id
+'''
+
+# Most recent held-out rows
+PATTERN_VALIDATION_QUERY = f'''
+    SELECT features, threat_level 
+    FROM threat_patterns 
+    WHERE id % {HOLDOUT_MODULUS} = 0 AND accuracy > 0.7 AND length(features) = ?
+    ORDER BY id DESC LIMIT ?
+'''
+MALWARE_VALIDATION_QUERY = f'''
+    SELECT static_features, behavior_patterns, malware_family 
+    FROM malware_samples 
+    WHERE id % {HOLDOUT_MODULUS} = 0 AND confidence > 0.8
+      AND length(static_features) = ? AND length(behavior_patterns) = ?
+    ORDER BY id DESC LIMIT ?
+'''
+
 class SelfLearningAI:
     """Advanced self-learning AI for cybersecurity"""
     
     def __init__(self):
-        self.learning_database = "ai_learning_system.db"
+        self.learning_database = LEARNING_DATABASE
         self.models_directory = "ai_models"
         self.threat_feeds = []
         self.malware_sources = []
@@ -56,6 +107,39 @@ class SelfLearningAI:
         self.malware_classification_model = None
         self.behavior_analysis_model = None
         
+        # Incremental training
+        self.incremental_update_interval = 300
+        self.training_batch_size = 1024
+        self.base_forest_estimators = 100
+        self.trees_per_update = 10
+        self.max_forest_estimators = 300
+        self.min_tree_update_samples = 20
+        self.anomaly_retrain_interval = 21600
+        self.last_anomaly_training = None
+        
+        # Anomaly baseline learned from the watcher's per-minute behavior history
+        self.behavior_database = "behavior_baseline.db"
+        self.baseline_window_days = 14
+        self.baseline_max_rows = 20000
+        self.min_baseline_minutes = 120
+        
+        # Training runs in a separate process; new bundles go live only if held-out accuracy holds
+        self.training_timeout = 3600
+        self.validation_rows = 2000
+        self.min_validation_rows = 20
+        self.validation_tolerance = 0.02
+        
+        # Checkpoints advanced this cycle; written to the database only when the bundle is promoted
+        self.staged_checkpoints: Dict[str, Tuple[int, int]] = {}
+        
+        # Persisted models are loaded lazily on first use
+        self.model_registry = None
+        self.model_version = None
+        self.models_loaded = False
+        self.models_writable = False
+        self.model_load_lock = threading.Lock()
+        self.model_metrics = {}
+        
         # Learning statistics
         self.patterns_learned = 0
         self.threats_processed = 0
@@ -70,8 +154,27 @@ class SelfLearningAI:
         self.init_models_directory()
         self.setup_logging()
         
+        # Pooled, conditional feed fetching
+        self.feed_fetcher = AsyncFeedFetcher(self.learning_database)
+        
+        # Single-pass indicator extraction
+        self.ioc_extractor = StreamingIOCExtractor()
+        
+        # Harvested indicators are published to the detectors through the shared IOC store,
+        # marked as scraped and only above a confidence floor
+        self.ioc_store = IOCStore()
+        self.min_published_confidence = 0.4
+        
+        # Memory-mapped training matrices
+        self.feature_store = FeatureStore(os.path.join(self.models_directory, 'feature_store'))
+        
+        # Live predictions follow the CURRENT bundle, swapping scaler and models together
+        self.threat_predictor = ThreatPredictor(self.models_directory)
+        self.prediction_batcher = self.threat_predictor.batcher
+        
         if ML_AVAILABLE:
             self.init_ml_models()
+            self.model_registry = ModelRegistry(self.models_directory)
         
         print("🤖 Self-Learning AI System initialized")
     
@@ -116,6 +219,8 @@ class SelfLearningAI:
                     pattern_hash TEXT UNIQUE,
                     pattern_type TEXT,
                     pattern_data BLOB,
+                    pattern_value TEXT,
+                    features BLOB,
                     threat_level INTEGER,
                     source TEXT,
                     first_seen DATE,
@@ -173,6 +278,34 @@ class SelfLearningAI:
                 )
             ''')
             
+            # Feature vectors are float32 blobs; add the columns to databases created before they existed
+            columns = [row[1] for row in cursor.execute("PRAGMA table_info(threat_patterns)")]
+            for column, column_type in (('pattern_value', 'TEXT'), ('features', 'BLOB')):
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE threat_patterns ADD COLUMN {column} {column_type}")
+            
+            # Incremental training progress per model
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS training_checkpoints (
+                    model_name TEXT PRIMARY KEY,
+                    last_row_id INTEGER,
+                    samples_seen INTEGER,
+                    updated_date DATE
+                )
+            ''')
+            
+            # Rows whose bundle failed validation; incremental updates skip them from then on
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS rejected_training_ranges (
+                    id INTEGER PRIMARY KEY,
+                    model_name TEXT,
+                    first_row_id INTEGER,
+                    last_row_id INTEGER,
+                    version TEXT,
+                    rejected_date DATE
+                )
+            ''')
+            
             # Model performance table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS model_performance (
@@ -222,15 +355,16 @@ class SelfLearningAI:
                 random_state=42
             )
             
-            # Anomaly Detection Model (Isolation Forest)
+            # Anomaly Detection Model (Isolation Forest over the endpoint's own behavior minutes;
+            # contamination is the share of normal history that would have alerted)
             self.anomaly_detection_model = IsolationForest(
-                contamination=0.1,
+                contamination=0.01,
                 random_state=42
             )
             
             # Malware Classification Model (Random Forest)
             self.malware_classification_model = RandomForestClassifier(
-                n_estimators=100,
+                n_estimators=self.base_forest_estimators,
                 max_depth=20,
                 random_state=42
             )
@@ -278,13 +412,27 @@ class SelfLearningAI:
             try:
                 print("🌐 Starting web intelligence gathering...")
                 
-                # Scrape threat feeds
-                for feed_url in self.threat_feeds:
+                # Fetch all feeds concurrently (per-host limits keep us polite),
+                # extracting indicators from the body as it streams in
+                sessions = {}
+                
+                def consume(url, text):
+                    if url not in sessions:
+                        sessions[url] = self.ioc_extractor.session(url)
+                    return sessions[url].feed(text)
+                
+                results = self.feed_fetcher.run(self.threat_feeds, consumer=consume, save_validators=False)
+                
+                # Validators are kept only for feeds whose indicators were stored,
+                # so a failed feed is fetched in full again next cycle
+                processed = []
+                for result in results:
                     try:
-                        self.scrape_threat_feed(feed_url)
-                        time.sleep(2)  # Be respectful to servers
+                        if self.process_feed_result(result, sessions.get(result['url'])):
+                            processed.append(result)
                     except Exception as e:
-                        self.logger.error(f"Failed to scrape {feed_url}: {e}")
+                        self.logger.error(f"Failed to process {result['url']}: {e}")
+                self.feed_fetcher.cache.save(processed)
                 
                 # Process gathered intelligence
                 self.process_web_intelligence()
@@ -298,6 +446,25 @@ class SelfLearningAI:
                 self.logger.error(f"Web intelligence gathering error: {e}")
                 time.sleep(300)  # Wait 5 minutes on error
     
+    def process_feed_result(self, result: Dict, session=None) -> bool:
+        """Store indicators extracted from a fetched feed, returning whether it was handled"""
+        url = result['url']
+        
+        if result.get('error'):
+            self.logger.warning(f"Failed to scrape {url}: {result['error']}")
+            return False
+        
+        if not result.get('changed') or session is None:
+            return True  # 304 Not Modified or identical body
+        
+        threat_indicators = session.close()
+        
+        if threat_indicators:
+            if not self.store_web_intelligence(url, result['content_hash'], threat_indicators):
+                return False
+            print(f"📥 Extracted {len(threat_indicators)} indicators from {url}")
+        return True
+    
     def scrape_threat_feed(self, url: str):
         """Scrape individual threat feed"""
         try:
@@ -313,7 +480,8 @@ class SelfLearningAI:
             threat_indicators = self.extract_threat_indicators(response.text, url)
             
             if threat_indicators:
-                self.store_web_intelligence(url, response.text, threat_indicators)
+                content_hash = hashlib.sha256(response.text.encode()).hexdigest()
+                self.store_web_intelligence(url, content_hash, threat_indicators)
                 print(f"📥 Extracted {len(threat_indicators)} indicators from {url}")
             
         except Exception as e:
@@ -321,85 +489,26 @@ class SelfLearningAI:
     
     def extract_threat_indicators(self, content: str, source_url: str) -> List[Dict]:
         """Extract threat indicators from content"""
-        indicators = []
-        
         try:
-            # IP address patterns
-            ip_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
-            ips = re.findall(ip_pattern, content)
-            
-            for ip in ips[:50]:  # Limit to 50 IPs per source
-                indicators.append({
-                    'type': 'ip',
-                    'value': ip,
-                    'source': source_url,
-                    'confidence': 0.7
-                })
-            
-            # Domain patterns
-            domain_pattern = r'\b[a-zA-Z0-9][a-zA-Z0-9-]{0,61}[a-zA-Z0-9]?\.[a-zA-Z]{2,}\b'
-            domains = re.findall(domain_pattern, content)
-            
-            for domain in domains[:30]:  # Limit to 30 domains per source
-                if not domain.endswith(('.com', '.org', '.net', '.gov', '.edu')):  # Skip common legitimate domains
-                    indicators.append({
-                        'type': 'domain',
-                        'value': domain,
-                        'source': source_url,
-                        'confidence': 0.6
-                    })
-            
-            # Hash patterns (MD5, SHA1, SHA256)
-            hash_patterns = [
-                (r'\b[a-fA-F0-9]{32}\b', 'md5'),
-                (r'\b[a-fA-F0-9]{40}\b', 'sha1'),
-                (r'\b[a-fA-F0-9]{64}\b', 'sha256')
-            ]
-            
-            for pattern, hash_type in hash_patterns:
-                hashes = re.findall(pattern, content)
-                for hash_val in hashes[:20]:  # Limit to 20 hashes per type
-                    indicators.append({
-                        'type': f'hash_{hash_type}',
-                        'value': hash_val,
-                        'source': source_url,
-                        'confidence': 0.9
-                    })
-            
-            # URL patterns
-            url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+[^\s<>"{}|\\^`\[\].,)]'
-            urls = re.findall(url_pattern, content)
-            
-            for url in urls[:10]:  # Limit to 10 URLs per source
-                indicators.append({
-                    'type': 'url',
-                    'value': url,
-                    'source': source_url,
-                    'confidence': 0.8
-                })
-            
+            return self.ioc_extractor.extract_text(content, source_url)
         except Exception as e:
             self.logger.error(f"Failed to extract indicators: {e}")
-        
-        return indicators
+            return []
     
-    def store_web_intelligence(self, url: str, content: str, indicators: List[Dict]):
+    def store_web_intelligence(self, url: str, content_hash: str, indicators: List[Dict]) -> bool:
         """Store web intelligence in database"""
         try:
             conn = sqlite3.connect(self.learning_database)
             cursor = conn.cursor()
             
-            content_hash = hashlib.sha256(content.encode()).hexdigest()
-            
             cursor.execute('''
                 INSERT OR REPLACE INTO web_intelligence 
-                (url, content_hash, threat_indicators, iocs, credibility_score, source_type, scraped_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                (url, content_hash, threat_indicators, credibility_score, source_type, scraped_date)
+                VALUES (?, ?, ?, ?, ?, ?)
             ''', (
                 url,
                 content_hash,
                 json.dumps(indicators),
-                pickle.dumps(indicators),
                 self.calculate_source_credibility(url),
                 self.classify_source_type(url),
                 datetime.now()
@@ -407,9 +516,11 @@ class SelfLearningAI:
             
             conn.commit()
             conn.close()
+            return True
             
         except Exception as e:
             self.logger.error(f"Failed to store web intelligence: {e}")
+            return False
     
     def calculate_source_credibility(self, url: str) -> float:
         """Calculate credibility score for source"""
@@ -465,26 +576,32 @@ class SelfLearningAI:
                 ''')
                 
                 unprocessed = cursor.fetchall()
+                processed_ids = []
                 
                 for intelligence_id, indicators_json, credibility in unprocessed:
                     try:
                         indicators = json.loads(indicators_json)
                         
-                        # Learn patterns from indicators
-                        patterns_learned = self.learn_patterns_from_indicators(indicators, credibility)
-                        
-                        # Mark as processed
-                        cursor.execute('''
-                            UPDATE web_intelligence 
-                            SET processed = 1 
-                            WHERE id = ?
-                        ''', (intelligence_id,))
+                        # Learn patterns from indicators on this connection's transaction
+                        patterns_learned = self.learn_patterns_from_indicators(indicators, credibility, conn)
+                        self.ioc_store.add_indicators([
+                            dict(indicator, source=SCRAPED_SOURCE_PREFIX + str(indicator.get('source', '')))
+                            for indicator in indicators
+                        ], credibility, self.min_published_confidence)
                         
+                        processed_ids.append((intelligence_id,))
                         self.patterns_learned += patterns_learned
                         
                     except Exception as e:
                         self.logger.error(f"Failed to process intelligence {intelligence_id}: {e}")
                 
+                # Mark as processed
+                cursor.executemany('''
+                    UPDATE web_intelligence 
+                    SET processed = 1 
+                    WHERE id = ?
+                ''', processed_ids)
+                
                 conn.commit()
                 conn.close()
                 
@@ -497,61 +614,73 @@ class SelfLearningAI:
                 self.logger.error(f"Threat pattern learning error: {e}")
                 time.sleep(300)
     
-    def learn_patterns_from_indicators(self, indicators: List[Dict], credibility: float) -> int:
-        """Learn threat patterns from indicators"""
-        patterns_count = 0
+    def learn_patterns_from_indicators(self, indicators: List[Dict], credibility: float,
+                                       conn: sqlite3.Connection = None) -> int:
+        """Learn threat patterns from indicators with one batched upsert"""
+        if not indicators:
+            return 0
+        
+        # Without a caller connection, use (and commit) a private one
+        own_connection = conn is None
         
         try:
-            conn = sqlite3.connect(self.learning_database)
-            cursor = conn.cursor()
+            if own_connection:
+                conn = sqlite3.connect(self.learning_database)
             
-            for indicator in indicators:
-                # Create pattern from indicator
-                pattern_data = {
-                    'type': indicator['type'],
-                    'value': indicator['value'],
-                    'features': self.extract_features_from_indicator(indicator)
-                }
-                
-                pattern_hash = hashlib.sha256(
-                    json.dumps(pattern_data, sort_keys=True).encode()
-                ).hexdigest()
-                
-                # Calculate threat level based on type and credibility
-                threat_level = self.calculate_threat_level(indicator, credibility)
+            rows = self.build_pattern_rows(indicators, credibility, str(datetime.now()))
+            
+            # New patterns start at frequency 1; repeats (in this batch or earlier) increment it
+            conn.executemany('''
+                INSERT INTO threat_patterns 
+                (pattern_hash, pattern_type, pattern_value, features, threat_level, source, first_seen, last_seen, accuracy)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(pattern_hash) DO UPDATE SET
+                    frequency = frequency + 1,
+                    last_seen = excluded.last_seen
+            ''', rows)
                 
-                # Store pattern
-                cursor.execute('''
-                    INSERT OR IGNORE INTO threat_patterns 
-                    (pattern_hash, pattern_type, pattern_data, threat_level, source, first_seen, last_seen, accuracy)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    pattern_hash,
-                    indicator['type'],
-                    pickle.dumps(pattern_data),
-                    threat_level,
-                    indicator['source'],
-                    datetime.now(),
-                    datetime.now(),
-                    credibility
-                ))
-                
-                # Update frequency if pattern already exists
-                cursor.execute('''
-                    UPDATE threat_patterns 
-                    SET frequency = frequency + 1, last_seen = ? 
-                    WHERE pattern_hash = ?
-                ''', (datetime.now(), pattern_hash))
+            if own_connection:
+                conn.commit()
                 
-                patterns_count += 1
-            
-            conn.commit()
-            conn.close()
+            return len(rows)
             
         except Exception as e:
             self.logger.error(f"Failed to learn patterns: {e}")
+            return 0
+        
+        finally:
+            if own_connection and conn is not None:
+                conn.close()
+    
+    def build_pattern_rows(self, indicators: List[Dict], credibility: float, timestamp: str) -> List[tuple]:
+        """Build threat_patterns rows for a batch of indicators"""
+        features = [self.extract_features_from_indicator(indicator) for indicator in indicators]
+        
+        # Hash the same canonical JSON as before so existing pattern hashes still match
+        pattern_hashes = [
+            pattern_hash(indicator['type'], indicator['value'], vector)
+            for indicator, vector in zip(indicators, features)
+        ]
+        
+        # Encode every feature vector with one conversion, then slice per-row blobs
+        width = len(features[0]) * 4
+        feature_bytes = np.asarray(features, dtype=np.float32).tobytes()
+        blobs = [feature_bytes[offset:offset + width] for offset in range(0, len(feature_bytes), width)]
         
-        return patterns_count
+        return [
+            (
+                pattern_hash,
+                indicator['type'],
+                indicator['value'],
+                blob,
+                self.calculate_threat_level(indicator, credibility),
+                indicator['source'],
+                timestamp,
+                timestamp,
+                credibility
+            )
+            for indicator, blob, pattern_hash in zip(indicators, blobs, pattern_hashes)
+        ]
     
     def extract_features_from_indicator(self, indicator: Dict) -> List[float]:
         """Extract numerical features from threat indicator"""
@@ -687,8 +816,8 @@ class SelfLearningAI:
                     f"sample_{np.random.randint(1000)}.exe",
                     static_features['file_size'],
                     malware_family,
-                    pickle.dumps(behavior_patterns),
-                    pickle.dumps(static_features),
+                    encode_fields(behavior_patterns, BEHAVIOR_FEATURE_FIELDS),
+                    encode_fields(static_features, STATIC_FEATURE_FIELDS),
                     'simulated_analysis',
                     np.random.uniform(0.8, 0.99),
                     'simulation',
@@ -704,74 +833,385 @@ class SelfLearningAI:
             self.logger.error(f"Malware simulation failed: {e}")
     
     def model_retraining_loop(self):
-        """Continuously retrain models with new data"""
+        """Keep models current by running training cycles in a background process"""
         while self.learning_active:
             try:
-                print("🔄 Starting model retraining...")
-                
                 if ML_AVAILABLE:
-                    # Retrain pattern recognition model
-                    self.retrain_pattern_recognition_model()
-                    
-                    # Retrain malware classification model
-                    self.retrain_malware_classification_model()
-                    
-                    # Retrain anomaly detection model
-                    self.retrain_anomaly_detection_model()
+                    # Fitting in a child process keeps it off this process's GIL, and predictions
+                    # only ever see complete bundles published by the trainer
+                    result = run_training_process(self.training_timeout)
                     
-                    # Save models
-                    self.save_trained_models()
-                    
-                    print("✅ Model retraining completed")
+                    if result.get('status') == 'published':
+                        self.model_version = result['version']
+                        self.last_update = datetime.now()
+                        self.threat_predictor.refresh()
+                        print(f"✅ Models updated with {result['updated_samples']} new samples ({result['version']})")
+                    elif result.get('status') == 'rejected':
+                        print(f"⚠️ Model {result['version']} regressed on {', '.join(result['validation']['regressions'])}"
+                              f" - keeping {result['previous_version']}")
+                    elif result.get('status') == 'error':
+                        self.logger.error(f"Training process failed: {result.get('error')}")
                 else:
                     print("⚠️ ML libraries not available, skipping model retraining")
+                    time.sleep(21600)
                 
-                # Wait before next retraining cycle (6 hours)
-                time.sleep(21600)
+                # Wait before next incremental update (5 minutes)
+                time.sleep(self.incremental_update_interval)
                 
             except Exception as e:
                 self.logger.error(f"Model retraining error: {e}")
                 time.sleep(1800)  # Wait 30 minutes on error
     
-    def retrain_pattern_recognition_model(self):
-        """Retrain pattern recognition model"""
+    def run_training_cycle(self) -> Dict[str, Any]:
+        """Update models on new data and publish them if validation holds (runs in the trainer process)"""
+        if not ML_AVAILABLE:
+            return {'status': 'unavailable'}
+        
         try:
+            # Training continues from the persisted models (in-place updates need writable arrays)
+            self.ensure_models_loaded(writable=True)
+            previous_version = self.model_version
+            
             conn = sqlite3.connect(self.learning_database)
-            cursor = conn.cursor()
             
-            # Get training data
-            cursor.execute('''
-                SELECT pattern_data, threat_level 
-                FROM threat_patterns 
-                WHERE accuracy > 0.7
-                LIMIT 1000
-            ''')
+            # Mini-batch updates from rows added since each model's checkpoint
+            updated = self.update_pattern_recognition_model(conn)
+            updated += self.update_malware_classification_model(conn)
             
-            training_data = cursor.fetchall()
+            # Behavior baseline refits on the slow cadence (retried each cycle until enough history exists)
+            if (self.last_anomaly_training is None or
+                    time.time() - self.last_anomaly_training >= self.anomaly_retrain_interval):
+                if self.retrain_anomaly_detection_model():
+                    self.last_anomaly_training = time.time()
+                    updated += 1
             
-            if len(training_data) < 50:
-                print("⚠️ Insufficient training data for pattern recognition")
-                return
+            if not updated:
+                conn.close()
+                return {'status': 'unchanged', 'version': previous_version}
+            
+            # Nothing can be published until there is enough data to fit the pattern model
+            if not hasattr(self.pattern_recognition_model, 'classes_'):
+                conn.close()
+                return {'status': 'insufficient_data', 'version': previous_version}
+            
+            validation = self.validate_candidate_models(conn)
+            
+            # A rejected bundle is kept for inspection but CURRENT stays on the previous version;
+            # the next cycle restarts from that version's checkpoints and skips the rows it was trained on
+            version = self.save_trained_models(make_current=validation['accepted'], validation=validation)
+            if version is None:
+                conn.close()
+                return {'status': 'error', 'error': 'Model bundle could not be saved'}
+            
+            if validation['accepted']:
+                self.commit_training_checkpoints(conn)
+            else:
+                self.record_rejected_ranges(conn, version)
+            conn.close()
+            
+            return {
+                'status': 'published' if validation['accepted'] else 'rejected',
+                'version': version,
+                'previous_version': previous_version,
+                'updated_samples': updated,
+                'validation': validation
+            }
             
-            # Prepare features and labels
-            X = []
-            y = []
-            
-            for pattern_blob, threat_level in training_data:
-                try:
-                    pattern_data = pickle.loads(pattern_blob)
-                    features = pattern_data.get('features', [0.0] * 10)
-                    X.append(features)
-                    y.append(threat_level)
-                except Exception as e:
+        except Exception as e:
+            self.logger.error(f"Training cycle failed: {e}")
+            return {'status': 'error', 'error': str(e)}
+    
+    def load_validation_rows(self, conn: sqlite3.Connection, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Most recent held-out feature rows and labels for a model"""
+        if name == 'pattern_recognition':
+            rows = conn.execute(PATTERN_VALIDATION_QUERY,
+                                (PATTERN_FEATURE_COUNT * 4, self.validation_rows)).fetchall()
+            if not rows:
+                return np.empty((0, PATTERN_FEATURE_COUNT)), np.empty(0)
+            blobs, labels = zip(*rows)
+            return decode_features(list(blobs), PATTERN_FEATURE_COUNT).astype(np.float64), np.asarray(labels)
+        
+        static_width, behavior_width = len(STATIC_FEATURE_FIELDS), len(BEHAVIOR_FEATURE_FIELDS)
+        rows = conn.execute(MALWARE_VALIDATION_QUERY,
+                            (static_width * 4, behavior_width * 4, self.validation_rows)).fetchall()
+        if not rows:
+            return np.empty((0, static_width + behavior_width)), np.empty(0)
+        static_blobs, behavior_blobs, labels = zip(*rows)
+        X = np.hstack([decode_features(list(static_blobs), static_width),
+                       decode_features(list(behavior_blobs), behavior_width)])
+        return X.astype(np.float64), np.asarray(labels)
+    
+    def holdout_accuracy(self, models: Dict[str, Any], name: str, X: np.ndarray, y: np.ndarray):
+        """Accuracy of one model on held-out rows, or None when it cannot be measured"""
+        model = models.get(name)
+        if model is None or not hasattr(model, 'classes_') or len(y) < self.min_validation_rows:
+            return None
+        
+        try:
+            if name == 'pattern_recognition':
+                X = models['feature_scaler'].transform(X)
+            return float(accuracy_score(y, model.predict(X)))
+        except Exception as e:
+            self.logger.warning(f"Could not evaluate {name} on held-out rows: {e}")
+            return None
+    
+    def validate_candidate_models(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """Compare freshly trained models with the current bundle on the same held-out rows"""
+        candidate = {
+            'feature_scaler': self.feature_scaler,
+            'pattern_recognition': self.pattern_recognition_model,
+            'malware_classification': self.malware_classification_model
+        }
+        
+        try:
+            _, baseline = self.model_registry.load_models(required=PREDICTION_MODELS)
+        except Exception as e:
+            self.logger.warning(f"Current model bundle unavailable for comparison: {e}")
+            baseline = {}
+        
+        validation = {'accepted': True, 'candidate': {}, 'baseline': {}, 'holdout_rows': {}, 'regressions': []}
+        for name in ('pattern_recognition', 'malware_classification'):
+            X, y = self.load_validation_rows(conn, name)
+            candidate_accuracy = self.holdout_accuracy(candidate, name, X, y)
+            baseline_accuracy = self.holdout_accuracy(baseline, name, X, y)
+            
+            validation['holdout_rows'][name] = len(y)
+            validation['candidate'][name] = candidate_accuracy
+            validation['baseline'][name] = baseline_accuracy
+            
+            if candidate_accuracy is not None:
+                self.model_metrics.setdefault(name, {})['holdout_accuracy'] = candidate_accuracy
+            
+            if (candidate_accuracy is not None and baseline_accuracy is not None and
+                    candidate_accuracy < baseline_accuracy - self.validation_tolerance):
+                validation['regressions'].append(name)
+        
+        validation['accepted'] = not validation['regressions']
+        return validation
+    
+    def load_training_checkpoint(self, conn: sqlite3.Connection, model_name: str) -> Tuple[int, int]:
+        """Last trained row id and samples seen for a model"""
+        if model_name in self.staged_checkpoints:
+            return self.staged_checkpoints[model_name]
+        row = conn.execute('''
+            SELECT last_row_id, samples_seen FROM training_checkpoints WHERE model_name = ?
+        ''', (model_name,)).fetchone()
+        return row if row else (0, 0)
+    
+    def save_training_checkpoint(self, conn: sqlite3.Connection, model_name: str,
+                                 last_row_id: int, samples_seen: int):
+        """Record how far a model has trained"""
+        conn.execute('''
+            INSERT INTO training_checkpoints (model_name, last_row_id, samples_seen, updated_date)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(model_name) DO UPDATE SET
+                last_row_id = excluded.last_row_id,
+                samples_seen = excluded.samples_seen,
+                updated_date = excluded.updated_date
+        ''', (model_name, last_row_id, samples_seen, datetime.now()))
+        conn.commit()
+    
+    def stage_training_checkpoint(self, model_name: str, last_row_id: int, samples_seen: int):
+        """Advance a model's checkpoint for the bundle being trained"""
+        self.staged_checkpoints[model_name] = (last_row_id, samples_seen)
+    
+    def commit_training_checkpoints(self, conn: sqlite3.Connection):
+        """Persist the checkpoints of a promoted bundle"""
+        for model_name, (last_row_id, samples_seen) in self.staged_checkpoints.items():
+            self.save_training_checkpoint(conn, model_name, last_row_id, samples_seen)
+        self.staged_checkpoints.clear()
+    
+    def record_rejected_ranges(self, conn: sqlite3.Connection, version: str):
+        """Remember the rows a rejected bundle was trained on so later cycles do not retrain on them"""
+        staged, self.staged_checkpoints = self.staged_checkpoints, {}
+        for model_name, (last_row_id, _) in staged.items():
+            first_row_id = self.load_training_checkpoint(conn, model_name)[0] + 1
+            if last_row_id >= first_row_id:
+                conn.execute('''
+                    INSERT INTO rejected_training_ranges
+                    (model_name, first_row_id, last_row_id, version, rejected_date)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (model_name, first_row_id, last_row_id, version, datetime.now()))
+        conn.commit()
+    
+    def load_rejected_ranges(self, conn: sqlite3.Connection, model_name: str,
+                             after_row_id: int) -> List[Tuple[int, int]]:
+        """Rejected row ranges of a model that end after a checkpoint"""
+        return conn.execute('''
+            SELECT first_row_id, last_row_id FROM rejected_training_ranges
+            WHERE model_name = ? AND last_row_id > ?
+        ''', (model_name, after_row_id)).fetchall()
+    
+    def drop_rejected_rows(self, rows: List[tuple], ranges: List[Tuple[int, int]]) -> List[tuple]:
+        """Rows (id first) outside every rejected range"""
+        if not ranges:
+            return rows
+        return [row for row in rows if not any(first <= row[0] <= last for first, last in ranges)]
+    
+    def iterate_training_batches(self, conn: sqlite3.Connection, query: str, params: tuple):
+        """Yield rows of a training query in mini-batches from one cursor"""
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(self.training_batch_size)
+            if not rows:
+                break
+            yield rows
+    
+    def sync_pattern_features(self, conn: sqlite3.Connection) -> int:
+        """Append new patterns to the on-disk feature matrix"""
+        return self.feature_store.sync(conn, 'threat_patterns', PATTERN_TRAINING_QUERY,
+                                       (PATTERN_FEATURE_COUNT,), params=(PATTERN_FEATURE_COUNT * 4,))
+    
+    def sync_malware_features(self, conn: sqlite3.Connection) -> int:
+        """Append new malware samples to the on-disk feature matrix"""
+        static_width, behavior_width = len(STATIC_FEATURE_FIELDS), len(BEHAVIOR_FEATURE_FIELDS)
+        return self.feature_store.sync(conn, 'malware_samples', MALWARE_TRAINING_QUERY,
+                                       (static_width, behavior_width),
+                                       params=(static_width * 4, behavior_width * 4))
+    
+    def update_pattern_recognition_model(self, conn: sqlite3.Connection) -> int:
+        """Train the pattern model with partial_fit on rows since its checkpoint"""
+        model = self.pattern_recognition_model
+        if not hasattr(model, 'classes_'):
+            return self.retrain_pattern_recognition_model()
+        
+        try:
+            last_row_id, samples_seen = self.load_training_checkpoint(conn, 'pattern_recognition')
+            rejected = self.load_rejected_ranges(conn, 'pattern_recognition', last_row_id)
+            trained = 0
+            correct = 0
+            
+            for rows in self.iterate_training_batches(conn, PATTERN_TRAINING_QUERY,
+                                                      (last_row_id, PATTERN_FEATURE_COUNT * 4)):
+                batch_last_id = rows[-1][0]
+                rows = self.drop_rejected_rows(rows, rejected)
+                if not rows:
+                    self.stage_training_checkpoint('pattern_recognition', batch_last_id, samples_seen + trained)
                     continue
+                row_ids, blobs, labels = zip(*rows)
+                X = decode_features(list(blobs), PATTERN_FEATURE_COUNT).astype(np.float64)
+                y = np.asarray(labels)
+                
+                # A threat level the network has never seen needs a full refit
+                if not np.isin(y, model.classes_).all():
+                    return trained + self.retrain_pattern_recognition_model()
+                
+                # Test-then-train: score each batch before learning from it
+                correct += int((model.predict(self.feature_scaler.transform(X)) == y).sum())
+                
+                self.feature_scaler.partial_fit(X)
+                model.partial_fit(self.feature_scaler.transform(X), y)
+                
+                trained += len(y)
+                self.stage_training_checkpoint('pattern_recognition', batch_last_id, samples_seen + trained)
             
-            if len(X) < 50:
-                print("⚠️ Insufficient valid training samples")
-                return
+            if trained:
+                self.accuracy_score = correct / trained
+                self.record_model_performance(conn, 'pattern_recognition', self.accuracy_score, trained)
+                print(f"🧠 Pattern recognition model updated on {trained} samples - "
+                      f"Accuracy: {self.accuracy_score:.3f}")
+            
+            return trained
+            
+        except Exception as e:
+            self.logger.error(f"Pattern recognition update failed: {e}")
+            return 0
+    
+    def update_malware_classification_model(self, conn: sqlite3.Connection) -> int:
+        """Grow the malware forest with warm-started trees for rows since its checkpoint"""
+        model = self.malware_classification_model
+        if not hasattr(model, 'classes_'):
+            return self.retrain_malware_classification_model()
+        
+        try:
+            last_row_id, samples_seen = self.load_training_checkpoint(conn, 'malware_classification')
+            rejected = self.load_rejected_ranges(conn, 'malware_classification', last_row_id)
+            static_width, behavior_width = len(STATIC_FEATURE_FIELDS), len(BEHAVIOR_FEATURE_FIELDS)
+            
+            batches = []
+            for rows in self.iterate_training_batches(conn, MALWARE_TRAINING_QUERY,
+                                                      (last_row_id, static_width * 4, behavior_width * 4)):
+                batch_last_id = rows[-1][0]
+                rows = self.drop_rejected_rows(rows, rejected)
+                if not rows:
+                    continue
+                row_ids, static_blobs, behavior_blobs, labels = zip(*rows)
+                batches.append((
+                    np.hstack([decode_features(list(static_blobs), static_width),
+                               decode_features(list(behavior_blobs), behavior_width)]),
+                    np.asarray(labels),
+                    batch_last_id
+                ))
+            
+            new_samples = sum(len(y) for _, y, _ in batches)
+            if new_samples < self.min_tree_update_samples:
+                return 0  # Too few rows for meaningful new trees; leave them for the next cycle
+            
+            X_new = np.vstack([X for X, _, _ in batches]).astype(np.float64)
+            y_new = np.concatenate([y for _, y, _ in batches])
+            
+            # New trees also see a replay sample of history so every family stays represented
+            self.sync_malware_features(conn)
+            X_history, y_history = self.feature_store.load('malware_samples')
+            replay = np.random.choice(len(y_history), min(len(y_history), new_samples * 4), replace=False)
+            X = np.vstack([X_new, np.asarray(X_history[np.sort(replay)], dtype=np.float64)])
+            y = np.concatenate([y_new, y_history[replay]])
+            
+            grown = model.n_estimators + self.trees_per_update
+            if grown > self.max_forest_estimators or set(np.unique(y)) != set(model.classes_):
+                return self.retrain_malware_classification_model()
+            
+            # Test-then-train on the new rows
+            accuracy = accuracy_score(y_new, model.predict(X_new))
+            
+            model.set_params(warm_start=True, n_estimators=grown)
+            model.fit(X, y)
+            
+            self.stage_training_checkpoint('malware_classification', batches[-1][2], samples_seen + new_samples)
+            self.record_model_performance(conn, 'malware_classification', accuracy, new_samples)
+            print(f"🦠 Malware classification model grown to {grown} trees - Accuracy: {accuracy:.3f}")
+            
+            return new_samples
+            
+        except Exception as e:
+            self.logger.error(f"Malware classification update failed: {e}")
+            return 0
+    
+    def record_model_performance(self, conn: sqlite3.Connection, model_name: str,
+                                 accuracy: float, training_samples: int):
+        """Store a model evaluation"""
+        conn.execute('''
+            INSERT INTO model_performance 
+            (model_name, version, accuracy, training_samples, validation_date)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            model_name,
+            '1.0',
+            accuracy,
+            training_samples,
+            datetime.now()
+        ))
+        conn.commit()
+        
+        self.model_metrics[model_name] = {'accuracy': accuracy, 'evaluated_samples': training_samples}
+    
+    def retrain_pattern_recognition_model(self) -> int:
+        """Retrain pattern recognition model from scratch on every stored pattern"""
+        try:
+            conn = sqlite3.connect(self.learning_database)
             
-            X = np.array(X)
-            y = np.array(y)
+            # Append new patterns to the on-disk feature matrix in one bulk read
+            # (rows without a float32 feature blob predate columnar storage and are skipped)
+            self.sync_pattern_features(conn)
+            
+            X, y = self.feature_store.load('threat_patterns')
+            X = np.asarray(X, dtype=np.float64)
+            
+            if len(X) < 50:
+                print("⚠️ Insufficient training data for pattern recognition")
+                conn.close()
+                return 0
             
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(
@@ -791,134 +1231,87 @@ class SelfLearningAI:
             
             self.accuracy_score = accuracy
             
-            # Store performance
-            cursor.execute('''
-                INSERT INTO model_performance 
-                (model_name, version, accuracy, training_samples, validation_date)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                'pattern_recognition',
-                '1.0',
-                accuracy,
-                len(X_train),
-                datetime.now()
-            ))
+            # Store performance; incremental updates continue from the synced rows
+            self.record_model_performance(conn, 'pattern_recognition', accuracy, len(X_train))
+            self.stage_training_checkpoint('pattern_recognition',
+                                           self.feature_store.load_meta('threat_patterns')['last_id'], len(X))
             
-            conn.commit()
             conn.close()
             
             print(f"🧠 Pattern recognition model retrained - Accuracy: {accuracy:.3f}")
+            return len(X)
             
         except Exception as e:
             self.logger.error(f"Pattern recognition retraining failed: {e}")
+            return 0
     
-    def retrain_malware_classification_model(self):
-        """Retrain malware classification model"""
+    def retrain_malware_classification_model(self) -> int:
+        """Retrain malware classification model from scratch on every stored sample"""
         try:
             conn = sqlite3.connect(self.learning_database)
-            cursor = conn.cursor()
             
-            # Get malware training data
-            cursor.execute('''
-                SELECT static_features, behavior_patterns, malware_family 
-                FROM malware_samples 
-                WHERE confidence > 0.8
-                LIMIT 1000
-            ''')
+            # Static and behavior blobs are decoded column-wise and combined side by side
+            self.sync_malware_features(conn)
             
-            training_data = cursor.fetchall()
-            
-            if len(training_data) < 50:
-                print("⚠️ Insufficient malware training data")
-                return
-            
-            # Prepare features and labels
-            X = []
-            y = []
-            
-            for static_blob, behavior_blob, family in training_data:
-                try:
-                    static_features = pickle.loads(static_blob)
-                    behavior_features = pickle.loads(behavior_blob)
-                    
-                    # Combine features
-                    combined_features = [
-                        static_features.get('file_size', 0),
-                        static_features.get('entropy', 0),
-                        static_features.get('pe_sections', 0),
-                        static_features.get('imports_count', 0),
-                        static_features.get('exports_count', 0),
-                        behavior_features.get('file_operations', 0),
-                        behavior_features.get('network_connections', 0),
-                        behavior_features.get('registry_modifications', 0),
-                        behavior_features.get('process_injections', 0),
-                        behavior_features.get('api_calls', 0)
-                    ]
-                    
-                    X.append(combined_features)
-                    y.append(family)
-                    
-                except Exception as e:
-                    continue
+            X, y = self.feature_store.load('malware_samples')
+            X = np.asarray(X, dtype=np.float64)
             
             if len(X) < 50:
-                print("⚠️ Insufficient valid malware samples")
-                return
-            
-            X = np.array(X)
+                print("⚠️ Insufficient malware training data")
+                conn.close()
+                return 0
             
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=0.2, random_state=42
             )
             
-            # Train model
+            # Train a fresh forest (incremental updates grow it again with warm starts)
+            self.malware_classification_model.set_params(
+                warm_start=False, n_estimators=self.base_forest_estimators
+            )
             self.malware_classification_model.fit(X_train, y_train)
             
             # Evaluate
             y_pred = self.malware_classification_model.predict(X_test)
             accuracy = accuracy_score(y_test, y_pred)
             
+            self.record_model_performance(conn, 'malware_classification', accuracy, len(X_train))
+            self.stage_training_checkpoint('malware_classification',
+                                           self.feature_store.load_meta('malware_samples')['last_id'], len(X))
+            
             print(f"🦠 Malware classification model retrained - Accuracy: {accuracy:.3f}")
             
             conn.close()
+            return len(X)
             
         except Exception as e:
             self.logger.error(f"Malware classification retraining failed: {e}")
+            return 0
     
-    def retrain_anomaly_detection_model(self):
-        """Retrain anomaly detection model"""
+    def retrain_anomaly_detection_model(self) -> int:
+        """Refit the behavior baseline on a subsample of recent per-minute behavior"""
         try:
-            # Generate normal behavior baseline from system patterns
-            normal_patterns = []
-            
-            for _ in range(500):  # Generate 500 normal patterns
-                pattern = [
-                    np.random.normal(50, 10),    # CPU usage
-                    np.random.normal(60, 15),    # Memory usage
-                    np.random.normal(100, 30),   # Network activity
-                    np.random.normal(20, 5),     # Process count
-                    np.random.normal(5, 2),      # File operations
-                    np.random.normal(10, 3),     # Registry operations
-                    np.random.normal(2, 1),      # Service changes
-                    np.random.normal(15, 5),     # Network connections
-                    np.random.normal(0, 0.5),    # Privilege escalations
-                    np.random.normal(1, 0.3)     # Suspicious API calls
-                ]
-                normal_patterns.append(pattern)
-            
-            X_normal = np.array(normal_patterns)
-            
-            # Train anomaly detection model
+            # Rows follow BEHAVIOR_SCHEMA, the same order the watcher scores at inference time
+            baseline_store = BehaviorBaselineStore(self.behavior_database)
+            X_normal = baseline_store.load_window(self.baseline_window_days, self.baseline_max_rows)
+            
+            if len(X_normal) < self.min_baseline_minutes:
+                print(f"⚠️ Insufficient behavior history for anomaly baseline ({len(X_normal)} minutes)")
+                return 0
+            
+            # Each tree draws its own 256-row subsample, so a refit stays cheap as history grows
             self.anomaly_detection_model.fit(X_normal)
             
-            print("🔍 Anomaly detection model retrained")
+            print(f"🔍 Anomaly baseline retrained on {len(X_normal)} minutes of behavior")
+            return len(X_normal)
             
         except Exception as e:
             self.logger.error(f"Anomaly detection retraining failed: {e}")
+            return 0
     
-    def save_trained_models(self):
-        """Save trained models to disk"""
+    def save_trained_models(self, make_current: bool = True, validation: Dict[str, Any] = None) -> str:
+        """Save trained models to disk as a new versioned bundle"""
         try:
             model_files = {
                 'pattern_recognition': self.pattern_recognition_model,
@@ -927,16 +1320,85 @@ class SelfLearningAI:
                 'feature_scaler': self.feature_scaler
             }
             
-            for name, model in model_files.items():
-                if model is not None:
-                    model_path = os.path.join(self.models_directory, f"{name}_model.pkl")
-                    joblib.dump(model, model_path)
+            # Manifest records how much data each model has seen and how it scored
+            conn = sqlite3.connect(self.learning_database)
+            model_info = {}
+            for name in model_files:
+                last_row_id, samples_seen = self.load_training_checkpoint(conn, name)
+                model_info[name] = {
+                    'training_rows': samples_seen,
+                    'last_row_id': last_row_id,
+                    'metrics': self.model_metrics.get(name, {})
+                }
+            conn.close()
+            
+            # The behavior baseline is refit on a timer that has to survive process restarts
+            model_info['anomaly_detection']['trained_at'] = self.last_anomaly_training
             
-            self.last_update = datetime.now()
-            print(f"💾 Models saved to {self.models_directory}")
+            version = self.model_registry.save_version(model_files, model_info, make_current, validation)
+            
+            if make_current:
+                self.model_version = version
+                self.last_update = datetime.now()
+            print(f"💾 Models saved to {self.models_directory} as {version}")
+            return version
             
         except Exception as e:
             self.logger.error(f"Model saving failed: {e}")
+            return None
+    
+    def ensure_models_loaded(self, writable: bool = False):
+        """Load the current persisted model bundle once, on first use"""
+        if self.models_loaded and (self.models_writable or not writable):
+            return
+        
+        with self.model_load_lock:
+            if self.models_loaded and (self.models_writable or not writable):
+                return
+            
+            try:
+                # Models already trained in this process are newer than anything on disk
+                if hasattr(self.pattern_recognition_model, 'classes_') and not self.models_loaded:
+                    self.models_writable = True
+                    return
+                
+                # Prediction-only loads memory-map the arrays so processes share the pages
+                manifest, models = self.model_registry.load_models(
+                    mmap_mode=None if writable else 'r', required=PREDICTION_MODELS
+                )
+                if manifest is None:
+                    self.models_writable = True
+                    return
+                
+                self.feature_scaler = models['feature_scaler']
+                self.pattern_recognition_model = models['pattern_recognition']
+                self.anomaly_detection_model = models['anomaly_detection']
+                if 'malware_classification' in models:
+                    self.malware_classification_model = models['malware_classification']
+                
+                self.model_version = manifest['version']
+                self.model_metrics = {name: entry.get('metrics', {}) for name, entry in manifest['models'].items()}
+                self.accuracy_score = self.model_metrics.get('pattern_recognition', {}).get('accuracy', 0.0)
+                self.last_anomaly_training = manifest['models']['anomaly_detection'].get('trained_at')
+                self.models_writable = writable
+                
+                # Resume incremental training from what the loaded models actually saw
+                if writable:
+                    conn = sqlite3.connect(self.learning_database)
+                    for name, entry in manifest['models'].items():
+                        if 'last_row_id' in entry:
+                            self.save_training_checkpoint(conn, name, entry['last_row_id'], entry['training_rows'])
+                    conn.close()
+                
+                print(f"📦 Loaded model bundle {self.model_version}")
+                
+            except Exception as e:
+                # Fall back to untrained models rather than failing every prediction
+                self.logger.error(f"Model loading failed: {e}")
+                self.models_writable = True
+            
+            finally:
+                self.models_loaded = True
     
     def threat_feed_monitoring(self):
         """Monitor threat feeds for new threats"""
@@ -1054,6 +1516,7 @@ class SelfLearningAI:
                 'patterns_learned': self.patterns_learned,
                 'threats_processed': self.threats_processed,
                 'last_update': self.last_update.isoformat() if self.last_update else None,
+                'model_version': self.model_version,
                 'ml_available': ML_AVAILABLE
             }
             
@@ -1064,33 +1527,20 @@ class SelfLearningAI:
     def stop_learning(self):
         """Stop the learning process"""
         self.learning_active = False
+        self.threat_predictor.batcher.stop()
         print("🛑 Self-learning AI system stopped")
     
     def predict_threat(self, features: List[float]) -> Dict:
         """Predict if given features represent a threat"""
-        if not ML_AVAILABLE or self.pattern_recognition_model is None:
-            return {'error': 'ML models not available'}
+        return self.predict_threat_batch(np.asarray([features], dtype=np.float64))[0]
         
+    def predict_threat_batch(self, features: np.ndarray) -> List[Dict]:
+        """Predict threat level and anomaly status for many feature rows in one pass"""
         try:
-            # Scale features
-            features_scaled = self.feature_scaler.transform([features])
-            
-            # Predict threat level
-            threat_level = self.pattern_recognition_model.predict(features_scaled)[0]
-            
-            # Predict anomaly
-            anomaly_score = self.anomaly_detection_model.decision_function(features_scaled)[0]
-            is_anomaly = self.anomaly_detection_model.predict(features_scaled)[0] == -1
-            
-            return {
-                'threat_level': int(threat_level),
-                'anomaly_score': float(anomaly_score),
-                'is_anomaly': bool(is_anomaly),
-                'confidence': self.accuracy_score
-            }
-            
+            # Scored by the published bundle, never by models the trainer is still fitting
+            return self.threat_predictor.predict_threat_batch(features)
         except Exception as e:
-            return {'error': str(e)}
+            return [{'error': str(e)} for _ in range(len(np.atleast_2d(features)))]
 
 def main():
     """Main function for self-learning AI"""
@@ -1127,5 +1577,24 @@ def main():
         print(f"\n❌ AI system error: {e}")
         ai_system.stop_learning()
 
+def test_pattern_hashes():
+    """Pattern hashes match the json.dumps hashes already stored in learning databases"""
+    samples = [
+        ('ip', '185.220.101.1', [185, 220, 101, 1, 13]),
+        ('domain', 'malicious-example.xyz', [21, 1, 1, 17, 0]),
+        ('url', 'http://x.example/a"b\\c?q=ü', [27, 0.25, 3, 1e-07, -2.5]),
+        ('hash_md5', '44d88612fea8a8f36de82e1278abb02f', [32, 20, 12])
+    ]
+    for indicator_type, value, features in samples:
+        pattern_data = {'type': indicator_type, 'value': value, 'features': features}
+        expected = hashlib.sha256(json.dumps(pattern_data, sort_keys=True).encode()).hexdigest()
+        assert pattern_hash(indicator_type, value, features) == expected, (indicator_type, value)
+    
+    # A hash recorded by the original implementation (ip features padded with float zeros)
+    assert pattern_hash('ip', '10.0.0.1', [10, 0, 0, 1, 8, 0.0, 0.0, 0.0, 0.0, 0.0]) == \
+        '2d99585454e029b76d49d152252b2dbdcc5a96c6147de5caa6855962add0a92a'
+    
+    print(f"✅ Pattern hashes OK - {len(samples) + 1} indicators match the stored format")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
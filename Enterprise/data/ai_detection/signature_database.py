@@ -0,0 +1,662 @@
+"""
+Signature Database
+Compiles the signature files into a versioned binary bundle that scanners map read-only
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import struct
+import logging
+import threading
+import configparser
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+try:
+    import yara
+    YARA_AVAILABLE = True
+except ImportError:
+    YARA_AVAILABLE = False
+
+from hash_database import SIGNATURES_DIRECTORY, LEARNING_DATABASE, HASH_WIDTHS, HashDatabase, \
+    compile_hash_database, read_hash_text, read_learned_hashes
+
+CONFIG_NAME = 'signature_config.ini'
+BUNDLE_NAME = 'signatures.sigdb'
+
+# Bundle layout: header, section table (name, offset, length), 8-byte aligned sections
+BUNDLE_HEADER = struct.Struct('<4sHH')
+BUNDLE_SECTION = struct.Struct('<16sQQ')
+BUNDLE_MAGIC = b'MSIG'
+BUNDLE_FORMAT_VERSION = 1
+
+# Content prefilter: hashed 4-byte anchor prefixes in a bitmap of 2^13..2^24 bits
+PREFILTER_KEY_BYTES = 4
+PREFILTER_MIN_BITS_LOG2 = 13
+PREFILTER_MAX_BITS_LOG2 = 24
+SCAN_CHUNK = 1024 * 1024
+
+# Signature files by kind, as named in the [SIGNATURE_FILES] section of the config
+DEFAULT_SIGNATURE_FILES = {
+    'virus_signatures': 'virus_signatures.txt',
+    'malware_hashes': 'malware_hashes.txt',
+    'yara_rules': 'yara_rules.yar',
+    'network_signatures': 'network_signatures.txt',
+    'behavioral_rules': 'behavioral_rules.txt'
+}
+
+# Field names of the pipe-delimited formats
+PIPE_FIELDS = {
+    'virus_signatures': ('name', 'type', 'signature', 'description', 'severity'),
+    'network_signatures': ('protocol', 'pattern', 'description', 'severity', 'type'),
+    'behavioral_rules': ('behavior_type', 'pattern', 'description', 'severity', 'category')
+}
+
+YARA_RULE_START = re.compile(r'^\s*(?:(?:private|global)\s+)*rule\s+(\w+)', re.MULTILINE)
+
+def read_signature_config(directory: str) -> Tuple[str, Dict[str, str]]:
+    """Database version and signature file names of a signature directory"""
+    config = configparser.ConfigParser()
+    config.read(os.path.join(directory, CONFIG_NAME), encoding='utf-8')
+    
+    version = config.get('DATABASE_INFO', 'version', fallback='0.0.0')
+    files = dict(DEFAULT_SIGNATURE_FILES)
+    if config.has_section('SIGNATURE_FILES'):
+        files.update({kind: name for kind, name in config.items('SIGNATURE_FILES') if kind in files})
+    return version, files
+
+def split_yara_rules(text: str) -> List[Tuple[Optional[str], str]]:
+    """(rule name, source) chunks of a YARA file; text outside rules has no name"""
+    chunks = []
+    position = 0
+    
+    for match in YARA_RULE_START.finditer(text):
+        if match.start() < position:
+            continue
+        if text[position:match.start()].strip():
+            chunks.append((None, text[position:match.start()]))
+        
+        # The rule ends where its braces balance; quoted strings and comments may contain braces
+        depth, index, opened = 0, match.end(), False
+        while index < len(text):
+            char = text[index]
+            if char == '"':
+                index += 1
+                while index < len(text) and text[index] != '"':
+                    index += 2 if text[index] == '\\' else 1
+            elif text.startswith('//', index):
+                index = text.find('\n', index)
+                index = len(text) if index < 0 else index
+            elif char == '{':
+                depth, opened = depth + 1, True
+            elif char == '}':
+                depth -= 1
+                if opened and depth == 0:
+                    index += 1
+                    break
+            index += 1
+        
+        chunks.append((match.group(1), text[match.start():index]))
+        position = index
+    
+    if text[position:].strip():
+        chunks.append((None, text[position:]))
+    return chunks
+
+def entry_key(kind: str, line: str) -> Optional[str]:
+    """Identity of a signature line, used to replace or remove it; None for comments and blanks"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    
+    if kind == 'malware_hashes':
+        parts = line.split(':')
+        return parts[1].lower() if len(parts) > 1 else line
+    if kind == 'virus_signatures':
+        return line.split('|')[0]
+    # Network and behavioral rules are identified by their type and pattern
+    return '|'.join(line.split('|')[:2])
+
+def split_entries(kind: str, text: str) -> List[Tuple[Optional[str], str]]:
+    """(key, chunk) pairs of a signature file: lines, or whole rules for YARA"""
+    if kind == 'yara_rules':
+        return split_yara_rules(text)
+    return [(entry_key(kind, line), line) for line in text.splitlines()]
+
+def parse_pipe_signatures(kind: str, text: str, rejected: List[str]) -> List[Dict[str, Any]]:
+    """Records of a pipe-delimited signature file; malformed lines go to rejected"""
+    fields = PIPE_FIELDS[kind]
+    records = []
+    
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) != len(fields) or not parts[0] or not parts[1]:
+            rejected.append(line)
+            continue
+        
+        record = dict(zip(fields, parts))
+        try:
+            record['severity'] = int(record['severity'])
+        except ValueError:
+            rejected.append(line)
+            continue
+        records.append(record)
+    
+    return records
+
+def parse_hex_pattern(value: str) -> Any:
+    """Bytes of a hex signature, or a token list (None for a ?? wildcard byte) when it has wildcards"""
+    if '?' not in value:
+        return bytes.fromhex(value)
+    if len(value) % 2:
+        raise ValueError(f"odd-length hex pattern {value}")
+    tokens = [None if value[i:i + 2] == '??' else bytes.fromhex(value[i:i + 2])[0] for i in range(0, len(value), 2)]
+    if None not in tokens or all(token is None for token in tokens):
+        raise ValueError(f"invalid wildcard pattern {value}")
+    return tokens
+
+def virus_signature_patterns(records: List[Dict[str, Any]], rejected: List[str]) -> Tuple[List[Tuple[Any, Dict[str, Any]]], List[Tuple[str, bytes, str, str, int]]]:
+    """Byte patterns of HEX/STRING signatures, and hash entries of HASH signatures"""
+    patterns, hashes = [], []
+    
+    for record in records:
+        signature_type, value = record['type'].upper(), record['signature']
+        try:
+            if signature_type == 'HEX':
+                patterns.append((parse_hex_pattern(value), record))
+            elif signature_type == 'STRING':
+                patterns.append((value.encode('utf-8'), record))
+            elif signature_type == 'HASH':
+                digest = bytes.fromhex(value)
+                hash_type = {width: name for name, width in HASH_WIDTHS.items()}[len(digest)]
+                hashes.append((hash_type, digest, record['name'], 'Virus_Signature', record['severity']))
+            else:
+                # YARA-typed lines name rules that live in the YARA file
+                if signature_type != 'YARA':
+                    raise ValueError(signature_type)
+        except (ValueError, KeyError):
+            rejected.append('|'.join(str(record[field]) for field in PIPE_FIELDS['virus_signatures']))
+    
+    return patterns, hashes
+
+def pattern_anchor(pattern: Any) -> Tuple[bytes, int]:
+    """Longest literal run of a pattern and its offset (the whole pattern when it has no wildcards)"""
+    if isinstance(pattern, bytes):
+        return pattern, 0
+    
+    anchor, anchor_offset, run_start = b'', 0, None
+    for index, token in enumerate(pattern + [None]):
+        if token is not None and run_start is None:
+            run_start = index
+        elif token is None and run_start is not None:
+            if index - run_start > len(anchor):
+                anchor, anchor_offset = bytes(pattern[run_start:index]), run_start
+            run_start = None
+    return anchor, anchor_offset
+
+def pattern_source(pattern: Any) -> str:
+    """Hex form of a pattern, with ?? for wildcard bytes"""
+    if isinstance(pattern, bytes):
+        return pattern.hex()
+    return ''.join('??' if token is None else f'{token:02x}' for token in pattern)
+
+def prefilter_slots(keys: np.ndarray, bits_log2: int) -> np.ndarray:
+    """Prefilter bitmap slots of 4-byte keys (multiplicative hashing in uint32)"""
+    return (keys.astype(np.uint32) * np.uint32(2654435761)) >> np.uint32(32 - bits_log2)
+
+def trie_regex(patterns: List[bytes]) -> bytes:
+    """Regex source matching any of the patterns, factored into a byte trie"""
+    # A flat alternation retries every pattern at every offset; the trie only continues
+    # past the first byte when some pattern starts with it
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for byte in pattern:
+            node = node.setdefault(byte, {})
+        node[None] = {}
+    
+    def node_regex(node: Dict) -> bytes:
+        branches = [re.escape(bytes([byte])) + node_regex(child)
+                    for byte, child in sorted(node.items(), key=lambda item: -1 if item[0] is None else item[0])
+                    if byte is not None]
+        if not branches:
+            return b''
+        body = branches[0] if len(branches) == 1 else b'(?:' + b'|'.join(branches) + b')'
+        # Ending here is optional when a pattern stops at this node; the longer match is preferred
+        if None in node:
+            return b'(?:' + body + b')?'
+        return body
+    
+    return node_regex(trie)
+
+class MatcherIndex:
+    """Anchor lookup tables of a content matcher"""
+    
+    def __init__(self, patterns: List[Tuple[Any, Dict[str, Any]]]):
+        self.patterns = [(pattern, record) for pattern, record in patterns if pattern]
+        
+        # Prefilter key (first anchor bytes) -> (anchor, anchor offset, verifier, record);
+        # anchors shorter than a key are found by a small regex instead
+        self.entries = {}
+        self.short_entries = {}
+        for pattern, record in self.patterns:
+            anchor, anchor_offset = pattern_anchor(pattern)
+            verifier = None if isinstance(pattern, bytes) else re.compile(
+                b''.join(b'.' if token is None else re.escape(bytes([token])) for token in pattern), re.DOTALL)
+            entry = (anchor, anchor_offset, verifier, record)
+            if len(anchor) >= PREFILTER_KEY_BYTES:
+                self.entries.setdefault(int.from_bytes(anchor[:PREFILTER_KEY_BYTES], 'little'), []).append(entry)
+            else:
+                self.short_entries.setdefault(anchor, []).append(entry)
+        
+        # A regex match reports the longest short anchor at an offset; shorter anchors that are
+        # prefixes of it matched there too
+        lengths = sorted({len(anchor) for anchor in self.short_entries})
+        self.short_prefixes = {
+            anchor: [anchor[:length] for length in lengths
+                     if length < len(anchor) and anchor[:length] in self.short_entries]
+            for anchor in self.short_entries
+        }
+        # The lookahead reports overlapping matches at every offset
+        self.short_regex = re.compile(b'(?=(' + trie_regex(list(self.short_entries)) + b'))',
+                                      re.DOTALL) if self.short_entries else None
+
+class ContentMatcher:
+    """Multi-pattern byte matcher: a hashed prefilter on 4-byte anchor prefixes, verified in place"""
+    
+    def __init__(self, patterns: Any, prefilter: Optional[np.ndarray] = None):
+        # Patterns may be a callable that decodes them from a bundle; that work then waits for the first scan
+        self.patterns = patterns
+        self.index = None if callable(patterns) else MatcherIndex(patterns)
+        self.index_lock = threading.Lock()
+        
+        if prefilter is None:
+            prefilter = self.build_prefilter()
+        self.prefilter = prefilter
+        self.bits_log2 = int(len(prefilter) * 8).bit_length() - 1
+    
+    def load_index(self) -> MatcherIndex:
+        """Anchor tables, decoded on first use"""
+        with self.index_lock:
+            if self.index is None:
+                self.index = MatcherIndex(self.patterns())
+        return self.index
+    
+    def build_prefilter(self) -> np.ndarray:
+        """Bitmap of hashed anchor keys, sized for about one false candidate per 1024 offsets per key"""
+        entries = self.load_index().entries
+        bits_log2 = min(PREFILTER_MAX_BITS_LOG2, max(PREFILTER_MIN_BITS_LOG2, (len(entries) * 1024).bit_length()))
+        bitmap = np.zeros(1 << (bits_log2 - 3), dtype=np.uint8)
+        if entries:
+            slots = prefilter_slots(np.fromiter(entries, dtype=np.uint32, count=len(entries)), bits_log2)
+            np.bitwise_or.at(bitmap, slots >> 3, (1 << (slots & 7)).astype(np.uint8))
+        return bitmap
+    
+    def verify(self, data: bytes, offset: int, entry: Tuple, found: Dict[int, Dict[str, Any]]):
+        """Record a match if the full pattern holds where its anchor was found"""
+        anchor, anchor_offset, verifier, record = entry
+        start = offset - anchor_offset
+        if id(record) in found or start < 0 or data[offset:offset + len(anchor)] != anchor:
+            return
+        if verifier is None or verifier.match(data, start):
+            found[id(record)] = dict(record, offset=start)
+    
+    def scan(self, data: bytes, limit: int = 100) -> List[Dict[str, Any]]:
+        """First match of each signature record found in the data"""
+        index = self.index or self.load_index()
+        found = {}
+        
+        # Keys at every offset are read through one unaligned 4-byte view; only offsets whose
+        # key is set in the prefilter reach Python
+        key_count = len(data) - PREFILTER_KEY_BYTES + 1
+        if index.entries and key_count > 0:
+            for chunk_start in range(0, key_count, SCAN_CHUNK):
+                count = min(SCAN_CHUNK, key_count - chunk_start)
+                keys = np.ndarray((count,), dtype='<u4', buffer=data, offset=chunk_start, strides=(1,))
+                slots = prefilter_slots(keys, self.bits_log2)
+                candidates = np.flatnonzero((self.prefilter[slots >> 3] >> (slots & 7)) & 1)
+                
+                for offset, key in zip((candidates + chunk_start).tolist(), keys[candidates].tolist()):
+                    for entry in index.entries.get(key, ()):
+                        self.verify(data, offset, entry, found)
+                if len(found) >= limit:
+                    return list(found.values())
+        
+        if index.short_regex is not None:
+            for match in index.short_regex.finditer(data):
+                matched = match.group(1)
+                for anchor in [matched] + index.short_prefixes[matched]:
+                    for entry in index.short_entries[anchor]:
+                        self.verify(data, match.start(), entry, found)
+                if len(found) >= limit:
+                    break
+        
+        return list(found.values())
+    
+    def to_bundle(self) -> Tuple[Dict[str, Any], bytes]:
+        """Bundle metadata (patterns and records) and prefilter bytes"""
+        patterns = self.load_index().patterns
+        return {
+            'patterns': [pattern_source(pattern) for pattern, _ in patterns],
+            'records': [record for _, record in patterns]
+        }, self.prefilter.tobytes()
+    
+    @classmethod
+    def from_bundle(cls, load_meta: Any, prefilter: np.ndarray) -> 'ContentMatcher':
+        """Matcher over a prebuilt prefilter; load_meta returns its bundle metadata when first scanned"""
+        def decode_patterns() -> List[Tuple[Any, Dict[str, Any]]]:
+            meta = load_meta()
+            return [(parse_hex_pattern(source), record) for source, record in zip(meta['patterns'], meta['records'])]
+        return cls(decode_patterns, prefilter)
+
+def bundle_is_stale(directory: str, path: str) -> bool:
+    """Whether a bundle is missing or older than its signature files"""
+    if not os.path.exists(path):
+        return True
+    _, files = read_signature_config(directory)
+    built = os.path.getmtime(path)
+    return any(os.path.exists(source) and os.path.getmtime(source) > built
+               for source in [os.path.join(directory, name) for name in files.values()] +
+               [os.path.join(directory, CONFIG_NAME)])
+
+def compile_signature_bundle(directory: str = SIGNATURES_DIRECTORY, output_path: Optional[str] = None,
+                             learning_database: Optional[str] = None) -> Dict[str, Any]:
+    """Validate a signature directory and compile it into one binary bundle"""
+    output_path = output_path or os.path.join(directory, BUNDLE_NAME)
+    version, files = read_signature_config(directory)
+    rejected = {kind: [] for kind in files}
+    
+    texts = {}
+    for kind, name in files.items():
+        try:
+            with open(os.path.join(directory, name), 'r', encoding='utf-8', errors='replace') as f:
+                texts[kind] = f.read()
+        except OSError:
+            texts[kind] = ''
+    
+    # Content signatures, and network signatures matched case-insensitively per protocol
+    virus_records = parse_pipe_signatures('virus_signatures', texts['virus_signatures'], rejected['virus_signatures'])
+    patterns, virus_hashes = virus_signature_patterns(virus_records, rejected['virus_signatures'])
+    matchers = {'content': ContentMatcher(patterns)}
+    
+    by_protocol = {}
+    for rule in parse_pipe_signatures('network_signatures', texts['network_signatures'], rejected['network_signatures']):
+        by_protocol.setdefault(rule['protocol'].upper(), []).append((rule['pattern'].lower().encode('utf-8'), rule))
+    matchers.update({f'network:{protocol}': ContentMatcher(rules) for protocol, rules in by_protocol.items()})
+    
+    behavior_rules = {}
+    for rule in parse_pipe_signatures('behavioral_rules', texts['behavioral_rules'], rejected['behavioral_rules']):
+        behavior_rules.setdefault(rule['behavior_type'], []).append(rule)
+    
+    # YARA rules are stored compiled when yara-python is installed
+    yara_rule_names = [name for name, _ in split_yara_rules(texts['yara_rules']) if name]
+    yara_compiled = b''
+    if YARA_AVAILABLE and texts['yara_rules'].strip():
+        try:
+            stream = io.BytesIO()
+            yara.compile(source=texts['yara_rules']).save(file=stream)
+            yara_compiled = stream.getvalue()
+        except Exception as e:
+            rejected['yara_rules'].append(str(e))
+    
+    # Hash signatures are compiled into the hash database format and embedded as is
+    hash_path = f"{output_path}.hashes.tmp"
+    hash_text = os.path.join(directory, files['malware_hashes'])
+    sources = [read_hash_text(hash_text, rejected['malware_hashes'])] if os.path.exists(hash_text) else []
+    sources.append(virus_hashes)
+    if learning_database and os.path.exists(learning_database):
+        sources.append(read_learned_hashes(learning_database))
+    hash_summary = compile_hash_database(hash_path, sources)
+    with open(hash_path, 'rb') as f:
+        hash_block = f.read()
+    os.remove(hash_path)
+    
+    # Prefilters are laid out back to back, 8-byte aligned
+    matcher_meta, prefilters, prefilter_blocks, prefilter_offset = {}, {}, [], 0
+    for name, matcher in matchers.items():
+        matcher_meta[name], block = matcher.to_bundle()
+        prefilters[name] = (prefilter_offset, len(block))
+        prefilter_blocks.append(block + b'\0' * (-len(block) % 8))
+        prefilter_offset += len(prefilter_blocks[-1])
+    
+    counts = {
+        'content_signatures': len(matcher_meta['content']['patterns']),
+        'network_signatures': sum(len(meta['patterns']) for name, meta in matcher_meta.items() if name != 'content'),
+        'behavioral_rules': sum(len(rules) for rules in behavior_rules.values()),
+        'yara_rules': len(yara_rule_names),
+        'hashes': sum(hash_summary['entries'].values())
+    }
+    meta = {
+        'version': version,
+        'compiled_at': datetime.now().isoformat(),
+        'counts': counts,
+        'rejected': {kind: lines for kind, lines in rejected.items() if lines},
+        'behavior_rules': behavior_rules,
+        'yara_rule_names': yara_rule_names,
+        'yara_compiled': bool(yara_compiled),
+        'prefilters': prefilters
+    }
+    
+    sections = [
+        ('meta', json.dumps(meta).encode('utf-8')),
+        ('matchers', json.dumps(matcher_meta).encode('utf-8')),
+        ('prefilters', b''.join(prefilter_blocks)),
+        ('hashes', hash_block),
+        ('yara', yara_compiled)
+    ]
+    
+    # Write to a temporary file and swap it in, so readers never map a half-written bundle
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        offset = BUNDLE_HEADER.size + BUNDLE_SECTION.size * len(sections)
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, len(sections)))
+        for name, block in sections:
+            offset += -offset % 8
+            f.write(BUNDLE_SECTION.pack(name.encode(), offset, len(block)))
+            offset += len(block)
+        for name, block in sections:
+            f.write(b'\0' * (-f.tell() % 8))
+            f.write(block)
+    os.replace(temp_path, output_path)
+    
+    return {'path': output_path, 'version': version, 'bytes': os.path.getsize(output_path),
+            'counts': counts, 'rejected': meta['rejected']}
+
+class SignatureSnapshot:
+    """Read-only view of one version of the signature files, mapped from its compiled bundle"""
+    
+    def __init__(self, directory: str = SIGNATURES_DIRECTORY, learning_database: Optional[str] = None):
+        self.directory = directory
+        self.path = os.path.join(directory, BUNDLE_NAME)
+        self.logger = logging.getLogger(__name__)
+        
+        # Text signatures newer than the bundle (or a bundle of another format) are recompiled first
+        if bundle_is_stale(directory, self.path):
+            compile_signature_bundle(directory, self.path, learning_database)
+        try:
+            self.load_bundle()
+        except ValueError:
+            compile_signature_bundle(directory, self.path, learning_database)
+            self.load_bundle()
+    
+    def load_bundle(self):
+        """Map the bundle and rebuild the lookup structures around its prebuilt tables"""
+        start = time.perf_counter()
+        self.file = open(self.path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, format_version, section_count = BUNDLE_HEADER.unpack_from(self.buffer, 0)
+        if magic != BUNDLE_MAGIC or format_version != BUNDLE_FORMAT_VERSION:
+            self.buffer.close()
+            self.file.close()
+            raise ValueError(f"{self.path} is not a version {BUNDLE_FORMAT_VERSION} signature bundle")
+        
+        sections = {}
+        for i in range(section_count):
+            name, offset, length = BUNDLE_SECTION.unpack_from(self.buffer, BUNDLE_HEADER.size + i * BUNDLE_SECTION.size)
+            sections[name.rstrip(b'\0').decode()] = (offset, length)
+        
+        def section_bytes(name: str) -> bytes:
+            offset, length = sections[name]
+            return self.buffer[offset:offset + length]
+        
+        meta = json.loads(section_bytes('meta').decode('utf-8'))
+        self.version = meta['version']
+        self.counts = meta['counts']
+        self.rejected = meta['rejected']
+        self.behavior_rules = meta['behavior_rules']
+        self.yara_rule_names = meta['yara_rule_names']
+        
+        # Prefilter bitmaps stay in the mapped file; pattern tables are decoded on first scan
+        matcher_meta, meta_lock = {}, threading.Lock()
+        def load_matcher_meta() -> Dict[str, Any]:
+            with meta_lock:
+                if not matcher_meta:
+                    matcher_meta.update(json.loads(section_bytes('matchers').decode('utf-8')))
+            return matcher_meta
+        
+        prefilters_offset = sections['prefilters'][0]
+        matchers = {}
+        for name, (offset, length) in meta['prefilters'].items():
+            prefilter = np.frombuffer(self.buffer, dtype=np.uint8, count=length, offset=prefilters_offset + offset)
+            matchers[name] = ContentMatcher.from_bundle(lambda name=name: load_matcher_meta()[name], prefilter)
+        self.content_matcher = matchers.pop('content')
+        self.network_matchers = {name.split(':', 1)[1]: matcher for name, matcher in matchers.items()}
+        
+        self.hash_database = HashDatabase(self.path, buffer=self.buffer, offset=sections['hashes'][0])
+        
+        self.yara_rules = None
+        if meta['yara_compiled'] and YARA_AVAILABLE:
+            try:
+                self.yara_rules = yara.load(file=io.BytesIO(section_bytes('yara')))
+            except Exception as e:
+                self.logger.error(f"Failed to load compiled YARA rules: {e}")
+        
+        self.load_ms = (time.perf_counter() - start) * 1000
+    
+    def scan_bytes(self, data: bytes) -> List[Dict[str, Any]]:
+        """Content and YARA signatures matching a buffer"""
+        matches = self.content_matcher.scan(data)
+        
+        if self.yara_rules is not None:
+            try:
+                for match in self.yara_rules.match(data=data, timeout=10):
+                    matches.append({'name': match.rule, 'type': 'YARA',
+                                    'severity': int(match.meta.get('severity', 5)),
+                                    'description': match.meta.get('description', '')})
+            except Exception as e:
+                self.logger.error(f"YARA scan error: {e}")
+        
+        return matches
+    
+    def lookup_hash(self, hex_digest: str) -> Optional[Dict[str, Any]]:
+        """Hash signature entry for a hex digest, or None"""
+        return self.hash_database.lookup(hex_digest)
+    
+    def match_network(self, protocol: str, payload: str) -> List[Dict[str, Any]]:
+        """Network signatures of a protocol found in a request line, header or payload"""
+        matcher = self.network_matchers.get(protocol.upper())
+        return matcher.scan(payload.lower().encode('utf-8', errors='replace')) if matcher else []
+    
+    def rules_for_behavior(self, behavior_type: str) -> List[Dict[str, Any]]:
+        """Behavioral rules of one behavior type"""
+        return self.behavior_rules.get(behavior_type, [])
+    
+    def get_snapshot_status(self) -> Dict[str, Any]:
+        """Version, signature counts and malformed entries"""
+        return dict(self.counts, **{
+            'version': self.version,
+            'directory': self.directory,
+            'bundle_bytes': len(self.buffer),
+            'load_ms': round(self.load_ms, 1),
+            'yara_compiled': self.yara_rules is not None,
+            'rejected': {kind: len(lines) for kind, lines in self.rejected.items()}
+        })
+    
+    def close(self):
+        """Unmap the bundle"""
+        # Arrays viewing the map must be released before it can be closed
+        self.content_matcher = None
+        self.network_matchers = {}
+        self.hash_database.close()
+        self.buffer.close()
+        self.file.close()
+
+# Test function
+def test_signature_database():
+    """Compile the shipped signature files plus a large synthetic set, and check loads and matches"""
+    import shutil
+    import tempfile
+    
+    directory = tempfile.mkdtemp()
+    for name in list(DEFAULT_SIGNATURE_FILES.values()) + [CONFIG_NAME]:
+        shutil.copy(os.path.join(SIGNATURES_DIRECTORY, name), directory)
+    
+    report = compile_signature_bundle(directory)
+    snapshot = SignatureSnapshot(directory)
+    
+    sample = (b'MZ header ... tasksche.exe ... files renamed to .WNCRY' +
+              bytes.fromhex('558bec83ec50a1deadbeef8945fc833d') + bytes(4096))
+    names = {match['name'] for match in snapshot.scan_bytes(sample)}
+    assert {'WannaCryPayload', 'WannaCryEncrypt', 'Petya'} <= names, names
+    assert snapshot.lookup_hash('db349b97c37d22f5ea1d1841e3c89eb4')['name'] == 'WannaCry'
+    assert snapshot.match_network('http', 'GET /beacon.dll HTTP/1.1')[0]['description'] == 'Cobalt Strike Beacon'
+    assert snapshot.rules_for_behavior('FILE_ENCRYPTION')
+    assert 'WannaCry_Ransomware' in snapshot.yara_rule_names
+    assert 'Conficker|HEX|558bec83ec?????b8????????e8|Conficker Worm|9' in report['rejected']['virus_signatures']
+    snapshot.close()
+    
+    # Grow the content signatures to 20,000 and time a reopen of the compiled bundle
+    rng = np.random.default_rng(5)
+    with open(os.path.join(directory, 'virus_signatures.txt'), 'a', encoding='utf-8') as f:
+        for i in range(20000):
+            f.write(f"\nSynthetic{i}|HEX|{rng.integers(0, 256, 12, dtype=np.uint8).tobytes().hex()}|Synthetic|5")
+    compile_start = time.perf_counter()
+    report = compile_signature_bundle(directory)
+    compile_seconds = time.perf_counter() - compile_start
+    
+    snapshot = SignatureSnapshot(directory)
+    status = snapshot.get_snapshot_status()
+    assert status['content_signatures'] > 20000
+    
+    clean = os.urandom(4 * 1024 * 1024)
+    planted = clean[:1000000] + bytes.fromhex(snapshot.content_matcher.to_bundle()[0]['patterns'][-1]) + clean[1000000:]
+    start = time.perf_counter()
+    assert any(match['name'] == 'Synthetic19999' for match in snapshot.scan_bytes(planted))
+    scan_mb_s = 4.0 / (time.perf_counter() - start)
+    
+    print(f"✅ Signature bundle {status['version']} OK - {status['content_signatures']} content, "
+          f"{status['network_signatures']} network, {status['behavioral_rules']} behavioral, "
+          f"{status['yara_rules']} YARA, {status['hashes']} hashes; rejected {status['rejected']}")
+    print(f"   compiled in {compile_seconds:.2f}s ({report['bytes'] // 1024} KB), "
+          f"loaded in {status['load_ms']:.1f} ms, content scan {scan_mb_s:.0f} MB/s")
+    snapshot.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+def main():
+    """Compile signatures: validate a signature directory and write its binary bundle"""
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith('--')]
+    directory = arguments[0] if arguments else SIGNATURES_DIRECTORY
+    
+    # Release builds ship the curated signatures only, never the build machine's learned hashes
+    learning_database = None if '--without-learned' in sys.argv else LEARNING_DATABASE
+    report = compile_signature_bundle(directory, learning_database=learning_database)
+    print(f"💾 Compiled signatures {report['version']} into {report['path']} ({report['bytes']} bytes)")
+    for kind, count in report['counts'].items():
+        print(f"   {kind}: {count}")
+    for kind, lines in report['rejected'].items():
+        for line in lines:
+            print(f"⚠️ {kind}: skipped malformed entry: {line}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,412 @@
+"""
+Signature Updates
+Applies delta packages to build versioned signature snapshots and swaps scanners onto them atomically
+"""
+
+import os
+import re
+import json
+import glob
+import time
+import random
+import shutil
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from hash_database import SIGNATURES_DIRECTORY, LEARNING_DATABASE
+from signature_database import CONFIG_NAME, BUNDLE_NAME, SignatureSnapshot, compile_signature_bundle, \
+    bundle_is_stale, read_signature_config, split_entries
+
+SNAPSHOTS_DIRECTORY = os.path.join(SIGNATURES_DIRECTORY, 'snapshots')
+UPDATES_DIRECTORY = os.path.join(SIGNATURES_DIRECTORY, 'updates')
+CURRENT_POINTER = 'CURRENT'
+
+def version_key(version: str) -> tuple:
+    """Sortable form of a dotted version string"""
+    return tuple(int(part) if part.isdigit() else 0 for part in re.split(r'[.\-]', version))
+
+def normalized_line(line: str) -> str:
+    """Signature line without surrounding or field padding whitespace"""
+    return '|'.join(part.strip() for part in line.strip().split('|'))
+
+def apply_file_delta(kind: str, text: str, delta: Dict[str, List[str]]) -> str:
+    """Signature file text with a delta's removals and additions applied"""
+    # Additions replace entries with the same key, so a changed signature is shipped as an add
+    additions = [entry for entry in delta.get('add', []) if entry.strip()]
+    dropped = set(delta.get('remove', []))
+    dropped.update(key for key, _ in split_entries(kind, '\n'.join(additions)) if key)
+    
+    kept = [chunk for key, chunk in split_entries(kind, text) if key is None or key not in dropped]
+    separator = '\n\n' if kind == 'yara_rules' else '\n'
+    return separator.join([chunk.rstrip('\n') for chunk in kept] + additions) + '\n'
+
+class SignatureUpdater:
+    """Build, publish and roll back signature snapshots"""
+    
+    def __init__(self, base_directory: str = SIGNATURES_DIRECTORY, snapshots_directory: str = SNAPSHOTS_DIRECTORY,
+                 keep_snapshots: int = 3, learning_database: Optional[str] = None):
+        self.base_directory = base_directory
+        self.snapshots_directory = snapshots_directory
+        self.keep_snapshots = keep_snapshots
+        self.learning_database = learning_database
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(snapshots_directory, exist_ok=True)
+        
+        # Scanners read this reference once per scan; publishing replaces it, never mutates it
+        self.snapshot = None
+        
+        # One build at a time; scans never take this lock
+        self.build_lock = threading.Lock()
+        
+        self.updates_active = False
+        self.update_thread = None
+        self.last_update = None
+    
+    @property
+    def current(self) -> SignatureSnapshot:
+        """Live snapshot, loaded on first use"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            with self.build_lock:
+                if self.snapshot is None:
+                    self.snapshot = self.load_snapshot(self.current_version() or self.seed_from_base())
+                snapshot = self.snapshot
+        return snapshot
+    
+    def snapshot_path(self, version: str) -> str:
+        """Directory of a snapshot version"""
+        return os.path.join(self.snapshots_directory, version)
+    
+    def load_snapshot(self, version: str) -> SignatureSnapshot:
+        """Open a published snapshot"""
+        return SignatureSnapshot(self.snapshot_path(version), learning_database=self.learning_database)
+    
+    def seed_from_base(self) -> str:
+        """Publish the shipped signature files as the first snapshot"""
+        version, files = read_signature_config(self.base_directory)
+        if not os.path.isdir(self.snapshot_path(version)):
+            staging = os.path.join(self.snapshots_directory, f".{version}.tmp")
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            # A bundle compiled offline ships along, so endpoints only map it
+            names = list(files.values()) + [CONFIG_NAME]
+            if not bundle_is_stale(self.base_directory, os.path.join(self.base_directory, BUNDLE_NAME)):
+                names.append(BUNDLE_NAME)
+            for name in names:
+                source = os.path.join(self.base_directory, name)
+                if os.path.exists(source):
+                    shutil.copy2(source, staging)
+            os.replace(staging, self.snapshot_path(version))
+        
+        self.set_current(version)
+        return version
+    
+    def set_current(self, version: str):
+        """Atomically point CURRENT at a snapshot version"""
+        pointer = os.path.join(self.snapshots_directory, CURRENT_POINTER)
+        with open(f"{pointer}.tmp", 'w') as f:
+            f.write(version)
+        os.replace(f"{pointer}.tmp", pointer)
+    
+    def current_version(self) -> Optional[str]:
+        """Version CURRENT points at, if it is still on disk"""
+        try:
+            with open(os.path.join(self.snapshots_directory, CURRENT_POINTER), 'r') as f:
+                version = f.read().strip()
+            return version if version and os.path.isdir(self.snapshot_path(version)) else None
+        except OSError:
+            return None
+    
+    def list_snapshots(self) -> List[str]:
+        """Published snapshot versions, oldest first"""
+        return sorted(
+            (name for name in os.listdir(self.snapshots_directory)
+             if not name.startswith('.') and os.path.isfile(os.path.join(self.snapshots_directory, name, CONFIG_NAME))),
+            key=version_key
+        )
+    
+    def prune_snapshots(self):
+        """Delete snapshots beyond keep_snapshots (never the current one)"""
+        current = self.current_version()
+        for version in self.list_snapshots()[:-self.keep_snapshots]:
+            if version != current:
+                shutil.rmtree(self.snapshot_path(version), ignore_errors=True)
+    
+    def apply_delta(self, package: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a snapshot from the current one plus a delta package, then publish it"""
+        version = str(package.get('version', ''))
+        
+        with self.build_lock:
+            base_version = self.current_version() or self.seed_from_base()
+            
+            if not version or version_key(version) <= version_key(base_version):
+                return {'status': 'unchanged', 'version': base_version}
+            if package.get('base_version') and package['base_version'] != base_version:
+                return {'status': 'rejected', 'version': version,
+                        'error': f"delta expects {package['base_version']}, current is {base_version}"}
+            if os.path.isdir(self.snapshot_path(version)):
+                # Published before and rolled back from; it is not re-applied automatically
+                return {'status': 'unchanged', 'version': base_version}
+            
+            start = time.time()
+            staging = os.path.join(self.snapshots_directory, f".{version}.tmp")
+            try:
+                # Copy the current version's text files and rewrite only the ones the delta touches
+                shutil.rmtree(staging, ignore_errors=True)
+                shutil.copytree(self.snapshot_path(base_version), staging, ignore=shutil.ignore_patterns(BUNDLE_NAME))
+                _, files = read_signature_config(staging)
+                
+                for kind, delta in package.get('files', {}).items():
+                    if kind not in files:
+                        raise ValueError(f"unknown signature file {kind}")
+                    path = os.path.join(staging, files[kind])
+                    text = ''
+                    if os.path.exists(path):
+                        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                            text = f.read()
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(apply_file_delta(kind, text, delta))
+                
+                self.stamp_version(staging, version)
+                
+                # Compiling the staged copy validates it; new malformed entries reject the package
+                report = compile_signature_bundle(staging, learning_database=self.learning_database)
+                malformed = {}
+                for kind, delta in package.get('files', {}).items():
+                    added = {normalized_line(line) for entry in delta.get('add', []) for line in entry.splitlines()}
+                    lines = [line for line in report['rejected'].get(kind, [])
+                             if kind == 'yara_rules' or normalized_line(line) in added]
+                    if lines:
+                        malformed[kind] = lines
+                if malformed:
+                    shutil.rmtree(staging, ignore_errors=True)
+                    return {'status': 'rejected', 'version': version, 'malformed': malformed}
+                
+                # Directories with open maps cannot be renamed on Windows, so the bundle is
+                # only mapped once it has been published
+                os.replace(staging, self.snapshot_path(version))
+                snapshot = self.load_snapshot(version)
+            
+            except Exception as e:
+                shutil.rmtree(staging, ignore_errors=True)
+                self.logger.error(f"Signature update {version} failed: {e}")
+                return {'status': 'error', 'version': version, 'error': str(e)}
+            
+            # In-flight scans keep the snapshot they started with; it is unmapped once released
+            self.set_current(version)
+            self.snapshot = snapshot
+            self.last_update = datetime.now().isoformat()
+            self.prune_snapshots()
+        
+        print(f"🔄 Signatures updated {base_version} -> {version} in {time.time() - start:.1f}s")
+        return {'status': 'published', 'version': version, 'previous_version': base_version}
+    
+    def stamp_version(self, directory: str, version: str):
+        """Record a snapshot's version and date in its signature config"""
+        path = os.path.join(directory, CONFIG_NAME)
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        
+        text = re.sub(r'(?m)^version=.*$', f'version={version}', text, count=1)
+        text = re.sub(r'(?m)^update_date=.*$', f"update_date={datetime.now().strftime('%Y-%m-%d')}", text, count=1)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    
+    def apply_delta_file(self, path: str) -> Dict[str, Any]:
+        """Apply a delta package stored as JSON"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                package = json.load(f)
+        except (OSError, ValueError) as e:
+            return {'status': 'error', 'error': f"{path}: {e}"}
+        return self.apply_delta(package)
+    
+    def check_for_updates(self, updates_directory: str = UPDATES_DIRECTORY) -> List[Dict[str, Any]]:
+        """Apply pending delta packages from a directory, in version order"""
+        packages = []
+        for path in glob.glob(os.path.join(updates_directory, '*.json')):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    packages.append(json.load(f))
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Unreadable signature delta {path}: {e}")
+        
+        current = self.current_version() or '0'
+        pending = sorted((package for package in packages
+                          if version_key(str(package.get('version', '0'))) > version_key(current)),
+                         key=lambda package: version_key(str(package['version'])))
+        
+        results = []
+        for package in pending:
+            result = self.apply_delta(package)
+            results.append(result)
+            if result['status'] not in ('published', 'unchanged'):
+                break
+        return results
+    
+    def rollback(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """Switch back to an older snapshot (the one before the current by default)"""
+        with self.build_lock:
+            current = self.current_version()
+            snapshots = self.list_snapshots()
+            
+            if version is None:
+                older = [name for name in snapshots if current and version_key(name) < version_key(current)]
+                if not older:
+                    return {'status': 'unchanged', 'version': current}
+                version = older[-1]
+            elif version not in snapshots:
+                return {'status': 'error', 'error': f"snapshot {version} not found"}
+            
+            try:
+                snapshot = self.load_snapshot(version)
+            except Exception as e:
+                return {'status': 'error', 'error': str(e)}
+            
+            self.set_current(version)
+            self.snapshot = snapshot
+        
+        print(f"⏪ Signatures rolled back {current} -> {version}")
+        return {'status': 'rolled_back', 'version': version, 'previous_version': current}
+    
+    def sync_current(self):
+        """Switch to the snapshot CURRENT points at if another process published or rolled back"""
+        version = self.current_version()
+        snapshot = self.snapshot
+        if version and snapshot is not None and os.path.basename(snapshot.directory) != version:
+            with self.build_lock:
+                self.snapshot = self.load_snapshot(version)
+    
+    def start_background_updates(self, updates_directory: str = UPDATES_DIRECTORY,
+                                 interval: float = 3600.0, jitter: float = 0.25, sync_interval: float = 60.0):
+        """Check for delta packages periodically on a background thread"""
+        if self.updates_active:
+            return
+        self.updates_active = True
+        
+        def update_loop():
+            while self.updates_active:
+                # Jitter spreads the checks of many endpoints over the interval
+                deadline = time.time() + interval * random.uniform(1.0 - jitter, 1.0 + jitter)
+                next_sync = time.time() + sync_interval
+                while self.updates_active and time.time() < deadline:
+                    time.sleep(1)
+                    
+                    # Snapshots published by other processes (e.g. the GUI's Update Definitions)
+                    # are picked up between checks; this only reads the CURRENT file
+                    if time.time() >= next_sync:
+                        next_sync = time.time() + sync_interval
+                        try:
+                            self.sync_current()
+                        except Exception as e:
+                            self.logger.error(f"Signature snapshot sync error: {e}")
+                if not self.updates_active:
+                    break
+                
+                try:
+                    for result in self.check_for_updates(updates_directory):
+                        if result['status'] not in ('published', 'unchanged'):
+                            self.logger.error(f"Signature update {result.get('version')}: {result}")
+                    self.sync_current()
+                except Exception as e:
+                    self.logger.error(f"Signature update check error: {e}")
+        
+        self.update_thread = threading.Thread(target=update_loop, daemon=True)
+        self.update_thread.start()
+    
+    def stop(self):
+        """Stop background update checks"""
+        self.updates_active = False
+    
+    def get_updater_status(self) -> Dict[str, Any]:
+        """Current version, available snapshots and last update"""
+        snapshot = self.snapshot
+        return {
+            'current_version': self.current_version(),
+            'snapshots': self.list_snapshots(),
+            'last_update': self.last_update,
+            'signatures': snapshot.get_snapshot_status() if snapshot else None
+        }
+
+# Test function
+def test_signature_updates():
+    """Apply deltas while scanning, reject a malformed package and roll back"""
+    import tempfile
+    
+    root = tempfile.mkdtemp()
+    updater = SignatureUpdater(snapshots_directory=os.path.join(root, 'snapshots'), keep_snapshots=3)
+    base = updater.current
+    assert base.lookup_hash('db349b97c37d22f5ea1d1841e3c89eb4')
+    
+    # Another process's updater (the watcher's) follows snapshots published here between its checks
+    live = SignatureUpdater(snapshots_directory=os.path.join(root, 'snapshots'), keep_snapshots=3)
+    assert live.current.version == base.version
+    live.start_background_updates(os.path.join(root, 'no_updates'), interval=3600, sync_interval=1)
+    
+    # Scans keep running on whichever snapshot they picked up while updates publish
+    stop = threading.Event()
+    scans = []
+    def scanner():
+        while not stop.is_set():
+            snapshot = updater.current
+            scans.append((snapshot.version, bool(snapshot.scan_bytes(b'.. tasksche.exe ..'))))
+    thread = threading.Thread(target=scanner)
+    thread.start()
+    
+    new_hash = 'ab' * 32
+    result = updater.apply_delta({
+        'version': '2.1.1', 'base_version': base.version,
+        'files': {
+            'malware_hashes': {'add': [f'SHA256:{new_hash}:TestDropper:Trojan:8'],
+                               'remove': ['db349b97c37d22f5ea1d1841e3c89eb4']},
+            'virus_signatures': {'add': ['TestMarker|STRING|delta-marker-7731|Delta Test Signature|6']},
+            'yara_rules': {'add': ['rule Delta_Test {\n    strings:\n        $a = "delta"\n    condition:\n        $a\n}'],
+                           'remove': ['WannaCry_Ransomware']}
+        }
+    })
+    assert result['status'] == 'published', result
+    
+    rejected = updater.apply_delta({'version': '2.1.2', 'base_version': '2.1.1',
+                                    'files': {'virus_signatures': {'add': ['Broken|HEX|zz|Bad|9']}}})
+    assert rejected['status'] == 'rejected', rejected
+    stale = updater.apply_delta({'version': '2.1.3', 'base_version': '2.0.0', 'files': {}})
+    assert stale['status'] == 'rejected', stale
+    
+    stop.set()
+    thread.join()
+    
+    current = updater.current
+    assert current.version == '2.1.1' and updater.current_version() == '2.1.1'
+    assert current.lookup_hash(new_hash)['name'] == 'TestDropper'
+    assert current.lookup_hash('db349b97c37d22f5ea1d1841e3c89eb4') is None
+    assert any(match['name'] == 'TestMarker' for match in current.scan_bytes(b'xx delta-marker-7731 xx'))
+    assert 'Delta_Test' in current.yara_rule_names and 'WannaCry_Ransomware' not in current.yara_rule_names
+    assert all(matched for _, matched in scans)
+    
+    deadline = time.time() + 5
+    while live.current.version != '2.1.1' and time.time() < deadline:
+        time.sleep(0.1)
+    live.stop()
+    assert live.current.version == '2.1.1', live.current.version
+    
+    rolled = updater.rollback()
+    assert rolled['status'] == 'rolled_back' and updater.current.version == base.version
+    assert updater.apply_delta({'version': '2.1.1', 'files': {}})['status'] == 'unchanged'
+    assert updater.current.lookup_hash('db349b97c37d22f5ea1d1841e3c89eb4')
+    
+    versions = sorted({version for version, _ in scans})
+    print(f"✅ Signature updates OK - {len(scans)} scans across versions {versions} without pausing, "
+          f"snapshots {updater.list_snapshots()}")
+    shutil.rmtree(root, ignore_errors=True)
+
+def main():
+    """Apply pending delta packages from the updates directory"""
+    updater = SignatureUpdater(learning_database=LEARNING_DATABASE)
+    print(f"📦 Current signatures: {updater.current.version}")
+    for result in updater.check_for_updates():
+        print(f"   {result}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -10,24 +10,52 @@ import threading
 import psutil
 import winreg
 import hashlib
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
 import sqlite3
 import subprocess
-from typing import Dict, List, Any, Set
+import concurrent.futures
+from typing import Dict, List, Any, Set, Optional
 import logging
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import socket
 import struct
 
-# Import AI components
+# Import AI components - real-time scoring uses NumPy-only evaluators, while
+# the scikit-learn based learner is only imported once monitoring starts
+from threat_predictor import ThreatPredictor
+
+try:
+    from entropy_analysis import EntropyAnalyzer
+    ENTROPY_AVAILABLE = True
+except ImportError:
+    ENTROPY_AVAILABLE = False
+
 try:
-    from self_learning_ai import SelfLearningAI
-    AI_AVAILABLE = True
+    from ransomware_detector import RansomwareDetector
+    RANSOMWARE_DETECTOR_AVAILABLE = True
 except ImportError:
-    AI_AVAILABLE = False
+    RANSOMWARE_DETECTOR_AVAILABLE = False
+
+from metrics_sampler import SystemMetricsSampler
+from behavior_baseline import BehaviorBaselineStore
+from ioc_store import IOCStore, SCRAPED_SOURCE_PREFIX
+from signature_updates import SignatureUpdater
+from hash_database import LEARNING_DATABASE
+from process_graph import ProcessGraph
+from event_bus import EventBus, DROP_OLDEST, BLOCK, KEEP_ALL
+from monitor_events import (FileRecord, ProcessRecord, FileActivity, FileScanned, ProcessActivity, NetworkActivity,
+                            SystemChange, ThreatDetected, NS_PER_SECOND, ns_to_datetime)
+from behavior_rule_engine import BehaviorRuleEngine, file_event, process_event, network_event, registry_event
+from process_telemetry import ProcessTelemetryCollector
+from adaptive_scheduler import AdaptiveScheduler
+
+try:
+    from windows_notifications import WindowsNotificationSystem
+    NOTIFICATIONS_AVAILABLE = True
+except ImportError:
+    NOTIFICATIONS_AVAILABLE = False
 
 class SystemWatcher:
     """Real-time system monitoring and protection"""
@@ -54,22 +82,113 @@ class SystemWatcher:
         self.processes_monitored = 0
         self.network_connections_checked = 0
         
-        # Whitelist and blacklist
+        # Whitelists; blacklisted IPs, domains, URLs and hashes live in the shared IOC store
         self.process_whitelist = set()
         self.file_whitelist = set()
-        self.ip_blacklist = set()
-        self.domain_blacklist = set()
+        self.ioc_store = IOCStore()
+        
+        # Confidence an IOC match needs before it flags activity; indicators scraped from web pages
+        # need more than curated ones
+        self.ioc_min_confidence = 0.7
+        self.scraped_ioc_min_confidence = 0.8
+        
+        # Versioned signature snapshots (content, hash, network, behavioral and YARA signatures);
+        # delta updates swap in a new snapshot without pausing scans
+        self.signature_updater = SignatureUpdater(learning_database=LEARNING_DATABASE)
+        
+        # Behavioral rules (single events and multi-event sequences) over all monitor events
+        self.behavior_engine = BehaviorRuleEngine()
+        self.registry_values = {}
+        
+        # File types whose writer is recorded in the process graph
+        self.provenance_extensions = {'.exe', '.dll', '.sys', '.scr', '.bat', '.cmd', '.ps1', '.vbs', '.js', '.hta'}
+        
+        # Static file analysis
+        self.entropy_analyzer = EntropyAnalyzer() if ENTROPY_AVAILABLE else None
+        self.entropy_scan_bytes = 4 * 1024 * 1024
+        
+        # Streaming ransomware detection (fed by file events)
+        self.ransomware_detector = RansomwareDetector() if RANSOMWARE_DETECTOR_AVAILABLE else None
+        
+        # Per-interval system metrics with history for anomaly features
+        self.metrics_sampler = SystemMetricsSampler()
+        
+        # Per-minute behavior history the anomaly baseline is trained on
+        self.behavior_baseline = BehaviorBaselineStore()
+        
+        # Per-process resource telemetry (cryptominer / memory leak detection)
+        self.process_telemetry = ProcessTelemetryCollector()
+        self.reported_miners = set()
+        
+        # Adaptive monitoring cadence (base, min, max seconds)
+        self.scheduler = AdaptiveScheduler()
+        self.scheduler.register('process', 5, 2, 30)
+        self.scheduler.register('network', 10, 3, 60)
+        self.scheduler.register('behavior', 30, 10, 120)
+        self.scheduler.register('registry', 60, 15, 600)
+        self.scheduler.register('memory', 60, 5, 600)
         
         # Initialize components
         self.init_database()
         self.setup_logging()
         self.load_protection_lists()
         
-        if AI_AVAILABLE:
-            self.ai_system = SelfLearningAI()
+        # Process tree with file and connection provenance; exited subtrees spill to the protection database
+        self.process_graph = ProcessGraph(self.protection_database)
+        
+        # Monitors publish events; storage, behavior rules and notifications consume them
+        # on their own threads through their own queues
+        self.event_bus = EventBus()
+        self.notifier = WindowsNotificationSystem() if NOTIFICATIONS_AVAILABLE else None
+        self.event_storers = {
+            FileScanned: self.store_file_event,
+            ProcessActivity: self.store_process_event,
+            NetworkActivity: self.store_network_event,
+            SystemChange: self.store_system_change,
+            ThreatDetected: self.store_threat_detection
+        }
+        self.connect_subscribers()
+        
+        # Exported model bundle, loaded on first prediction
+        self.threat_predictor = ThreatPredictor()
+        
+        # File scans run concurrently so their AI predictions can share micro-batches
+        self.file_scan_executor = None
+        
+        # Paths waiting for a scan; further events for a waiting path fold into its scan
+        self.pending_scans: Dict[str, str] = {}
+        self.pending_scans_lock = threading.Lock()
+        self.max_pending_scans = 4096
+        self.scans_coalesced = 0
+        
+        # Paths that arrived while the queue was full; they are scanned once it drains
+        self.spilled_scans: Dict[str, str] = {}
+        self.max_spilled_scans = 65536
+        self.scans_spilled = 0
+        self.scans_skipped = 0
+        self.scan_overload_reported = None
         
         print("🛡️ System Watcher initialized")
     
+    def connect_subscribers(self):
+        """Subscribe the watcher's consumers to the event bus"""
+        # Storage accepts brief backpressure and writes in batches; it sheds load rather than stall monitors
+        self.event_bus.subscribe('storage', self.persist_events,
+                                 [event_type for event_type in self.event_storers if event_type is not ThreatDetected],
+                                 max_queue=16384, policy=BLOCK, block_timeout=0.01, batch=True)
+        
+        # Detections are few and are never shed, so they get their own queue and writer
+        self.event_bus.subscribe('detections', self.persist_events, [ThreatDetected],
+                                 max_queue=1024, policy=KEEP_ALL, batch=True)
+        self.event_bus.subscribe('behavior_rules', self.observe_behavior,
+                                 [FileActivity, ProcessActivity, NetworkActivity, SystemChange],
+                                 max_queue=8192, policy=BLOCK, block_timeout=0.005)
+        
+        # Toasts are slow; during a burst only the latest detections are worth showing
+        if self.notifier:
+            self.event_bus.subscribe('notifier', self.notify_threat, [ThreatDetected],
+                                     max_queue=64, policy=DROP_OLDEST)
+    
     def init_database(self):
         """Initialize protection database"""
         try:
@@ -188,26 +307,37 @@ class SystemWatcher:
             'C:\\Windows\\WinSxS\\'
         ])
         
-        # Known malicious IPs (examples - in production, use threat feeds)
-        self.ip_blacklist.update([
-            '192.168.1.100',  # Example malicious IP
-            '10.0.0.50',
-            '172.16.0.25'
+        # Known malicious IPs and domains (examples - threat feeds add to the same store)
+        self.ioc_store.add_indicators([
+            {'type': 'ip', 'value': ip, 'source': 'builtin', 'confidence': 1.0}
+            for ip in ('192.168.1.100', '10.0.0.50', '172.16.0.25')
+        ] + [
+            {'type': 'domain', 'value': domain, 'source': 'builtin', 'confidence': 1.0}
+            for domain in ('malicious-site.com', 'phishing-example.net', 'trojan-host.org')
         ])
         
-        # Known malicious domains
-        self.domain_blacklist.update([
-            'malicious-site.com',
-            'phishing-example.net',
-            'trojan-host.org'
-        ])
+        # Current signature snapshot (the shipped signature files on first start)
+        try:
+            print(f"📚 Signature database {self.signature_updater.current.version} loaded")
+        except Exception as e:
+            self.logger.error(f"Failed to load signature snapshot: {e}")
         
-        print(f"📋 Loaded protection lists - {len(self.process_whitelist)} processes, {len(self.ip_blacklist)} IPs")
+        indicators = self.ioc_store.get_store_status()['indicators']
+        print(f"📋 Loaded protection lists - {len(self.process_whitelist)} processes, "
+              f"{indicators['networks']} IP ranges, {indicators['domains']} domains")
     
     def start_monitoring(self):
         """Start comprehensive system monitoring"""
         print("🚀 Starting real-time system monitoring...")
         self.monitoring_active = True
+        self.scheduler.start()
+        if not self.event_bus.subscriptions:
+            self.connect_subscribers()
+        self.signature_updater.start_background_updates()
+        
+        self.file_scan_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix='file-scan'
+        )
         
         # Create quarantine directory
         Path(self.quarantine_directory).mkdir(exist_ok=True)
@@ -226,12 +356,23 @@ class SystemWatcher:
             thread.start()
         
         # Start AI learning if available
-        if self.ai_system:
-            self.ai_system.start_continuous_learning()
+        self.ai_system = self.start_ai_learning()
         
         print("✅ Real-time system monitoring started")
         return monitoring_threads
     
+    def start_ai_learning(self):
+        """Start the self-learning system if scikit-learn and friends are installed"""
+        try:
+            from self_learning_ai import SelfLearningAI
+        except ImportError as e:
+            self.logger.warning(f"Self-learning AI not available: {e}")
+            return None
+        
+        ai_system = SelfLearningAI()
+        ai_system.start_continuous_learning()
+        return ai_system
+    
     def file_system_monitor(self):
         """Monitor file system changes in real-time"""
         class ThreatFileHandler(FileSystemEventHandler):
@@ -282,6 +423,102 @@ class SystemWatcher:
             file_path = event.src_path
             event_type = event.event_type
             
+            # Feed ransomware detector first - renamed/deleted sources no longer exist
+            if self.ransomware_detector:
+                verdict = self.ransomware_detector.observe_file_event(event)
+                if verdict:
+                    self.handle_ransomware_activity(verdict, event)
+            
+            self.event_bus.publish(FileActivity(event_type, file_path, getattr(event, 'dest_path', None)))
+            
+            # Attribute new executables here, while the writer most likely still has them open;
+            # by the time a scan worker reaches the file it has usually been closed
+            written_path = getattr(event, 'dest_path', None) or file_path
+            if (event_type in ('created', 'modified', 'moved') and
+                    os.path.splitext(written_path)[1].lower() in self.provenance_extensions):
+                self.process_graph.record_file_write(written_path, self.find_file_writer(written_path))
+            
+            # Hashing, entropy and AI scoring happen off the observer thread
+            self.queue_file_scan(file_path, event_type)
+        
+        except Exception as e:
+            self.logger.error(f"File event analysis error: {e}")
+    
+    def queue_file_scan(self, file_path: str, event_type: str):
+        """Queue a scan of a file unless one is already waiting for it"""
+        with self.pending_scans_lock:
+            if file_path in self.pending_scans or file_path in self.spilled_scans:
+                # The waiting scan reads the file as it is when it runs
+                self.scans_coalesced += 1
+                return
+            if len(self.pending_scans) >= self.max_pending_scans:
+                action = "scans_dropped" if self.spill_file_scan(file_path, event_type) else "scans_deferred"
+                # Reported when deferring starts and again when scans start being dropped
+                report_overload = self.scan_overload_reported not in (action, "scans_dropped")
+                if report_overload:
+                    self.scan_overload_reported = action
+            else:
+                self.pending_scans[file_path] = event_type
+                action = None
+        
+        if action is None:
+            self.file_scan_executor.submit(self.run_queued_scan, file_path)
+        elif report_overload:
+            self.report_scan_overload(file_path, action)
+    
+    def spill_file_scan(self, file_path: str, event_type: str) -> bool:
+        """Park a scan the full queue cannot take; returns True if it had to be dropped"""
+        if len(self.spilled_scans) >= self.max_spilled_scans:
+            self.scans_skipped += 1
+            return True
+        self.spilled_scans[file_path] = event_type
+        self.scans_spilled += 1
+        return False
+    
+    def report_scan_overload(self, file_path: str, action: str):
+        """Record that file events outpace the scanners"""
+        self.logger.warning(f"File scan queue full ({self.max_pending_scans} waiting); "
+                            f"{action.split('_')[1]} from {file_path} on")
+        self.log_threat_detection(
+            threat_type="scan_overload",
+            threat_name="File Scan Queue Overloaded",
+            file_path=file_path,
+            action_taken=action,
+            threat_level=6,
+            details={'pending': len(self.pending_scans), 'spilled': len(self.spilled_scans),
+                     'skipped': self.scans_skipped}
+        )
+    
+    def run_queued_scan(self, file_path: str):
+        """Scan a queued file, accepting new events for it from now on"""
+        with self.pending_scans_lock:
+            event_type = self.pending_scans.pop(file_path, None)
+        try:
+            if event_type is not None:
+                self.scan_file_event(file_path, event_type)
+        finally:
+            self.requeue_spilled_scans()
+    
+    def requeue_spilled_scans(self):
+        """Move spilled scans back into the queue once it has drained to half"""
+        with self.pending_scans_lock:
+            if len(self.pending_scans) > self.max_pending_scans // 2:
+                return
+            requeued = []
+            while self.spilled_scans and len(self.pending_scans) < self.max_pending_scans:
+                file_path = next(iter(self.spilled_scans))
+                self.pending_scans[file_path] = self.spilled_scans.pop(file_path)
+                requeued.append(file_path)
+            if not self.spilled_scans:
+                # A later overload is reported again
+                self.scan_overload_reported = None
+        
+        for file_path in requeued:
+            self.file_scan_executor.submit(self.run_queued_scan, file_path)
+    
+    def scan_file_event(self, file_path: str, event_type: str):
+        """Scan the file behind a file system event"""
+        try:
             # Skip if file doesn't exist
             if not os.path.exists(file_path):
                 return
@@ -294,6 +531,8 @@ class SystemWatcher:
             
             # Get file information
             file_info = self.get_file_info(file_path)
+            if file_info is None:
+                return
             
             # Check for suspicious patterns
             is_suspicious = self.is_file_suspicious(file_path, file_info)
@@ -302,12 +541,23 @@ class SystemWatcher:
                 self.handle_suspicious_file(file_path, file_info, event_type)
             
             # Store file event
-            self.store_file_event(event_type, file_path, file_info, is_suspicious)
+            self.event_bus.publish(FileScanned(event_type, file_info, is_suspicious))
             
         except Exception as e:
             self.logger.error(f"File event analysis error: {e}")
     
-    def get_file_info(self, file_path: str) -> Dict:
+    def find_file_writer(self, file_path: str):
+        """Best-effort writer of a new file: a recently active process that still has it open"""
+        target = os.path.normcase(os.path.abspath(file_path))
+        for pid in self.process_graph.recent_processes():
+            try:
+                if any(os.path.normcase(f.path) == target for f in psutil.Process(pid).open_files()):
+                    return pid
+            except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+                continue
+        return None
+    
+    def get_file_info(self, file_path: str) -> Optional[FileRecord]:
         """Get comprehensive file information"""
         try:
             stat_info = os.stat(file_path)
@@ -315,21 +565,11 @@ class SystemWatcher:
             # Calculate file hash
             file_hash = self.calculate_file_hash(file_path)
             
-            # Get file extension and type
-            file_ext = Path(file_path).suffix.lower()
-            
-            return {
-                'size': stat_info.st_size,
-                'modified': datetime.fromtimestamp(stat_info.st_mtime),
-                'created': datetime.fromtimestamp(stat_info.st_ctime),
-                'hash': file_hash,
-                'extension': file_ext,
-                'path': file_path
-            }
+            return FileRecord.from_stat(file_path, stat_info, file_hash)
             
         except Exception as e:
             self.logger.error(f"Failed to get file info for {file_path}: {e}")
-            return {}
+            return None
     
     def calculate_file_hash(self, file_path: str) -> str:
         """Calculate SHA256 hash of file"""
@@ -343,7 +583,7 @@ class SystemWatcher:
         except Exception as e:
             return ""
     
-    def is_file_suspicious(self, file_path: str, file_info: Dict) -> bool:
+    def is_file_suspicious(self, file_path: str, file_info: FileRecord) -> bool:
         """Determine if file is suspicious"""
         suspicious_indicators = []
         
@@ -354,35 +594,48 @@ class SystemWatcher:
                 '.js', '.jar', '.dll', '.sys', '.drv'
             ]
             
-            if file_info.get('extension', '') in suspicious_extensions:
+            if file_info.extension in suspicious_extensions:
                 suspicious_indicators.append("suspicious_extension")
             
             # Check file size (very small or very large executables)
-            file_size = file_info.get('size', 0)
-            if file_info.get('extension') == '.exe':
+            file_size = file_info.size
+            if file_info.extension == '.exe':
                 if file_size < 1024 or file_size > 100 * 1024 * 1024:  # < 1KB or > 100MB
                     suspicious_indicators.append("unusual_size")
             
             # Check file location
             temp_dirs = ['\\temp\\', '\\tmp\\', '\\appdata\\local\\temp\\']
             if any(temp_dir in file_path.lower() for temp_dir in temp_dirs):
-                if file_info.get('extension') in ['.exe', '.dll', '.sys']:
+                if file_info.extension in ['.exe', '.dll', '.sys']:
                     suspicious_indicators.append("temp_executable")
             
             # Check for hidden files in system directories
             if file_path.startswith('C:\\Windows\\') and '\\.' in file_path:
                 suspicious_indicators.append("hidden_system_file")
             
+            # Check for packed or encrypted content (high byte entropy), over the same leading
+            # bytes the signature scan reads so a huge file cannot stall the scan workers
+            if self.entropy_analyzer and file_info.extension in suspicious_extensions:
+                entropy_report = self.entropy_analyzer.analyze_file(file_path, max_bytes=self.entropy_scan_bytes)
+                file_info.entropy = entropy_report.get('entropy', 0.0)
+                
+                if self.entropy_analyzer.is_packed_or_encrypted(entropy_report):
+                    suspicious_indicators.append("packed_or_encrypted")
+                elif entropy_report.get('high_entropy_regions'):
+                    suspicious_indicators.append("high_entropy_regions")
+            
+            # Check content against byte and YARA signatures
+            if file_info.extension in suspicious_extensions and self.get_signature_matches(file_path):
+                suspicious_indicators.append("signature_match")
+            
             # Check file hash against known threats
-            file_hash = file_info.get('hash', '')
-            if self.is_hash_malicious(file_hash):
+            if self.is_hash_malicious(file_info.hash):
                 suspicious_indicators.append("known_malware_hash")
             
             # AI-based analysis
-            if self.ai_system and file_info:
-                ai_prediction = self.get_ai_file_analysis(file_info)
-                if ai_prediction.get('threat_level', 0) > 7:
-                    suspicious_indicators.append("ai_detection")
+            ai_prediction = self.get_ai_file_analysis(file_info)
+            if ai_prediction.get('threat_level', 0) > 7:
+                suspicious_indicators.append("ai_detection")
             
             return len(suspicious_indicators) >= 2  # Require multiple indicators
             
@@ -390,49 +643,71 @@ class SystemWatcher:
             self.logger.error(f"Suspicious file analysis error: {e}")
             return False
     
+    def get_signature_matches(self, file_path: str, max_bytes: int = 4 * 1024 * 1024) -> List[Dict]:
+        """Content signatures matching the start of a file"""
+        # One snapshot per scan, so an update mid-scan cannot mix signature versions
+        snapshot = self.signature_updater.snapshot
+        if snapshot is None:
+            return []
+        
+        try:
+            with open(file_path, 'rb') as f:
+                return snapshot.scan_bytes(f.read(max_bytes))
+        except OSError:
+            return []
+    
     def is_hash_malicious(self, file_hash: str) -> bool:
         """Check if file hash is known malicious"""
-        # In production, this would check against threat intelligence databases
-        known_malicious_hashes = [
-            'd41d8cd98f00b204e9800998ecf8427e',  # Example hashes
-            '5d41402abc4b2a76b9719d911017c592',
-            '098f6bcd4621d373cade4e832627b4f6'
-        ]
+        if not file_hash:
+            return False
         
-        return file_hash in known_malicious_hashes
+        # Signature snapshot first, then hashes published by threat feeds since it was compiled
+        snapshot = self.signature_updater.snapshot
+        if snapshot is not None and snapshot.lookup_hash(file_hash) is not None:
+            return True
+        return self.is_ioc_match_trusted(self.ioc_store.lookup_hash(file_hash))
+    
+    def is_ioc_match_trusted(self, match: Optional[Dict[str, Any]]) -> bool:
+        """Whether an IOC store match is confident enough to act on"""
+        if not match:
+            return False
+        if str(match['source']).startswith(SCRAPED_SOURCE_PREFIX):
+            return match['confidence'] >= self.scraped_ioc_min_confidence
+        return match['confidence'] >= self.ioc_min_confidence
     
-    def get_ai_file_analysis(self, file_info: Dict) -> Dict:
+    def get_ai_file_analysis(self, file_info: FileRecord) -> Dict:
         """Get AI analysis of file"""
         try:
             # Extract features for AI analysis
             features = [
-                file_info.get('size', 0) / 1024 / 1024,  # Size in MB
-                len(file_info.get('path', '')),  # Path length
-                1 if file_info.get('extension') in ['.exe', '.dll'] else 0,  # Is executable
-                (datetime.now() - file_info.get('created', datetime.now())).days,  # Age in days
-                1 if '\\temp\\' in file_info.get('path', '').lower() else 0,  # In temp dir
-                len(file_info.get('hash', '')) / 64,  # Hash complexity
+                file_info.size / 1024 / 1024,  # Size in MB
+                len(file_info.path),  # Path length
+                1 if file_info.extension in ['.exe', '.dll'] else 0,  # Is executable
+                (time.time_ns() - file_info.created_ns) // (86400 * NS_PER_SECOND),  # Age in days
+                1 if '\\temp\\' in file_info.path.lower() else 0,  # In temp dir
+                len(file_info.hash) / 64,  # Hash complexity
                 0, 0, 0, 0  # Padding to reach 10 features
             ]
             
-            return self.ai_system.predict_threat(features)
+            # Queued with concurrent scans and scored in one vectorized batch
+            return self.threat_predictor.batcher.predict(features)
             
         except Exception as e:
             self.logger.error(f"AI file analysis error: {e}")
             return {'threat_level': 0}
     
-    def handle_suspicious_file(self, file_path: str, file_info: Dict, event_type: str):
+    def handle_suspicious_file(self, file_path: str, file_info: FileRecord, event_type: str):
         """Handle detection of suspicious file"""
         try:
-            threat_name = f"Suspicious_{event_type}_{file_info.get('extension', 'unknown')}"
+            threat_name = f"Suspicious_{event_type}_{file_info.extension or 'unknown'}"
             
             # Determine action based on threat level
             action = "monitor"
             
-            if self.is_hash_malicious(file_info.get('hash', '')):
+            if self.is_hash_malicious(file_info.hash):
                 action = "quarantine"
                 self.quarantine_file(file_path)
-            elif file_info.get('extension') in ['.exe', '.dll', '.sys']:
+            elif file_info.extension in ['.exe', '.dll', '.sys']:
                 action = "block"
                 self.block_file_execution(file_path)
             
@@ -442,7 +717,7 @@ class SystemWatcher:
                 threat_name=threat_name,
                 file_path=file_path,
                 action_taken=action,
-                details=json.dumps(file_info)
+                details={**file_info.to_dict(), 'dropped_by': self.process_graph.who_dropped(file_path)}
             )
             
             self.threats_blocked += 1
@@ -452,6 +727,26 @@ class SystemWatcher:
         except Exception as e:
             self.logger.error(f"Suspicious file handling error: {e}")
     
+    def handle_ransomware_activity(self, verdict: Dict, event):
+        """Handle mass file encryption verdict"""
+        try:
+            self.log_threat_detection(
+                threat_type="ransomware_activity",
+                threat_name=verdict['threat_name'],
+                file_path=getattr(event, 'dest_path', None) or event.src_path,
+                process_name=verdict['process'],
+                threat_level=verdict['severity'],
+                action_taken="alert",
+                details=verdict
+            )
+            
+            self.threats_blocked += 1
+            
+            print(f"🔐 Ransomware activity detected: {', '.join(verdict['reasons'])} (process: {verdict['process']})")
+        
+        except Exception as e:
+            self.logger.error(f"Ransomware activity handling error: {e}")
+    
     def quarantine_file(self, file_path: str):
         """Move file to quarantine"""
         try:
@@ -490,11 +785,10 @@ class SystemWatcher:
             try:
                 current_processes = set()
                 
-                for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'username', 'ppid']):
+                for proc in psutil.process_iter(ProcessRecord.ATTRIBUTES):
                     try:
-                        proc_info = proc.info
-                        proc_id = proc_info['pid']
-                        proc_name = proc_info['name']
+                        proc_info = ProcessRecord.from_info(proc.info)
+                        proc_id = proc_info.pid
                         
                         current_processes.add(proc_id)
                         self.processes_monitored += 1
@@ -510,40 +804,45 @@ class SystemWatcher:
                     except (psutil.NoSuchProcess, psutil.AccessDenied):
                         continue
                 
+                # Exited processes no longer own partial behavior sequences; their graph nodes age out
+                for proc_id in known_processes - current_processes:
+                    self.behavior_engine.forget_process(proc_id)
+                    self.process_graph.process_exited(proc_id)
+                self.process_graph.prune()
+                
                 # Update known processes
                 known_processes = current_processes
                 
-                time.sleep(5)  # Check every 5 seconds
+                self.scheduler.wait('process')  # Every 2-30 seconds
                 
             except Exception as e:
                 self.logger.error(f"Process monitoring error: {e}")
                 time.sleep(10)
     
-    def analyze_new_process(self, proc_info: Dict):
+    def analyze_new_process(self, proc_info: ProcessRecord):
         """Analyze newly started process"""
         try:
-            proc_name = proc_info.get('name', '')
-            cmdline = ' '.join(proc_info.get('cmdline', []))
+            node = self.process_graph.process_started(proc_info)
+            if node.parent is not None:
+                parent_process = f"{node.parent.name} ({node.parent.pid})"
+            else:
+                parent_process = str(proc_info.ppid or '')
             
             # Store process event
-            self.store_process_event(
-                event_type="process_start",
-                proc_info=proc_info,
-                suspicious=False
-            )
+            self.event_bus.publish(ProcessActivity("process_start", proc_info, parent_process))
             
-            print(f"🔍 New process: {proc_name} (PID: {proc_info.get('pid')})")
+            print(f"🔍 New process: {proc_info.name} (PID: {proc_info.pid})")
             
         except Exception as e:
             self.logger.error(f"New process analysis error: {e}")
     
-    def is_process_suspicious(self, proc_info: Dict) -> bool:
+    def is_process_suspicious(self, proc_info: ProcessRecord) -> bool:
         """Determine if process is suspicious"""
         suspicious_indicators = []
         
         try:
-            proc_name = proc_info.get('name', '').lower()
-            cmdline = ' '.join(proc_info.get('cmdline', [])).lower()
+            proc_name = proc_info.name.lower()
+            cmdline = proc_info.command_line.lower()
             
             # Check if process is not in whitelist
             if proc_name not in self.process_whitelist:
@@ -566,7 +865,7 @@ class SystemWatcher:
                     suspicious_indicators.append("suspicious_command_line")
                 
                 # Check for process injection indicators
-                if 'svchost' in proc_name and proc_info.get('username') != 'SYSTEM':
+                if 'svchost' in proc_name and proc_info.username != 'SYSTEM':
                     suspicious_indicators.append("suspicious_svchost")
                 
                 # Check for processes running from temp directories
@@ -580,18 +879,18 @@ class SystemWatcher:
             self.logger.error(f"Process suspicion analysis error: {e}")
             return False
     
-    def handle_suspicious_process(self, proc_info: Dict):
+    def handle_suspicious_process(self, proc_info: ProcessRecord):
         """Handle suspicious process detection"""
         try:
-            proc_id = proc_info.get('pid')
-            proc_name = proc_info.get('name', '')
+            proc_id = proc_info.pid
+            proc_name = proc_info.name
             
             # Add to suspicious processes
             self.suspicious_processes.add(proc_id)
             
             # Terminate highly suspicious processes
             high_risk_patterns = ['powershell -enc', 'certutil -decode', 'invoke-expression']
-            cmdline = ' '.join(proc_info.get('cmdline', [])).lower()
+            cmdline = proc_info.command_line.lower()
             
             action = "monitor"
             if any(pattern in cmdline for pattern in high_risk_patterns):
@@ -604,7 +903,11 @@ class SystemWatcher:
                 threat_name=f"Suspicious_{proc_name}",
                 process_name=proc_name,
                 action_taken=action,
-                details=json.dumps(proc_info)
+                details={
+                    **proc_info.to_dict(),
+                    'ancestry': [node['name'] for node in self.process_graph.ancestry(proc_id)[1:]],
+                    'descendants': [node['pid'] for node in self.process_graph.descendants(proc_id)]
+                }
             )
             
             self.threats_blocked += 1
@@ -636,7 +939,7 @@ class SystemWatcher:
                         self.analyze_network_connection(conn)
                         self.network_connections_checked += 1
                 
-                time.sleep(10)  # Check every 10 seconds
+                self.scheduler.wait('network')  # Every 3-60 seconds
                 
             except Exception as e:
                 self.logger.error(f"Network monitoring error: {e}")
@@ -659,6 +962,8 @@ class SystemWatcher:
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 proc_name = "unknown"
             
+            self.process_graph.record_connection(connection.pid, f"{remote_ip}:{remote_port}")
+            
             # Check for suspicious connections
             is_suspicious = self.is_connection_suspicious(remote_ip, remote_port, proc_name)
             
@@ -666,7 +971,7 @@ class SystemWatcher:
                 self.handle_suspicious_connection(connection, proc_name)
             
             # Store network event
-            self.store_network_event(connection, proc_name, is_suspicious)
+            self.event_bus.publish(NetworkActivity(connection, proc_name, is_suspicious))
             
         except Exception as e:
             self.logger.error(f"Network connection analysis error: {e}")
@@ -674,8 +979,8 @@ class SystemWatcher:
     def is_connection_suspicious(self, remote_ip: str, remote_port: int, proc_name: str) -> bool:
         """Determine if network connection is suspicious"""
         try:
-            # Check against IP blacklist
-            if remote_ip in self.ip_blacklist:
+            # Check against listed IPs and CIDR ranges
+            if self.is_ioc_match_trusted(self.ioc_store.lookup_ip(remote_ip)):
                 return True
             
             # Check for connections to suspicious ports
@@ -729,62 +1034,127 @@ class SystemWatcher:
             try:
                 # Monitor critical registry keys
                 critical_keys = [
-                    r"SOFTWARE\Microsoft\Windows\CurrentVersion\Run",
-                    r"SOFTWARE\Microsoft\Windows\CurrentVersion\RunOnce",
-                    r"SYSTEM\CurrentControlSet\Services"
+                    (winreg.HKEY_LOCAL_MACHINE, "HKLM", r"SOFTWARE\Microsoft\Windows\CurrentVersion\Run"),
+                    (winreg.HKEY_LOCAL_MACHINE, "HKLM", r"SOFTWARE\Microsoft\Windows\CurrentVersion\RunOnce"),
+                    (winreg.HKEY_LOCAL_MACHINE, "HKLM", r"SYSTEM\CurrentControlSet\Services"),
+                    (winreg.HKEY_CURRENT_USER, "HKCU", r"SOFTWARE\Microsoft\Windows\CurrentVersion\Run"),
+                    (winreg.HKEY_CURRENT_USER, "HKCU", r"SOFTWARE\Microsoft\Windows\CurrentVersion\RunOnce")
                 ]
                 
-                for key_path in critical_keys:
-                    self.check_registry_key(key_path)
+                for hive, hive_name, key_path in critical_keys:
+                    self.check_registry_key(hive, hive_name, key_path)
                 
-                time.sleep(60)  # Check every minute
+                self.scheduler.wait('registry')  # Every 15-600 seconds
                 
             except Exception as e:
                 self.logger.error(f"Registry monitoring error: {e}")
                 time.sleep(120)
     
-    def check_registry_key(self, key_path: str):
-        """Check registry key for changes"""
+    def check_registry_key(self, hive, hive_name: str, key_path: str):
+        """Check registry key for value and subkey changes since the last poll"""
         try:
-            # This is a simplified check - real implementation would track changes
-            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path)
+            key = winreg.OpenKey(hive, key_path)
             
-            num_values = winreg.QueryInfoKey(key)[1]
-            
-            # Store registry check (simplified)
-            self.store_system_change(
-                change_type="registry_check",
-                registry_key=key_path,
-                details=f"Values: {num_values}"
+            try:
+                subkey_count, value_count, _ = winreg.QueryInfoKey(key)
+                current = {}
+                for index in range(value_count):
+                    name, data, _ = winreg.EnumValue(key, index)
+                    current[name] = str(data)
+                for index in range(subkey_count):
+                    current[winreg.EnumKey(key, index)] = None
+            finally:
+                winreg.CloseKey(key)
+            
+        except OSError:
+            # Key might not exist or access denied
+            return
+        
+        full_key = f"{hive_name}\\{key_path}"
+        previous = self.registry_values.get(full_key)
+        self.registry_values[full_key] = current
+        
+        # The first poll only records the baseline
+        if previous is None:
+            return
+        
+        for name, data in current.items():
+            if name not in previous or previous[name] != data:
+                self.event_bus.publish(SystemChange(
+                    "registry_write",
+                    registry_key=f"{full_key}\\{name}",
+                    old_value=previous.get(name) or '',
+                    new_value=data or ''
+                ))
+        
+        for name in previous.keys() - current.keys():
+            self.event_bus.publish(SystemChange(
+                "registry_delete",
+                registry_key=f"{full_key}\\{name}",
+                old_value=previous[name] or ''
+            ))
+    
+    def observe_behavior(self, event):
+        """Behavior rule subscriber: match a monitor event against the behavioral rules"""
+        if isinstance(event, FileActivity):
+            event = file_event(event.event_type, event.file_path, event.dest_path)
+        elif isinstance(event, ProcessActivity):
+            event = process_event(event.record)
+        elif isinstance(event, NetworkActivity):
+            event = network_event(event.connection.raddr.ip, event.connection.raddr.port,
+                                  event.connection.pid, event.proc_name)
+        elif isinstance(event, SystemChange) and event.change_type in ('registry_write', 'registry_delete'):
+            event = registry_event(event.fields['registry_key'], deleted=event.change_type == 'registry_delete')
+        else:
+            return
+        if event is None:
+            return
+        
+        try:
+            self.behavior_engine.sync_rules(self.signature_updater.current)
+            for match in self.behavior_engine.process_event(event):
+                self.handle_behavior_match(match)
+        except Exception as e:
+            self.logger.error(f"Behavior rule error: {e}")
+    
+    def handle_behavior_match(self, match: Dict):
+        """Handle a behavioral rule or sequence match"""
+        try:
+            is_sequence = 'sequence' in match
+            self.log_threat_detection(
+                threat_type="behavior_sequence" if is_sequence else "behavior_rule",
+                threat_name=match['rule'],
+                file_path=match['key'] if match['event_type'].startswith('FILE_') else '',
+                process_name=match['process'],
+                threat_level=match['severity'],
+                action_taken="alert",
+                details=match
             )
             
-            winreg.CloseKey(key)
+            self.threats_blocked += 1
+            
+            if is_sequence:
+                steps = ' -> '.join(step['key'] for step in match['sequence'])
+                print(f"⛓️ Behavior sequence detected: {match['rule']} ({steps})")
+            else:
+                print(f"🧭 Behavior rule matched: {match['rule']} - {match['key']}")
             
         except Exception as e:
-            # Key might not exist or access denied
-            pass
+            self.logger.error(f"Behavior match handling error: {e}")
     
     def behavior_analysis_loop(self):
         """Analyze system behavior patterns"""
         while self.monitoring_active:
             try:
-                # Collect system metrics
-                cpu_percent = psutil.cpu_percent(interval=1)
-                memory_percent = psutil.virtual_memory().percent
-                disk_io = psutil.disk_io_counters()
-                network_io = psutil.net_io_counters()
+                # Collect per-interval system metrics (non-blocking)
+                metrics = self.metrics_sampler.sample()
+                metrics.update(self.metrics_sampler.anomaly_features())
+                self.behavior_baseline.record(metrics)
                 
                 # Analyze for anomalies
-                self.analyze_system_behavior({
-                    'cpu_percent': cpu_percent,
-                    'memory_percent': memory_percent,
-                    'disk_read_bytes': disk_io.read_bytes if disk_io else 0,
-                    'disk_write_bytes': disk_io.write_bytes if disk_io else 0,
-                    'network_bytes_sent': network_io.bytes_sent if network_io else 0,
-                    'network_bytes_recv': network_io.bytes_recv if network_io else 0
-                })
+                self.analyze_system_behavior(metrics)
                 
-                time.sleep(30)  # Analyze every 30 seconds
+                self.scheduler.wait('behavior')  # Every 10-120 seconds
                 
             except Exception as e:
                 self.logger.error(f"Behavior analysis error: {e}")
@@ -803,28 +1173,23 @@ class SystemWatcher:
             if metrics['memory_percent'] > 95:
                 anomalies.append("high_memory_usage")
             
-            # Check for excessive disk activity
-            if metrics['disk_write_bytes'] > 100 * 1024 * 1024:  # 100MB/30sec
+            # Check for excessive disk activity (rates are bytes per second)
+            if metrics['disk_write_rate'] > 100 * 1024 * 1024 / 30:  # 100MB/30sec
                 anomalies.append("excessive_disk_writes")
             
             # Check for excessive network activity
-            if metrics['network_bytes_sent'] > 50 * 1024 * 1024:  # 50MB/30sec
+            if metrics['network_sent_rate'] > 50 * 1024 * 1024 / 30:  # 50MB/30sec
                 anomalies.append("excessive_network_traffic")
             
-            if anomalies and self.ai_system:
-                # Use AI to analyze behavior
-                features = [
-                    metrics['cpu_percent'],
-                    metrics['memory_percent'],
-                    metrics['disk_read_bytes'] / 1024 / 1024,
-                    metrics['disk_write_bytes'] / 1024 / 1024,
-                    metrics['network_bytes_sent'] / 1024 / 1024,
-                    metrics['network_bytes_recv'] / 1024 / 1024,
-                    len(anomalies),
-                    0, 0, 0  # Padding
-                ]
+            # Statistical outliers against recent history
+            for field in metrics.get('outliers', []):
+                anomalies.append(f"{field}_spike")
                 
-                ai_result = self.ai_system.predict_threat(features)
+            if anomalies:
+                # Compare the current minute with this endpoint's learned baseline
+                # (features built exactly as the baseline was trained)
+                behavior = self.behavior_baseline.current_features()
+                ai_result = self.threat_predictor.score_behavior(behavior) if behavior is not None else {}
                 
                 if ai_result.get('is_anomaly', False):
                     self.handle_behavior_anomaly(anomalies, metrics, ai_result)
@@ -841,11 +1206,11 @@ class SystemWatcher:
                 threat_type="behavior_anomaly",
                 threat_name=f"Anomaly_{anomaly_description}",
                 action_taken="monitor",
-                details=json.dumps({
+                details={
                     'anomalies': anomalies,
                     'metrics': metrics,
                     'ai_result': ai_result
-                })
+                }
             )
             
             print(f"⚠️ Behavior anomaly detected: {anomaly_description}")
@@ -854,165 +1219,197 @@ class SystemWatcher:
             self.logger.error(f"Behavior anomaly handling error: {e}")
     
     def memory_scanner_loop(self):
-        """Scan memory for malicious patterns"""
+        """Scan process resource telemetry for miners, leaks and memory hogs"""
         while self.monitoring_active:
             try:
-                # Simplified memory scanning
-                suspicious_processes = []
+                self.process_telemetry.sample()
                 
-                for proc in psutil.process_iter(['pid', 'name', 'memory_percent']):
-                    try:
-                        if proc.info['memory_percent'] > 50:  # Using > 50% memory
-                            suspicious_processes.append(proc.info)
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                # Sustained high CPU from a non-whitelisted process - possible cryptominer
+                for proc in self.process_telemetry.sustained_high_cpu(threshold_percent=80.0, duration=300.0):
+                    if proc['name'].lower() in self.process_whitelist:
                         continue
+                    self.handle_cryptomining_suspect(proc)
                 
+                suspicious_processes = self.process_telemetry.high_memory_processes(percent=50.0)
                 if suspicious_processes:
                     print(f"🧠 Memory scan: {len(suspicious_processes)} high-memory processes")
                 
-                time.sleep(300)  # Scan every 5 minutes
+                for proc in self.process_telemetry.memory_growth():
+                    self.logger.warning(
+                        f"Possible memory leak: {proc['name']} (PID: {proc['pid']}) "
+                        f"+{proc['growth_bytes_per_minute'] / 1024 / 1024:.1f} MB/min"
+                    )
+                
+                # Collector samples faster while processes are busy
+                self.scheduler.wait('memory', cap=self.process_telemetry.next_interval())
                 
             except Exception as e:
                 self.logger.error(f"Memory scanning error: {e}")
                 time.sleep(600)
     
-    def store_file_event(self, event_type: str, file_path: str, file_info: Dict, suspicious: bool):
-        """Store file event in database"""
+    def handle_cryptomining_suspect(self, proc_info: Dict):
+        """Handle process with sustained high CPU usage"""
         try:
-            conn = sqlite3.connect(self.protection_database)
-            cursor = conn.cursor()
+            key = (proc_info['pid'], proc_info['name'])
+            if key in self.reported_miners:
+                return
+            self.reported_miners.add(key)
             
-            cursor.execute('''
-                INSERT INTO file_events 
-                (timestamp, event_type, file_path, file_hash, file_size, suspicious, action_taken)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.now(),
-                event_type,
-                file_path,
-                file_info.get('hash', ''),
-                file_info.get('size', 0),
-                suspicious,
-                'quarantine' if suspicious else 'none'
-            ))
+            self.log_threat_detection(
+                threat_type="cryptomining",
+                threat_name=f"Cryptomining_{proc_info['name']}",
+                process_name=proc_info['name'],
+                threat_level=7,
+                action_taken="monitor",
+                details=proc_info
+            )
             
-            conn.commit()
-            conn.close()
+            self.threats_blocked += 1
             
+            print(f"⛏️ Possible cryptominer: {proc_info['name']} (PID: {proc_info['pid']}) - {proc_info['cpu_percent']:.0f}% CPU sustained")
+        
         except Exception as e:
-            self.logger.error(f"Failed to store file event: {e}")
+            self.logger.error(f"Cryptomining handling error: {e}")
     
-    def store_process_event(self, event_type: str, proc_info: Dict, suspicious: bool):
-        """Store process event in database"""
+    def persist_events(self, events: List[Any]):
+        """Storage subscriber: write a batch of bus events in one transaction"""
         try:
-            conn = sqlite3.connect(self.protection_database)
+            # Detections and telemetry are written by separate subscribers, so wait out the other's lock
+            conn = sqlite3.connect(self.protection_database, timeout=30)
             cursor = conn.cursor()
             
-            cursor.execute('''
-                INSERT INTO process_events 
-                (timestamp, event_type, process_id, process_name, command_line, user_name, suspicious, action_taken)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.now(),
-                event_type,
-                proc_info.get('pid', 0),
-                proc_info.get('name', ''),
-                ' '.join(proc_info.get('cmdline', [])),
-                proc_info.get('username', ''),
-                suspicious,
-                'terminate' if suspicious else 'none'
-            ))
+            # A row that fails is skipped; the rest of the batch is still committed
+            failed = 0
+            for event in events:
+                store = self.event_storers.get(type(event))
+                if store:
+                    try:
+                        store(cursor, event)
+                    except Exception as e:
+                        failed += 1
+                        self.logger.error(f"Failed to store {type(event).__name__}: {e}")
             
             conn.commit()
             conn.close()
             
+            if failed:
+                self.logger.error(f"Stored {len(events) - failed} of {len(events)} events")
+            
         except Exception as e:
-            self.logger.error(f"Failed to store process event: {e}")
+            self.logger.error(f"Failed to store {len(events)} events: {e}")
     
-    def store_network_event(self, connection, proc_name: str, suspicious: bool):
+    def store_file_event(self, cursor, event: FileScanned):
+        """Store file event in database"""
+        cursor.execute('''
+            INSERT INTO file_events 
+            (timestamp, event_type, file_path, file_hash, file_size, suspicious, action_taken)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            ns_to_datetime(event.timestamp_ns),
+            event.event_type,
+            event.record.path,
+            event.record.hash,
+            event.record.size,
+            event.suspicious,
+            'quarantine' if event.suspicious else 'none'
+        ))
+            
+    def store_process_event(self, cursor, event: ProcessActivity):
+        """Store process event in database"""
+        proc_info = event.record
+        cursor.execute('''
+            INSERT INTO process_events 
+            (timestamp, event_type, process_id, process_name, parent_process, command_line, user_name, suspicious, action_taken)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            ns_to_datetime(event.timestamp_ns),
+            event.event_type,
+            proc_info.pid,
+            proc_info.name,
+            event.parent_process,
+            proc_info.command_line,
+            proc_info.username,
+            event.suspicious,
+            'terminate' if event.suspicious else 'none'
+        ))
+    
+    def store_network_event(self, cursor, event: NetworkActivity):
         """Store network event in database"""
-        try:
-            conn = sqlite3.connect(self.protection_database)
-            cursor = conn.cursor()
-            
-            remote_addr = f"{connection.raddr.ip}:{connection.raddr.port}" if connection.raddr else ""
-            local_addr = f"{connection.laddr.ip}:{connection.laddr.port}" if connection.laddr else ""
-            
-            cursor.execute('''
-                INSERT INTO network_events 
-                (timestamp, event_type, process_name, local_address, remote_address, protocol, suspicious, action_taken)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.now(),
-                "connection",
-                proc_name,
-                local_addr,
-                remote_addr,
-                "TCP" if connection.type == socket.SOCK_STREAM else "UDP",
-                suspicious,
-                'block' if suspicious else 'none'
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            self.logger.error(f"Failed to store network event: {e}")
+        connection = event.connection
+        remote_addr = f"{connection.raddr.ip}:{connection.raddr.port}" if connection.raddr else ""
+        local_addr = f"{connection.laddr.ip}:{connection.laddr.port}" if connection.laddr else ""
+            
+        cursor.execute('''
+            INSERT INTO network_events 
+            (timestamp, event_type, process_name, local_address, remote_address, protocol, suspicious, action_taken)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            ns_to_datetime(event.timestamp_ns),
+            "connection",
+            event.proc_name,
+            local_addr,
+            remote_addr,
+            "TCP" if connection.type == socket.SOCK_STREAM else "UDP",
+            event.suspicious,
+            'block' if event.suspicious else 'none'
+        ))
     
-    def store_system_change(self, change_type: str, **kwargs):
+    def store_system_change(self, cursor, event: SystemChange):
         """Store system change in database"""
-        try:
-            conn = sqlite3.connect(self.protection_database)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO system_changes 
-                (timestamp, change_type, registry_key, service_name, startup_item, old_value, new_value, suspicious, action_taken)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.now(),
-                change_type,
-                kwargs.get('registry_key', ''),
-                kwargs.get('service_name', ''),
-                kwargs.get('startup_item', ''),
-                kwargs.get('old_value', ''),
-                kwargs.get('new_value', ''),
-                kwargs.get('suspicious', False),
-                kwargs.get('action_taken', 'none')
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            self.logger.error(f"Failed to store system change: {e}")
+        fields = event.fields
+        cursor.execute('''
+            INSERT INTO system_changes 
+            (timestamp, change_type, registry_key, service_name, startup_item, old_value, new_value, suspicious, action_taken)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            ns_to_datetime(event.timestamp_ns),
+            event.change_type,
+            fields.get('registry_key', ''),
+            fields.get('service_name', ''),
+            fields.get('startup_item', ''),
+            fields.get('old_value', ''),
+            fields.get('new_value', ''),
+            fields.get('suspicious', False),
+            fields.get('action_taken', 'none')
+        ))
+            
+    def store_threat_detection(self, cursor, event: ThreatDetected):
+        """Store threat detection in database"""
+        cursor.execute('''
+            INSERT INTO threat_detections 
+            (timestamp, threat_type, threat_name, file_path, process_name, threat_level, action_taken, details)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            ns_to_datetime(event.timestamp_ns),
+            event.threat_type,
+            event.threat_name,
+            event.file_path,
+            event.process_name,
+            event.threat_level,
+            event.action_taken,
+            event.details_json()
+        ))
     
     def log_threat_detection(self, threat_type: str, threat_name: str, action_taken: str, **kwargs):
         """Log threat detection"""
-        try:
-            conn = sqlite3.connect(self.protection_database)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO threat_detections 
-                (timestamp, threat_type, threat_name, file_path, process_name, threat_level, action_taken, details)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                datetime.now(),
-                threat_type,
-                threat_name,
-                kwargs.get('file_path', ''),
-                kwargs.get('process_name', ''),
-                kwargs.get('threat_level', 5),
-                action_taken,
-                kwargs.get('details', '')
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            self.logger.error(f"Failed to log threat detection: {e}")
+        # Detections tighten the monitoring cadence
+        self.scheduler.record_detection()
+            
+        # Storage and notifications pick the detection up from the bus
+        self.event_bus.publish(ThreatDetected(
+            threat_type, threat_name, action_taken,
+            file_path=kwargs.get('file_path') or '',
+            process_name=kwargs.get('process_name') or '',
+            threat_level=kwargs.get('threat_level', 5),
+            details=kwargs.get('details', '')
+        ))
+            
+    def notify_threat(self, event: ThreatDetected):
+        """Notifier subscriber: desktop notification for high-severity detections"""
+        if event.threat_level < 7:
+            return
+        severity = "critical" if event.threat_level >= 9 else "high"
+        self.notifier.send_threat_notification(event.to_dict(), severity)
     
     def get_protection_status(self) -> Dict:
         """Get current protection status"""
@@ -1043,13 +1440,28 @@ class SystemWatcher:
                 'monitoring_active': self.monitoring_active,
                 'threats_blocked': self.threats_blocked,
                 'files_scanned': self.files_scanned,
+                'file_scans': {
+                    'pending': len(self.pending_scans),
+                    'coalesced': self.scans_coalesced,
+                    'spilled': self.scans_spilled,
+                    'skipped': self.scans_skipped
+                },
                 'processes_monitored': self.processes_monitored,
                 'network_connections_checked': self.network_connections_checked,
                 'recent_threats': recent_threats,
                 'total_file_events': total_file_events,
                 'total_process_events': total_process_events,
                 'total_network_events': total_network_events,
-                'ai_available': AI_AVAILABLE,
+                'ai_available': self.ai_system is not None,
+                'ai_model': self.threat_predictor.get_predictor_status(),
+                'behavior_baseline': self.behavior_baseline.get_baseline_status(),
+                'ioc_store': self.ioc_store.get_store_status(),
+                'signatures': self.signature_updater.get_updater_status(),
+                'behavior_rules': self.behavior_engine.get_engine_status(),
+                'process_graph': self.process_graph.get_graph_status(),
+                'event_bus': self.event_bus.get_bus_status(),
+                'notifications': self.notifier.get_dispatcher_status() if self.notifier else {},
+                'monitor_cadence': self.scheduler.get_cadence(),
                 'quarantined_files': len(list(Path(self.quarantine_directory).glob('*'))) if Path(self.quarantine_directory).exists() else 0
             }
             
@@ -1060,10 +1472,26 @@ class SystemWatcher:
     def stop_monitoring(self):
         """Stop system monitoring"""
         self.monitoring_active = False
+        self.scheduler.stop()
         
         if self.file_monitor:
             self.file_monitor.stop()
         
+        if self.file_scan_executor:
+            self.file_scan_executor.shutdown(wait=False)
+        with self.pending_scans_lock:
+            # Scans still waiting are abandoned; a restart sees new events for those paths
+            self.pending_scans.clear()
+            self.spilled_scans.clear()
+            self.scan_overload_reported = None
+        
+        self.threat_predictor.batcher.stop()
+        self.behavior_baseline.flush()
+        self.signature_updater.stop()
+        
+        # Subscribers finish what is already queued
+        self.event_bus.close()
+        
         if self.ai_system:
             self.ai_system.stop_learning()
         
@@ -1096,6 +1524,10 @@ def main():
             print(f"   🚨 Threats Blocked: {status.get('threats_blocked', 0)}")
             print(f"   📦 Quarantined Files: {status.get('quarantined_files', 0)}")
             
+            cadence = status.get('monitor_cadence', {})
+            if cadence:
+                print("   ⏱️ Cadence: " + ", ".join(f"{name} {info['interval']}s" for name, info in cadence.items()))
+            
             time.sleep(10)  # Update status every 10 seconds
         
     except KeyboardInterrupt:
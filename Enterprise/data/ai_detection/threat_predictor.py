@@ -0,0 +1,96 @@
+"""
+Real-Time Threat Predictor
+Scores feature vectors with the current model bundle's NumPy evaluators (no scikit-learn import)
+"""
+
+import time
+import threading
+import logging
+from typing import Dict, List, Any, Optional
+import numpy as np
+
+from model_registry import ModelRegistry
+from prediction_batcher import PredictionBatcher
+
+class ThreatPredictor:
+    """Lazy-loading, hot-reloading predictor for the detection hot path"""
+    
+    def __init__(self, models_directory: str = "ai_models", reload_interval: float = 60.0):
+        self.registry = ModelRegistry(models_directory)
+        self.reload_interval = reload_interval
+        self.logger = logging.getLogger(__name__)
+        
+        # Model and manifest are swapped together as one tuple
+        self.active = (None, None)
+        self.lock = threading.Lock()
+        self.last_check = None
+        
+        # Single-row requests from concurrent scans are scored in micro-batches
+        self.batcher = PredictionBatcher(self.predict_threat_batch)
+    
+    def current_model(self):
+        """Active (manifest, model), loading or switching versions when CURRENT changes"""
+        now = time.monotonic()
+        if self.last_check is not None and now - self.last_check < self.reload_interval:
+            return self.active
+        
+        with self.lock:
+            if self.last_check is not None and now - self.last_check < self.reload_interval:
+                return self.active
+            self.last_check = now
+            
+            manifest, _ = self.active
+            version = self.registry.current_version()
+            if version is None or (manifest and manifest['version'] == version):
+                return self.active
+            
+            try:
+                new_manifest, model = self.registry.load_inference(version)
+                if model is not None:
+                    self.active = (new_manifest, model)
+                    print(f"📦 Threat predictor using model {version}")
+            except Exception as e:
+                # Keep serving the previous version
+                self.logger.error(f"Failed to load inference model {version}: {e}")
+            
+            return self.active
+    
+    def refresh(self):
+        """Check CURRENT again on the next prediction instead of waiting for reload_interval"""
+        self.last_check = None
+    
+    def predict_threat_batch(self, features: np.ndarray) -> List[Dict[str, Any]]:
+        """Score many feature rows in one vectorized pass"""
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        manifest, model = self.current_model()
+        if model is None:
+            return [{'error': 'No trained model available'} for _ in range(len(features))]
+        
+        confidence = manifest['models'].get('pattern_recognition', {}).get('metrics', {}).get('accuracy', 0.0)
+        results = model.predict_batch(features)
+        for result in results:
+            result['confidence'] = confidence
+            result['model_version'] = manifest['version']
+        return results
+    
+    def predict_threat(self, features: List[float]) -> Dict[str, Any]:
+        """Score one feature vector"""
+        return self.predict_threat_batch(np.asarray([features], dtype=np.float64))[0]
+    
+    def score_behavior(self, behavior: np.ndarray) -> Dict[str, Any]:
+        """Score one behavior baseline row (BEHAVIOR_SCHEMA order) against the endpoint's baseline"""
+        manifest, model = self.current_model()
+        if model is None or not model.has_baseline:
+            return {'error': 'No behavior baseline available'}
+        
+        result = model.score_behavior(np.atleast_2d(np.asarray(behavior, dtype=np.float64)))[0]
+        result['model_version'] = manifest['version']
+        return result
+    
+    def get_predictor_status(self) -> Dict[str, Any]:
+        """Active model version and batching statistics"""
+        manifest, _ = self.active
+        return {
+            'model_version': manifest['version'] if manifest else None,
+            'batcher': self.batcher.get_batcher_status()
+        }
\ No newline at end of file
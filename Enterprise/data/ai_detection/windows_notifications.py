@@ -10,9 +10,12 @@ import threading
 from datetime import datetime
 import subprocess
 import json
+from collections import deque
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from notification_dispatcher import NotificationDispatcher, summarize
+
 # Windows notification imports
 try:
     import win10toast
@@ -34,11 +37,19 @@ except ImportError:
 class WindowsNotificationSystem:
     """Advanced Windows notification system with action buttons"""
     
-    def __init__(self):
-        self.notification_history = []
+    def __init__(self, history_size: int = 500, coalesce_window: float = 30.0):
+        # Bounded ring of shown notifications
+        self.notification_history = deque(maxlen=history_size)
         self.toaster = None
         self.notification_id = 0
         
+        # plyer blocks for the display time, so its notifications are shown from this thread
+        self.plyer_thread = None
+        
+        # Threat toasts are rate-limited per severity and handed out one at a time, critical first
+        self.dispatcher = NotificationDispatcher(self.show_threat_notification, coalesce_window=coalesce_window,
+                                                 is_busy=self.is_display_busy)
+        
         # Initialize notification system
         if NOTIFICATIONS_AVAILABLE:
             try:
@@ -54,26 +65,38 @@ class WindowsNotificationSystem:
         self.critical_duration = 30
     
     def send_threat_notification(self, threat_info: Dict[str, Any], severity: str = "high") -> bool:
-        """Send threat detection notification with action buttons"""
+        """Queue threat detection notification; repeats of a threat are coalesced into a summary"""
+        return self.dispatcher.submit(threat_info, severity)
+    
+    def show_threat_notification(self, threat_info: Dict[str, Any], severity: str = "high", count: int = 1) -> bool:
+        """Show threat detection notification with action buttons (dispatcher thread)"""
         try:
             self.notification_id += 1
             
-            # Prepare notification content
-            title = f"🚨 CyberDefense AI - {severity.upper()} THREAT DETECTED"
-            
             threat_name = threat_info.get('threat_name', 'Unknown Threat')
             file_path = threat_info.get('file_path', 'Unknown Location')
             action_taken = threat_info.get('action_taken', 'Monitoring')
             ai_confidence = threat_info.get('ai_confidence', 0.0)
             
-            message = f"""
+            # Prepare notification content
+            if count > 1:
+                title = f"🚨 CyberDefense AI - {count} {severity.upper()} THREATS DETECTED"
+                message = f"""
+{summarize(threat_info, count)}
+Latest: {file_path or threat_info.get('process_name', 'Unknown Location')}
+
+Click for advanced options.
+                """.strip()
+            else:
+                title = f"🚨 CyberDefense AI - {severity.upper()} THREAT DETECTED"
+                message = f"""
 Threat: {threat_name}
 Location: {file_path}
 Action: {action_taken}
 AI Confidence: {ai_confidence:.1%}
 
 Click for advanced options.
-            """.strip()
+                """.strip()
             
             # Determine icon and duration based on severity
             if severity.lower() == "critical":
@@ -86,7 +109,8 @@ Click for advanced options.
                 icon_path = self.get_icon_path("info")
                 duration = self.notification_duration
             
-            # Send notification with callback
+            # Send notification with callback; the toast stays up on its own thread, so the dispatcher
+            # is free to queue the next one (it waits for is_display_busy before showing it)
             if self.toaster:
                 try:
                     # Try with callback first (newer versions)
@@ -107,37 +131,59 @@ Click for advanced options.
                         duration=duration,
                         threaded=True
                     )
-                
-                if success:
-                    # Store notification in history
-                    self.notification_history.append({
-                        'id': self.notification_id,
-                        'timestamp': datetime.now(),
-                        'severity': severity,
-                        'threat_info': threat_info,
-                        'title': title,
-                        'message': message
-                    })
-                    
-                    print(f"📧 Notification sent: {threat_name}")
-                    return True
             
-            # Fallback to plyer notification
+            # Fallback to plyer notification, kept off the dispatcher thread like threaded toasts
             elif NOTIFICATIONS_AVAILABLE:
-                notification.notify(
-                    title=title,
-                    message=message,
-                    timeout=duration,
-                    app_icon=icon_path
+                self.plyer_thread = threading.Thread(
+                    target=self.show_plyer_notification,
+                    args=(title, message, duration, icon_path),
+                    daemon=True
                 )
-                return True
+                self.plyer_thread.start()
+                success = True
             
-            return False
+            else:
+                success = False
+            
+            if success:
+                # Store notification in history
+                self.notification_history.append({
+                    'id': self.notification_id,
+                    'timestamp': datetime.now(),
+                    'severity': severity,
+                    'threat_info': threat_info,
+                    'count': count,
+                    'title': title,
+                    'message': message
+                })
+                
+                print(f"📧 Notification sent: {threat_name}" + (f" (x{count})" if count > 1 else ""))
+            
+            return bool(success)
             
         except Exception as e:
             print(f"❌ Failed to send notification: {e}")
             return False
     
+    def show_plyer_notification(self, title: str, message: str, duration: int, icon_path: Optional[str]):
+        """Show a plyer notification; returns when it is dismissed (plyer thread)"""
+        try:
+            notification.notify(
+                title=title,
+                message=message,
+                timeout=duration,
+                app_icon=icon_path
+            )
+        except Exception as e:
+            print(f"❌ Failed to send notification: {e}")
+    
+    def is_display_busy(self) -> bool:
+        """Whether a toast is still on screen (win10toast and plyer show one at a time)"""
+        if self.plyer_thread is not None and self.plyer_thread.is_alive():
+            return True
+        notification_active = getattr(self.toaster, 'notification_active', None)
+        return bool(notification_active and notification_active())
+    
     def send_system_notification(self, title: str, message: str, 
                                notification_type: str = "info") -> bool:
         """Send general system notification"""
@@ -358,8 +404,12 @@ Continue with automated repair?
             print("⚠️ User declined automated repair")
     
     def get_notification_history(self) -> list:
-        """Get notification history"""
-        return self.notification_history
+        """Get notification history (most recent history_size notifications)"""
+        return list(self.notification_history)
+    
+    def get_dispatcher_status(self) -> Dict[str, Any]:
+        """Rate limiting and coalescing counters"""
+        return self.dispatcher.get_dispatcher_status()
     
     def clear_notification_history(self):
         """Clear notification history"""
@@ -23,6 +23,8 @@ except ImportError:
         return True  # Enterprise has access to all features
     VERSION_TYPE = "ENTERPRISE"
 
+from notification_store import NotificationStore
+
 # Mock the missing cybersecurity_platform module
 class CybersecurityAIPlatform:
     """Mock cybersecurity platform for standalone operation"""
@@ -262,8 +264,8 @@ class ModernCybersecurityGUI:
             'text_muted': '#808080'        # Muted text
         }
         
-        # Initialize notifications early
-        self.notifications = []
+        # Initialize notifications early (bounded store, indexed by type)
+        self.notifications = NotificationStore()
         
         self.setup_fonts()
         self.create_header()
@@ -4166,9 +4168,9 @@ class ModernCybersecurityGUI:
         for widget in self.main_frame.winfo_children():
             widget.destroy()
         
-        # Initialize notifications list if not exists
+        # Initialize notifications store if not exists
         if not hasattr(self, 'notifications'):
-            self.notifications = []
+            self.notifications = NotificationStore()
         
         # Main title
         title = tk.Label(self.main_frame, text="Notifications", 
@@ -4192,7 +4194,7 @@ class ModernCybersecurityGUI:
             bg_color = self.colors['accent_primary'] if is_active else self.colors['bg_primary']
             fg_color = 'white' if is_active else self.colors['text_primary']
             
-            filter_btn = tk.Button(filter_frame, text=filter_name,
+            filter_btn = tk.Button(filter_frame, text=self.get_filter_label(filter_name),
                                  bg=bg_color, fg=fg_color,
                                  font=('Segoe UI', 11, 'bold' if is_active else 'normal'),
                                  relief='flat', bd=0, padx=20, pady=8,
@@ -4220,26 +4222,27 @@ class ModernCybersecurityGUI:
                                 command=self.mark_all_read)
         mark_read_btn.pack(side='right')
         
-        # Notification list container
-        self.notifications_container = tk.Frame(self.main_frame, bg=self.colors['bg_primary'])
-        self.notifications_container.pack(fill='both', expand=True)
-        
-        # Create scrollable frame for notifications
-        canvas = tk.Canvas(self.notifications_container, bg=self.colors['bg_primary'], highlightthickness=0)
-        scrollbar = tk.Scrollbar(self.notifications_container, orient="vertical", command=canvas.yview)
-        self.scrollable_notifications = tk.Frame(canvas, bg=self.colors['bg_primary'])
-        
-        self.scrollable_notifications.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=self.scrollable_notifications, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack canvas and scrollbar
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Notification list container - fixed height, so the list scrolls instead of the page
+        list_height = max(400, self.main_canvas.winfo_height() - 230)
+        self.notifications_container = tk.Frame(self.main_frame, bg=self.colors['bg_primary'], height=list_height)
+        self.notifications_container.pack(fill='x', expand=True)
+        self.notifications_container.pack_propagate(False)
+        
+        # Virtualized list: widgets exist only for the visible rows and are reused on scroll
+        self.notifications_scrollbar = tk.Scrollbar(self.notifications_container, orient="vertical",
+                                                    command=self.scroll_notifications)
+        self.notifications_scrollbar.pack(side="right", fill="y")
+        self.scrollable_notifications = tk.Frame(self.notifications_container, bg=self.colors['bg_primary'])
+        self.scrollable_notifications.pack(side="left", fill="both", expand=True)
+        self.scrollable_notifications.bind("<Configure>", self.on_notifications_resize)
+        self.bind_notification_scroll(self.scrollable_notifications)
+        
+        self.notification_rows = []
+        self.notifications_empty_frame = None
+        self.notifications_first = 0
+        self.notifications_height = list_height
+        if not hasattr(self, 'notification_row_height'):
+            self.notification_row_height = 100  # Estimate until a row has been measured
         
         # Load and display notifications
         self.load_notifications()
@@ -4254,7 +4257,6 @@ class ModernCybersecurityGUI:
             # Sample notifications
             sample_notifications = [
                 {
-                    'id': 1,
                     'type': 'Information',
                     'title': 'System Scan Completed',
                     'message': 'Quick scan completed successfully. No threats detected.',
@@ -4263,7 +4265,6 @@ class ModernCybersecurityGUI:
                     'icon': '✅'
                 },
                 {
-                    'id': 2,
                     'type': 'Warning',
                     'title': 'Vulnerability Detected',
                     'message': 'Outdated software detected that may pose security risks.',
@@ -4272,7 +4273,6 @@ class ModernCybersecurityGUI:
                     'icon': '⚠️'
                 },
                 {
-                    'id': 3,
                     'type': 'Critical',
                     'title': 'Firewall Alert',
                     'message': 'Suspicious network activity blocked from IP 192.168.1.100',
@@ -4281,7 +4281,6 @@ class ModernCybersecurityGUI:
                     'icon': '🚨'
                 },
                 {
-                    'id': 4,
                     'type': 'Information',
                     'title': 'VPN Connected',
                     'message': 'Successfully connected to VPN server in Netherlands.',
@@ -4290,7 +4289,6 @@ class ModernCybersecurityGUI:
                     'icon': '🔗'
                 },
                 {
-                    'id': 5,
                     'type': 'Information',
                     'title': 'Real-time Protection Active',
                     'message': 'All protection modules are running and monitoring your system.',
@@ -4300,127 +4298,211 @@ class ModernCybersecurityGUI:
                 }
             ]
             
-            self.notifications.extend(sample_notifications)
+            for sample in reversed(sample_notifications):
+                self.notifications.add(sample['type'], sample['title'], sample['message'], sample['icon'],
+                                       timestamp=sample['timestamp'], read=sample['read'])
     
     def display_notifications(self):
-        """Display filtered notifications"""
-        # Clear existing notifications display
-        for widget in self.scrollable_notifications.winfo_children():
-            widget.destroy()
-        
-        # Filter notifications
+        """Display the visible window of filtered notifications"""
         filtered_notifications = self.get_filtered_notifications()
+        total = len(filtered_notifications)
+        visible = self.get_visible_notification_rows()
+        
+        # Keep the window inside the list
+        self.notifications_first = max(0, min(self.notifications_first, total - visible))
+        self.update_filter_labels()
         
         if not filtered_notifications:
-            # Show empty state like Bitdefender
-            empty_frame = tk.Frame(self.scrollable_notifications, bg=self.colors['bg_primary'])
-            empty_frame.pack(expand=True, fill='both', pady=100)
+            for row in self.notification_rows:
+                row['frame'].pack_forget()
+            self.show_notifications_empty_state()
+            self.notifications_scrollbar.set(0, 1)
+            return
             
-            # Calendar icon
-            calendar_label = tk.Label(empty_frame, text="📅", font=('Segoe UI', 48),
-                                    bg=self.colors['bg_primary'], fg=self.colors['text_muted'])
-            calendar_label.pack(pady=(0, 20))
+        if self.notifications_empty_frame is not None:
+            self.notifications_empty_frame.destroy()
+            self.notifications_empty_frame = None
             
-            # Empty message
-            if self.current_filter == "Critical":
-                message = "You have no critical notifications."
-            elif self.current_filter == "Warning":
-                message = "You have no warning notifications."
-            elif self.current_filter == "Information":
-                message = "You have no information notifications."
-            else:
-                message = "You have no notifications."
+        # One extra row for the partly visible one at the bottom
+        while len(self.notification_rows) < visible + 1:
+            self.notification_rows.append(self.create_notification_row())
             
-            empty_label = tk.Label(empty_frame, text=message,
-                                 font=self.fonts['body'], bg=self.colors['bg_primary'],
-                                 fg=self.colors['text_muted'])
-            empty_label.pack()
+        window = filtered_notifications.window(self.notifications_first, visible + 1)
+        for i, row in enumerate(self.notification_rows):
+            if i < len(window):
+                self.update_notification_row(row, window[i])
+                if not row['frame'].winfo_manager():
+                    row['frame'].pack(fill='x', padx=10, pady=5)
+            else:
+                row['notification'] = None
+                row['frame'].pack_forget()
+        
+        # Scroll in whole rows; measure a collapsed row to know how many fit
+        first_row = self.notification_rows[0]
+        if not window[0].get('expanded'):
+            first_row['frame'].update_idletasks()
+            self.notification_row_height = max(40, first_row['frame'].winfo_reqheight() + 10)
+        self.notifications_scrollbar.set(self.notifications_first / total,
+                                         min(1.0, (self.notifications_first + visible) / total))
+    
+    def show_notifications_empty_state(self):
+        """Show empty state like Bitdefender"""
+        if self.notifications_empty_frame is not None:
+            self.notifications_empty_frame.destroy()
+        
+        empty_frame = tk.Frame(self.scrollable_notifications, bg=self.colors['bg_primary'])
+        empty_frame.pack(expand=True, fill='both', pady=100)
+        self.notifications_empty_frame = empty_frame
+        
+        # Calendar icon
+        calendar_label = tk.Label(empty_frame, text="📅", font=('Segoe UI', 48),
+                                bg=self.colors['bg_primary'], fg=self.colors['text_muted'])
+        calendar_label.pack(pady=(0, 20))
+        
+        # Empty message
+        if self.current_filter == "Critical":
+            message = "You have no critical notifications."
+        elif self.current_filter == "Warning":
+            message = "You have no warning notifications."
+        elif self.current_filter == "Information":
+            message = "You have no information notifications."
         else:
-            # Display notifications
-            for notification in filtered_notifications:
-                self.create_notification_item(notification)
+            message = "You have no notifications."
+        
+        empty_label = tk.Label(empty_frame, text=message,
+                             font=self.fonts['body'], bg=self.colors['bg_primary'],
+                             fg=self.colors['text_muted'])
+        empty_label.pack()
     
     def get_filtered_notifications(self):
-        """Get notifications based on current filter"""
-        if self.current_filter == "All":
-            return self.notifications
+        """Get notifications based on current filter (newest first, from the type index)"""
+        return self.notifications.view(self.current_filter)
+    
+    def get_filter_label(self, filter_name):
+        """Filter button text with its unread count"""
+        unread = self.notifications.unread_count(filter_name)
+        return f"{filter_name} ({unread})" if unread else filter_name
+    
+    def update_filter_labels(self):
+        """Refresh the unread counts on the filter buttons"""
+        for filter_name, btn in getattr(self, 'filter_buttons', {}).items():
+            btn.configure(text=self.get_filter_label(filter_name))
+    
+    def get_visible_notification_rows(self):
+        """Number of whole rows that fit in the notification list"""
+        return max(1, self.notifications_height // self.notification_row_height)
+    
+    def on_notifications_resize(self, event):
+        """Render more or fewer rows when the list changes height"""
+        if event.height != self.notifications_height:
+            self.notifications_height = event.height
+            self.display_notifications()
+    
+    def scroll_notifications(self, action, amount, unit=None):
+        """Scrollbar command: move the visible window by rows or pages, or to a fraction"""
+        total = len(self.get_filtered_notifications())
+        if action == 'moveto':
+            self.notifications_first = int(float(amount) * total)
+        elif unit == 'pages':
+            self.notifications_first += int(amount) * self.get_visible_notification_rows()
         else:
-            return [n for n in self.notifications if n['type'] == self.current_filter]
+            self.notifications_first += int(amount)
+        self.display_notifications()
     
-    def create_notification_item(self, notification):
-        """Create a notification item with expandable details"""
-        # Add expanded state to notification if not exists
-        if 'expanded' not in notification:
-            notification['expanded'] = False
+    def bind_notification_scroll(self, widget):
+        """Scroll the notification list rather than the page when the wheel is over a row"""
+        widget.bind("<MouseWheel>", self.on_notifications_mousewheel)
+        for child in widget.winfo_children():
+            self.bind_notification_scroll(child)
+    
+    def on_notifications_mousewheel(self, event):
+        self.scroll_notifications('scroll', int(-1*(event.delta/120)), 'units')
+        return "break"
+    
+    def create_notification_row(self):
+        """Create the widgets of one reusable notification row"""
+        row = {'notification': None, 'details': None}
         
         # Notification container
-        bg_color = self.colors['bg_secondary'] if not notification['read'] else self.colors['bg_primary']
-        
-        notif_frame = tk.Frame(self.scrollable_notifications, bg=bg_color, relief='flat', bd=1,
-                              highlightbackground=self.colors['bg_tertiary'], highlightthickness=1)
-        notif_frame.pack(fill='x', padx=10, pady=5)
+        row['frame'] = tk.Frame(self.scrollable_notifications, relief='flat', bd=1,
+                               highlightbackground=self.colors['bg_tertiary'], highlightthickness=1)
         
         # Main content frame (always visible)
-        main_content_frame = tk.Frame(notif_frame, bg=bg_color)
-        main_content_frame.pack(fill='x', padx=20, pady=15)
+        row['content'] = tk.Frame(row['frame'])
+        row['content'].pack(fill='x', padx=20, pady=15)
         
         # Header with icon, title, and expand button
-        header_frame = tk.Frame(main_content_frame, bg=bg_color)
-        header_frame.pack(fill='x', pady=(0, 5))
+        row['header'] = tk.Frame(row['content'])
+        row['header'].pack(fill='x', pady=(0, 5))
         
         # Icon
-        icon_label = tk.Label(header_frame, text=notification['icon'],
-                            font=('Segoe UI', 16), bg=bg_color,
-                            fg=self.get_notification_color(notification['type']))
-        icon_label.pack(side='left', padx=(0, 10))
+        row['icon'] = tk.Label(row['header'], font=('Segoe UI', 16))
+        row['icon'].pack(side='left', padx=(0, 10))
         
         # Title and timestamp container
-        title_container = tk.Frame(header_frame, bg=bg_color)
-        title_container.pack(side='left', fill='x', expand=True)
+        row['title_container'] = tk.Frame(row['header'])
+        row['title_container'].pack(side='left', fill='x', expand=True)
         
-        title_label = tk.Label(title_container, text=notification['title'],
-                             font=('Segoe UI', 12, 'bold'), bg=bg_color,
-                             fg=self.colors['text_primary'])
-        title_label.pack(anchor='w')
+        row['title'] = tk.Label(row['title_container'], font=('Segoe UI', 12, 'bold'),
+                               fg=self.colors['text_primary'])
+        row['title'].pack(anchor='w')
         
         # Timestamp
-        time_str = self.format_timestamp(notification['timestamp'])
-        time_label = tk.Label(title_container, text=time_str,
-                            font=('Segoe UI', 9), bg=bg_color,
-                            fg=self.colors['text_muted'])
-        time_label.pack(anchor='w')
+        row['time'] = tk.Label(row['title_container'], font=('Segoe UI', 9),
+                              fg=self.colors['text_muted'])
+        row['time'].pack(anchor='w')
         
         # Expand/Collapse button
-        expand_text = "▼" if notification['expanded'] else "▶"
-        expand_btn = tk.Button(header_frame, text=expand_text,
-                             bg=bg_color, fg=self.colors['text_muted'],
-                             font=('Segoe UI', 10), relief='flat', bd=0,
-                             padx=5, pady=0,
-                             command=lambda: self.toggle_notification_details(notification, notif_frame))
-        expand_btn.pack(side='right', padx=(10, 0))
+        row['expand'] = tk.Button(row['header'], fg=self.colors['text_muted'],
+                                 font=('Segoe UI', 10), relief='flat', bd=0,
+                                 padx=5, pady=0,
+                                 command=lambda: self.toggle_notification_details(row['notification'], row['frame']))
+        row['expand'].pack(side='right', padx=(10, 0))
         
         # Brief message (always visible)
-        brief_message = notification['message'][:100] + "..." if len(notification['message']) > 100 else notification['message']
-        message_label = tk.Label(main_content_frame, text=brief_message,
-                               font=self.fonts['body'], bg=bg_color,
-                               fg=self.colors['text_secondary'],
-                               wraplength=600, justify='left')
-        message_label.pack(anchor='w', pady=(5, 0))
-        
-        # Details frame (expandable)
-        if notification['expanded']:
-            self.create_notification_details(notif_frame, notification, bg_color)
+        row['message'] = tk.Label(row['content'], font=self.fonts['body'],
+                                 fg=self.colors['text_secondary'],
+                                 wraplength=600, justify='left')
+        row['message'].pack(anchor='w', pady=(5, 0))
         
         # Make header clickable to mark as read
         def mark_read(event):
-            if not notification['read']:
-                notification['read'] = True
+            if row['notification'] is not None and self.notifications.mark_read(row['notification']):
                 self.display_notifications()
         
         # Bind click events
-        for widget in [main_content_frame, header_frame, title_container, 
-                      icon_label, title_label, time_label, message_label]:
-            widget.bind("<Button-1>", mark_read)
+        for name in ['content', 'header', 'title_container', 'icon', 'title', 'time', 'message']:
+            row[name].bind("<Button-1>", mark_read)
+        self.bind_notification_scroll(row['frame'])
+        
+        return row
+    
+    def update_notification_row(self, row, notification):
+        """Show a notification in a reused row"""
+        # Add expanded state to notification if not exists
+        if 'expanded' not in notification:
+            notification['expanded'] = False
+        
+        bg_color = self.colors['bg_secondary'] if not notification['read'] else self.colors['bg_primary']
+        for name in ['frame', 'content', 'header', 'title_container', 'icon', 'title', 'time', 'expand', 'message']:
+            row[name].configure(bg=bg_color)
+        
+        row['icon'].configure(text=notification['icon'], fg=self.get_notification_color(notification['type']))
+        row['title'].configure(text=notification['title'])
+        row['time'].configure(text=self.format_timestamp(notification['timestamp']))
+        row['expand'].configure(text="▼" if notification['expanded'] else "▶")
+        brief_message = notification['message'][:100] + "..." if len(notification['message']) > 100 else notification['message']
+        row['message'].configure(text=brief_message)
+        
+        # Details frame (expandable) - only expanded rows carry detail widgets
+        if row['details'] is not None and (row['notification'] is not notification or not notification['expanded']):
+            row['details'].destroy()
+            row['details'] = None
+        if notification['expanded'] and row['details'] is None:
+            row['details'] = self.create_notification_details(row['frame'], notification, bg_color)
+            self.bind_notification_scroll(row['details'])
+        
+        row['notification'] = notification
     
     def create_notification_details(self, parent_frame, notification, bg_color):
         """Create detailed notification information panel"""
@@ -4476,6 +4558,8 @@ class ModernCybersecurityGUI:
         
         # Action buttons based on notification type
         self.create_notification_actions(details_content, notification)
+        
+        return details_frame
     
     def get_additional_notification_info(self, notification):
         """Get additional information based on notification type"""
@@ -4678,8 +4762,7 @@ class ModernCybersecurityGUI:
     
     def dismiss_notification(self, notification):
         """Dismiss a specific notification"""
-        if notification in self.notifications:
-            self.notifications.remove(notification)
+        if self.notifications.remove(notification):
             self.display_notifications()
     
     def get_notification_color(self, notification_type):
@@ -4724,38 +4807,38 @@ class ModernCybersecurityGUI:
                     btn.configure(bg=self.colors['bg_primary'], fg=self.colors['text_primary'],
                                 font=('Segoe UI', 11, 'normal'))
         
-        # Refresh only the notifications display
+        # Refresh only the notifications display, from the top of the new filter
+        self.notifications_first = 0
         self.display_notifications()
     
     def clear_all_notifications(self):
         """Clear all notifications"""
-        self.notifications = []
+        self.notifications.clear()
+        self.notifications_first = 0
         self.display_notifications()
     
     def mark_all_read(self):
         """Mark all notifications as read"""
-        for notification in self.notifications:
-            notification['read'] = True
+        self.notifications.mark_all_read()
         self.display_notifications()
     
     def add_notification(self, notification_type, title, message, icon="📢"):
         """Add a new notification"""
-        from datetime import datetime
-        
-        new_notification = {
-            'id': len(self.notifications) + 1,
-            'type': notification_type,
-            'title': title,
-            'message': message,
-            'timestamp': datetime.now(),
-            'read': False,
-            'icon': icon
-        }
+        self.notifications.add(notification_type, title, message, icon)
         
-        self.notifications.insert(0, new_notification)  # Add to beginning
-        
-        # Refresh notifications view if currently displayed
+        # Refresh notifications view if currently displayed - once per burst, not per notification
         if hasattr(self, 'current_view') and self.current_view == 'notifications':
+            # Keep the rows the user scrolled to in place as new ones arrive on top
+            if self.notifications_first and getattr(self, 'current_filter', "All") in ("All", notification_type):
+                self.notifications_first += 1
+            if not getattr(self, 'notifications_refresh_pending', False):
+                self.notifications_refresh_pending = True
+                self.root.after_idle(self.refresh_notifications)
+    
+    def refresh_notifications(self):
+        """Redraw the visible notification rows after a burst of additions"""
+        self.notifications_refresh_pending = False
+        if self.current_view == 'notifications':
             self.display_notifications()
     
     def start_system_scan(self):
@@ -5373,8 +5456,11 @@ class ModernCybersecurityGUI:
             self.show_advanced_vpn()
             return
         
+        if action == "Update Definitions":
+            self.update_definitions()
+            return
+        
         action_messages = {
-            "Update Definitions": "Threat definitions updated successfully!",
             "Security Report": "Generating comprehensive security report...",
             "System Cleanup": "System cleanup completed. 247 MB freed.",
             "Network Scanner": "Network scan initiated. Found 8 devices.",
@@ -5386,6 +5472,41 @@ class ModernCybersecurityGUI:
         message = action_messages.get(action, f"{action} completed successfully!")
         self.show_feature_popup(action, message)
     
+    def update_definitions(self):
+        """Apply pending signature delta packages in the background"""
+        def update_worker():
+            try:
+                ai_detection = str(Path(__file__).parent / 'data' / 'ai_detection')
+                if ai_detection not in sys.path:
+                    sys.path.insert(0, ai_detection)
+                from signature_updates import SignatureUpdater
+                from hash_database import LEARNING_DATABASE
+                
+                # Builds run off the UI thread; a running watcher's updater re-reads CURRENT every
+                # minute, so its scanners switch to a published snapshot shortly after. Snapshots
+                # published here must carry the same learned hashes the watcher would compile.
+                updater = SignatureUpdater(learning_database=LEARNING_DATABASE)
+                results = updater.check_for_updates()
+                failed = [result for result in results if result['status'] not in ('published', 'unchanged')]
+                published = [result['version'] for result in results if result['status'] == 'published']
+                
+                if failed:
+                    message = f"Definition update {failed[0].get('version', '')} failed and was not applied."
+                elif published:
+                    message = (f"Threat definitions updated to version {published[-1]}. "
+                               f"Running scans switch to it within a minute.")
+                else:
+                    message = f"Threat definitions are up to date (version {updater.current.version})."
+                self.root.after(0, lambda: self.add_notification("Information", "Definitions Update", message, "🔄"))
+                
+            except Exception as e:
+                print(f"Definition update error: {e}")
+                self.root.after(0, lambda: self.add_notification("Warning", "Definitions Update",
+                                                                 "Threat definitions could not be updated.", "⚠️"))
+        
+        threading.Thread(target=update_worker, daemon=True).start()
+        self.show_feature_popup("Update Definitions", "Checking for threat definition updates...")
+    
     def refresh_action_grid(self):
         """Refresh the action grid to show updated VPN/Safepay status"""
         # Clear and recreate the action grid
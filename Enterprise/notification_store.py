@@ -0,0 +1,235 @@
+"""
+Notification Store
+Bounded notification history with per-type indexes and unread counters for the Notifications view
+"""
+
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+NOTIFICATION_TYPES = ["Critical", "Warning", "Information"]
+
+class NotificationIndex:
+    """Ids of one notification type in arrival order, indexed newest first"""
+    
+    def __init__(self):
+        self.ids: List[int] = []
+        self.start = 0  # Ids before start were evicted
+    
+    def __len__(self) -> int:
+        return len(self.ids) - self.start
+    
+    def append(self, notification_id: int):
+        self.ids.append(notification_id)
+    
+    def newest(self, position: int) -> int:
+        """Id at a position counted from the newest notification"""
+        if position < 0 or position >= len(self):
+            raise IndexError(position)
+        return self.ids[len(self.ids) - 1 - position]
+    
+    def evict_oldest(self, notification_id: int):
+        """Drop the oldest id if it is the given one (the ring overwrote it)"""
+        if len(self) and self.ids[self.start] == notification_id:
+            self.start += 1
+            # Compact once the evicted prefix outgrows the live ids
+            if self.start > 1024 and self.start > len(self):
+                del self.ids[:self.start]
+                self.start = 0
+    
+    def remove(self, notification_id: int):
+        """Drop an id from anywhere (ids are ascending, so this is a binary search)"""
+        position = bisect_left(self.ids, notification_id, self.start)
+        if position < len(self.ids) and self.ids[position] == notification_id:
+            del self.ids[position]
+
+class NotificationView:
+    """Newest-first sequence over the notifications of one filter, without copying them"""
+    
+    def __init__(self, store: 'NotificationStore', index: NotificationIndex):
+        self.store = store
+        self.index = index
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def __bool__(self) -> bool:
+        return len(self.index) > 0
+    
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        return self.store.items[self.index.newest(position)]
+    
+    def window(self, first: int, count: int) -> List[Dict[str, Any]]:
+        """Notifications at positions first .. first + count - 1"""
+        last = min(len(self.index), first + count)
+        return [self[position] for position in range(max(0, first), last)]
+
+class NotificationStore:
+    """Ring of the most recent notifications, indexed by type with unread counters"""
+    
+    def __init__(self, capacity: int = 100000):
+        self.capacity = capacity
+        self.items: Dict[int, Dict[str, Any]] = {}
+        self.next_id = 1
+        self.evicted = 0
+        
+        # 'All' plus one index per notification type
+        self.indexes: Dict[str, NotificationIndex] = {'All': NotificationIndex()}
+        self.unread: Dict[str, int] = {'All': 0}
+        self.unread_ids = set()
+        for notification_type in NOTIFICATION_TYPES:
+            self.indexes[notification_type] = NotificationIndex()
+            self.unread[notification_type] = 0
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def add(self, notification_type: str, title: str, message: str, icon: str = "📢",
+            timestamp: Optional[datetime] = None, read: bool = False) -> Dict[str, Any]:
+        """Store a notification, evicting the oldest once the ring is full"""
+        if notification_type not in self.indexes:
+            self.indexes[notification_type] = NotificationIndex()
+            self.unread[notification_type] = 0
+        
+        notification = {
+            'id': self.next_id,
+            'type': notification_type,
+            'title': title,
+            'message': message,
+            'timestamp': timestamp or datetime.now(),
+            'read': read,
+            'icon': icon
+        }
+        self.next_id += 1
+        
+        self.items[notification['id']] = notification
+        self.indexes['All'].append(notification['id'])
+        self.indexes[notification_type].append(notification['id'])
+        if not read:
+            self.set_unread(notification, True)
+        
+        while len(self.items) > self.capacity:
+            self.evict_oldest()
+        return notification
+    
+    def evict_oldest(self):
+        """Drop the oldest notification from the ring"""
+        oldest_id = self.indexes['All'].newest(len(self.indexes['All']) - 1)
+        notification = self.items.pop(oldest_id)
+        self.indexes['All'].evict_oldest(oldest_id)
+        self.indexes[notification['type']].evict_oldest(oldest_id)
+        if not notification['read']:
+            self.set_unread(notification, False)
+        self.evicted += 1
+    
+    def set_unread(self, notification: Dict[str, Any], unread: bool):
+        """Keep the unread counters in step with a notification's read flag"""
+        change = 1 if unread else -1
+        self.unread['All'] += change
+        self.unread[notification['type']] += change
+        if unread:
+            self.unread_ids.add(notification['id'])
+        else:
+            self.unread_ids.discard(notification['id'])
+    
+    def view(self, notification_type: str = "All") -> NotificationView:
+        """Newest-first notifications of a type ('All' for every type)"""
+        index = self.indexes.get(notification_type)
+        if index is None:
+            index = self.indexes[notification_type] = NotificationIndex()
+            self.unread[notification_type] = 0
+        return NotificationView(self, index)
+    
+    def count(self, notification_type: str = "All") -> int:
+        index = self.indexes.get(notification_type)
+        return len(index) if index is not None else 0
+    
+    def unread_count(self, notification_type: str = "All") -> int:
+        return self.unread.get(notification_type, 0)
+    
+    def mark_read(self, notification: Dict[str, Any]) -> bool:
+        """Mark one notification read; False if it already was"""
+        if notification['read']:
+            return False
+        notification['read'] = True
+        if notification['id'] in self.items:
+            self.set_unread(notification, False)
+        return True
+    
+    def mark_all_read(self):
+        """Mark every stored notification read (touches only the unread ones)"""
+        for notification_id in self.unread_ids:
+            self.items[notification_id]['read'] = True
+        self.unread_ids.clear()
+        for notification_type in self.unread:
+            self.unread[notification_type] = 0
+    
+    def remove(self, notification: Dict[str, Any]) -> bool:
+        """Dismiss one notification"""
+        if self.items.pop(notification['id'], None) is None:
+            return False
+        self.indexes['All'].remove(notification['id'])
+        self.indexes[notification['type']].remove(notification['id'])
+        if not notification['read']:
+            self.set_unread(notification, False)
+        return True
+    
+    def clear(self):
+        """Drop all notifications (ids keep increasing)"""
+        self.items.clear()
+        self.unread_ids.clear()
+        for notification_type in self.indexes:
+            self.indexes[notification_type] = NotificationIndex()
+            self.unread[notification_type] = 0
+    
+    def get_store_status(self) -> Dict[str, Any]:
+        """Stored, evicted and unread counts"""
+        return {
+            'stored': len(self.items),
+            'capacity': self.capacity,
+            'evicted': self.evicted,
+            'per_type': {notification_type: len(index) for notification_type, index in self.indexes.items()},
+            'unread': dict(self.unread)
+        }
+
+def test_notification_store():
+    """100k alerts: adding, filtering and paging must stay cheap and the counters exact"""
+    import time
+    
+    store = NotificationStore(capacity=100000)
+    start = time.perf_counter()
+    for i in range(120000):
+        store.add(NOTIFICATION_TYPES[i % 3], f"Alert {i}", f"Detection number {i}", read=i % 5 == 0)
+    add_us = (time.perf_counter() - start) / 120000 * 1e6
+    
+    assert len(store) == 100000 and store.evicted == 20000
+    critical = store.view("Critical")
+    assert len(critical) == store.count("Critical") == 33333
+    assert critical[0]['title'] == "Alert 119997" and critical[len(critical) - 1]['title'] == "Alert 20001"
+    assert store.unread_count() == sum(1 for n in store.items.values() if not n['read'])
+    
+    start = time.perf_counter()
+    for first in range(0, 30000, 300):
+        rows = critical.window(first, 12)
+    page_us = (time.perf_counter() - start) / 100 * 1e6
+    assert [row['type'] for row in rows] == ["Critical"] * 12
+    
+    newest = store.view()[0]
+    store.mark_read(newest)
+    store.remove(store.view("Warning")[5])
+    assert store.unread_count() == sum(1 for n in store.items.values() if not n['read'])
+    assert store.unread_count("Warning") == sum(1 for n in store.items.values() if not n['read'] and n['type'] == "Warning")
+    assert len(store.view()) == 99999 and store.count("Warning") == 33332
+    
+    start = time.perf_counter()
+    store.mark_all_read()
+    mark_ms = (time.perf_counter() - start) * 1000
+    assert store.unread_count() == 0 and all(n['read'] for n in store.items.values())
+    
+    store.clear()
+    assert len(store) == 0 and not store.view("Critical")
+    print(f"✅ Notification store OK - {add_us:.1f} µs per add, {page_us:.0f} µs per visible page, "
+          f"mark all read {mark_ms:.1f} ms over 100k alerts")
+
+if __name__ == "__main__":
+    test_notification_store()